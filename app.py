@@ -0,0 +1,378 @@
+import sys
+import logging
+import threading
+from PyQt6.QtWidgets import QApplication, QMessageBox
+from PyQt6.QtCore import QObject, QEvent, pyqtSignal, QTimer
+from gui import BhopAppGUI
+from controller import BhopController
+from telemetry import TelemetryReader
+from startup import trace
+from wakeups import audit
+
+logger = logging.getLogger(__name__)
+
+
+class ControllerBridge(QObject):
+    """
+    Re-emits controller callbacks as Qt signals.
+    Emits coming from non-GUI threads are queued onto the GUI thread.
+    """
+    status_changed = pyqtSignal(str, str)  # message, color
+    error_occurred = pyqtSignal(str)
+    profile_changed = pyqtSignal(str)
+    activity_changed = pyqtSignal(bool)
+    
+    def __init__(self, controller):
+        super().__init__()
+        controller.status_changed.connect(self.status_changed.emit)
+        controller.error_occurred.connect(self.error_occurred.emit)
+        controller.profile_changed.connect(self.profile_changed.emit)
+        controller.activity_changed.connect(self.activity_changed.emit)
+
+
+class GuiDispatcher(QObject):
+    """
+    Runs callables on the GUI thread for other threads and waits for their
+    result, so control socket commands touch the controller and widgets
+    from the thread that owns them.
+    """
+    call = pyqtSignal(object)
+    TIMEOUT_S = 5.0
+    
+    def __init__(self, after=None):
+        super().__init__()
+        self.after = after  # Runs on the GUI thread after every call
+        self.call.connect(self._run)  # Queued: emitted from the control thread
+    
+    def _run(self, job):
+        job()
+    
+    def __call__(self, fn):
+        done = threading.Event()
+        box = {}
+        
+        def job():
+            try:
+                box['result'] = fn()
+                if self.after is not None:
+                    self.after()
+            except Exception as e:
+                box['error'] = e
+            finally:
+                done.set()
+        
+        self.call.emit(job)
+        if not done.wait(self.TIMEOUT_S):
+            raise TimeoutError("GUI thread did not respond")
+        if 'error' in box:
+            raise box['error']
+        return box['result']
+
+
+class TimerAudit(QObject):
+    """Application-wide event filter counting Qt timer wakeups (--audit-wakeups only)."""
+    
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Timer:
+            audit.count(f"qt:{obj.objectName() or type(obj).__name__}")
+        return False
+
+
+class BhopApp:
+    """
+    Main application class connecting all components.
+    """
+    TELEMETRY_INTERVAL_MS = 250
+    
+    def __init__(self, config_file='config.json', backend=None, listener=None, profile=None,
+                 overlay=False, record=None, engine='thread', realtime=None, metrics=None,
+                 control=None):
+        # Initialize Qt application
+        with trace.phase('app.qapplication'):
+            self.app = QApplication(sys.argv)
+            self.app.setApplicationName("Bhop Control")
+            self.app.setOrganizationName("CS2 Tools")
+        
+        # Initialize components
+        with trace.phase('app.controller'):
+            self.controller = BhopController(backend=backend, listener=listener, record=record,
+                                             engine=engine, realtime=realtime)
+            self.bridge = ControllerBridge(self.controller)
+        with trace.phase('app.gui'):
+            self.gui = BhopAppGUI(config_file=config_file, overlay=overlay)
+        
+        # Live telemetry: polled at a fixed rate, only while scrolling, so
+        # the app has no periodic wakeups while disarmed or the key is up
+        self.telemetry_reader = None
+        self.telemetry_timer = QTimer()
+        self.telemetry_timer.setObjectName('telemetry')
+        self.telemetry_timer.setInterval(self.TELEMETRY_INTERVAL_MS)
+        self.telemetry_timer.timeout.connect(self.on_telemetry_tick)
+        
+        # Wakeup audit: count every Qt timer event by its receiver
+        self.timer_audit = None
+        if audit.enabled:
+            self.timer_audit = TimerAudit()
+            self.app.installEventFilter(self.timer_audit)
+        
+        # Optional Prometheus endpoint, see metrics_server.py
+        self.metrics_server = None
+        if metrics:
+            from metrics_server import MetricsServer
+            self.metrics_server = MetricsServer(self.controller.metrics, metrics)
+            self.metrics_server.start()
+        
+        # Optional control socket; commands run on the GUI thread, and the
+        # buttons follow whatever state they leave the controller in
+        self.control_server = None
+        if control:
+            from control_server import ControlServer
+            self.dispatcher = GuiDispatcher(
+                after=lambda: self.set_ui_running(self.controller.is_running))
+            self.control_server = ControlServer(self.controller, control, dispatch=self.dispatcher)
+            self.control_server.start()
+        
+        # Connect signals
+        self.connect_signals()
+        
+        # Profiles: precompiled by the GUI's store, switched by the controller
+        self.controller.set_profiles(self.gui.profiles)
+        if profile:
+            self.controller.switch_profile(profile)
+        
+        logger.info("Application initialized")
+    
+    def connect_signals(self):
+        """Connects all signals between components."""
+        # GUI button connections
+        self.gui.start_button.clicked.connect(self.on_start_clicked)
+        self.gui.stop_button.clicked.connect(self.on_stop_clicked)
+        
+        # Compact mode buttons forward to these (see BhopAppGUI.create_compact_view)
+        
+        # Controller status updates
+        self.bridge.status_changed.connect(self.update_status)
+        self.bridge.error_occurred.connect(self.show_error)
+        self.bridge.activity_changed.connect(self.on_activity_changed)
+        
+        # GUI settings changed
+        self.gui.settings_changed.connect(self.on_settings_changed)
+        
+        # Profile switching (tray menu, hotkeys)
+        self.gui.profile_selected.connect(self.controller.switch_profile)
+        self.bridge.profile_changed.connect(self.gui.show_profile)
+        
+        # Application cleanup
+        self.app.aboutToQuit.connect(self.cleanup)
+    
+    def on_start_clicked(self):
+        """Handles start button click."""
+        try:
+            # Start from the active profile (smoothing, acceleration, pattern,
+            # bindings, ...) and apply what the widgets show on top
+            settings = self.gui.profiles.settings()
+            settings.update({
+                'key': self.gui.key_input.currentText() if hasattr(self.gui.key_input, 'currentText') else self.gui.key_input.text(),
+                'delay': self.gui.delay_input.value(),
+                'strength': self.gui.strength_slider.value() if hasattr(self.gui, 'strength_slider') else 1,
+                'hold_mode': self.gui.hold_mode.isChecked() if hasattr(self.gui, 'hold_mode') else True
+            })
+            
+            # Validate settings
+            if not settings['key']:
+                self.show_error("Please enter an activation key")
+                return
+            
+            # Start scrolling
+            if self.controller.start_scrolling(settings):
+                self.set_ui_running(True)
+                self.gui.save_settings()  # Save successful settings
+                
+        except Exception as e:
+            logger.error(f"Error in start handler: {e}")
+            self.show_error(f"Failed to start: {str(e)}")
+    
+    def on_stop_clicked(self):
+        """Handles stop button click."""
+        try:
+            if self.controller.stop_scrolling():
+                self.set_ui_running(False)
+        except Exception as e:
+            logger.error(f"Error in stop handler: {e}")
+            self.show_error(f"Failed to stop: {str(e)}")
+    
+    def on_settings_changed(self, settings):
+        """Handles settings changes from GUI."""
+        try:
+            if self.controller.is_running:
+                # Update settings on the fly if running; the controller keeps
+                # current_settings and the session log in step
+                if self.controller.update_settings(settings):
+                    logger.info("Settings updated on the fly")
+        except Exception as e:
+            logger.error(f"Error updating settings: {e}")
+    
+    def update_status(self, message, color):
+        """Updates status display in GUI."""
+        try:
+            self.gui.status_label.setText(message)
+            self.gui.status_label.setStyleSheet(f"""
+                QLabel {{
+                    color: {color};
+                    font-size: 13pt;
+                    font-weight: bold;
+                    padding: 8px;
+                    background-color: rgba(255, 165, 0, 10);
+                    border-radius: 8px;
+                }}
+            """)
+            
+            # Update compact mode status
+            if hasattr(self.gui, 'compact_status'):
+                if "Active" in message:
+                    self.gui.compact_status.setText("🟢")
+                    self.gui.compact_status.setStyleSheet("QLabel { color: #00AA00; font-size: 20pt; }")
+                else:
+                    self.gui.compact_status.setText("⚫")
+                    self.gui.compact_status.setStyleSheet("QLabel { color: #FF8C00; font-size: 20pt; }")
+                    
+        except Exception as e:
+            logger.error(f"Error updating status: {e}")
+    
+    def show_error(self, message):
+        """Shows error message to user."""
+        logger.error(f"Error shown to user: {message}")
+        
+        # Update status label with error
+        self.gui.status_label.setText(f"❌ Error: {message}")
+        self.gui.status_label.setStyleSheet("""
+            QLabel {
+                color: #FF0000;
+                font-size: 11pt;
+                font-weight: bold;
+                padding: 8px;
+                background-color: rgba(255, 0, 0, 10);
+                border-radius: 8px;
+            }
+        """)
+        
+        # Reset status after 3 seconds
+        QTimer.singleShot(3000, lambda: self.update_status("⚫ Stopped", "#FF8C00"))
+    
+    def set_ui_running(self, running):
+        """Updates UI state based on running status."""
+        try:
+            if running:
+                # Normal view
+                self.gui.start_button.setEnabled(False)
+                self.gui.stop_button.setEnabled(True)
+                self.gui.key_input.setEnabled(False)
+                self.gui.delay_input.setEnabled(False)
+                
+                if hasattr(self.gui, 'strength_slider'):
+                    self.gui.strength_slider.setEnabled(False)
+                if hasattr(self.gui, 'hold_mode'):
+                    self.gui.hold_mode.setEnabled(False)
+                
+                # Compact view
+                if hasattr(self.gui, 'compact_start'):
+                    self.gui.compact_start.setEnabled(False)
+                    self.gui.compact_stop.setEnabled(True)
+            else:
+                # Normal view
+                self.gui.start_button.setEnabled(True)
+                self.gui.stop_button.setEnabled(False)
+                self.gui.key_input.setEnabled(True)
+                self.gui.delay_input.setEnabled(True)
+                
+                if hasattr(self.gui, 'strength_slider'):
+                    self.gui.strength_slider.setEnabled(True)
+                if hasattr(self.gui, 'hold_mode'):
+                    self.gui.hold_mode.setEnabled(True)
+                
+                # Compact view
+                if hasattr(self.gui, 'compact_start'):
+                    self.gui.compact_start.setEnabled(True)
+                    self.gui.compact_stop.setEnabled(False)
+                
+                self.stop_telemetry()
+                    
+        except Exception as e:
+            logger.error(f"Error updating UI state: {e}")
+    
+    def on_activity_changed(self, active):
+        """Polls telemetry while scrolling, and not at all while the key is up."""
+        if active and self.controller.is_running:
+            self.start_telemetry()
+        else:
+            self.stop_telemetry()
+    
+    def start_telemetry(self):
+        """Starts polling the scroller's telemetry ring."""
+        scroller = self.controller.scroller
+        if scroller is None:
+            return
+        if self.telemetry_reader is None or self.telemetry_reader.ring is not scroller.telemetry:
+            self.telemetry_reader = TelemetryReader(scroller.telemetry)
+        self.telemetry_reader.reset()
+        self.telemetry_timer.start()
+    
+    def stop_telemetry(self):
+        """Stops polling and clears the telemetry display."""
+        self.telemetry_timer.stop()
+        self.gui.show_telemetry(None)
+    
+    def on_telemetry_tick(self):
+        """Shows what the scroller did since the last tick."""
+        try:
+            self.gui.show_telemetry(self.telemetry_reader.sample())
+        except Exception as e:
+            logger.error(f"Error reading telemetry: {e}")
+    
+    def cleanup(self):
+        """Cleanup on application exit."""
+        try:
+            logger.info("Application shutting down...")
+            
+            # Save settings: write anything still pending before exit
+            self.gui.save_settings()
+            self.gui.config_store.close()
+            
+            # Cleanup controller
+            if self.control_server is not None:
+                self.control_server.stop()
+            self.controller.cleanup()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+            
+            # Repaint cost over the session, to compare overlay vs normal mode
+            paint = self.gui.paint_stats.to_dict()
+            logger.info(f"Paint: {paint['passes']} passes, "
+                        f"p99 {paint['pass_duration_us'].get('p99', 0):.0f} us, "
+                        f"max {paint['pass_duration_us'].get('max', 0):.0f} us "
+                        f"({'overlay' if self.gui.overlay else 'normal'} mode)")
+            audit.log_summary()
+            
+            logger.info("Application shutdown complete")
+            
+        except Exception as e:
+            logger.error(f"Error during cleanup: {e}")
+    
+    def on_first_window(self):
+        """Records time-to-first-window once the event loop is running."""
+        trace.mark('first_window')
+        trace.log_summary()
+    
+    def run(self):
+        """Runs the application."""
+        try:
+            # Show GUI
+            self.gui.show()
+            QTimer.singleShot(0, self.on_first_window)
+            
+            # Start Qt event loop
+            sys.exit(self.app.exec())
+            
+        except Exception as e:
+            logger.critical(f"Critical error in main loop: {e}")
+            sys.exit(1)
@@ -0,0 +1,307 @@
+import os
+import sys
+import time
+import struct
+from array import array
+
+
+class EmitterBackend:
+    """
+    Base class for wheel emission backends.
+    A backend turns scroll requests from the scroller into OS-level wheel events.
+    """
+    name = 'base'
+    requests = None  # Requests sent to the display server/kernel, if counted
+
+    def scroll(self, dx, dy):
+        """
+        Emits a scroll. Follows the pynput convention:
+        positive dy scrolls up, negative dy scrolls down, one unit per notch.
+        Backends that batch may hold the events until flush().
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """Sends everything queued by scroll(). The scroller calls it once per emit."""
+        pass
+
+    def close(self):
+        """Releases any resources held by the backend."""
+        pass
+
+
+class PynputBackend(EmitterBackend):
+    """Emits wheel events through pynput's mouse controller (all platforms)."""
+    name = 'pynput'
+
+    def __init__(self):
+        from pynput.mouse import Controller as MouseController
+        self.mouse = MouseController()
+
+    def scroll(self, dx, dy):
+        self.mouse.scroll(dx, dy)
+
+
+class UinputBackend(EmitterBackend):
+    """
+    Emits wheel events through a virtual Linux uinput device.
+    Bypasses the display server entirely; needs write access to /dev/uinput.
+    scroll() packs input_event records into a preallocated buffer and flush()
+    hands the whole batch to the kernel in a single write.
+    """
+    name = 'uinput'
+
+    # linux/input-event-codes.h
+    EV_SYN = 0x00
+    EV_KEY = 0x01
+    EV_REL = 0x02
+    SYN_REPORT = 0
+    REL_X = 0x00
+    REL_Y = 0x01
+    REL_HWHEEL = 0x06
+    REL_WHEEL = 0x08
+    BTN_LEFT = 0x110
+    BUS_USB = 0x03
+
+    # linux/uinput.h ioctl numbers
+    UI_DEV_CREATE = 0x5501
+    UI_DEV_DESTROY = 0x5502
+    UI_DEV_SETUP = 0x405C5503
+    UI_SET_EVBIT = 0x40045564
+    UI_SET_KEYBIT = 0x40045565
+    UI_SET_RELBIT = 0x40045566
+
+    # struct input_event {struct timeval time; __u16 type; __u16 code; __s32 value;}
+    EVENT = struct.Struct('llHHi')
+    # struct uinput_setup {struct input_id id; char name[80]; __u32 ff_effects_max;}
+    SETUP = struct.Struct('HHHH80sI')
+
+    def __init__(self, path='/dev/uinput', name='Bhop Virtual Wheel', capacity=256):
+        if not sys.platform.startswith('linux'):
+            raise RuntimeError("uinput backend is only available on Linux")
+        import fcntl
+        self._ioctl = fcntl.ioctl
+        self._init_buffer(capacity)
+        self._fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        try:
+            self._setup_device(name)
+        except Exception:
+            os.close(self._fd)
+            self._fd = None
+            raise
+
+    def _init_buffer(self, capacity):
+        """Preallocates room for `capacity` queued input_event records."""
+        self._buffer = bytearray(self.EVENT.size * capacity)
+        self._view = memoryview(self._buffer)
+        self._limit = len(self._buffer) - 3 * self.EVENT.size  # Room for one scroll()
+        self._length = 0
+        self.requests = 0  # input_event records written
+        self.flushes = 0   # write() calls
+
+    def _setup_device(self, name):
+        """Declares the wheel capabilities and creates the virtual device."""
+        ioctl = self._ioctl
+        # A pointer button and relative axes make the device classify as a mouse
+        ioctl(self._fd, self.UI_SET_EVBIT, self.EV_KEY)
+        ioctl(self._fd, self.UI_SET_KEYBIT, self.BTN_LEFT)
+        ioctl(self._fd, self.UI_SET_EVBIT, self.EV_REL)
+        for code in (self.REL_X, self.REL_Y, self.REL_WHEEL, self.REL_HWHEEL):
+            ioctl(self._fd, self.UI_SET_RELBIT, code)
+        setup = self.SETUP.pack(self.BUS_USB, 0x1209, 0xB409, 1, name.encode()[:79], 0)
+        ioctl(self._fd, self.UI_DEV_SETUP, setup)
+        ioctl(self._fd, self.UI_DEV_CREATE)
+
+    def scroll(self, dx, dy):
+        if not (dx or dy):
+            return
+        if self._length > self._limit:
+            self.flush()  # Buffer full: send what is queued first
+        pack_into = self.EVENT.pack_into
+        buffer = self._buffer
+        offset = self._length
+        size = self.EVENT.size
+        # The kernel stamps the time fields itself
+        if dy:
+            pack_into(buffer, offset, 0, 0, self.EV_REL, self.REL_WHEEL, dy)
+            offset += size
+        if dx:
+            pack_into(buffer, offset, 0, 0, self.EV_REL, self.REL_HWHEEL, dx)
+            offset += size
+        pack_into(buffer, offset, 0, 0, self.EV_SYN, self.SYN_REPORT, 0)
+        self._length = offset + size
+
+    def flush(self):
+        length = self._length
+        if not length:
+            return
+        written = os.write(self._fd, self._view[:length])
+        while written < length:
+            written += os.write(self._fd, self._view[written:length])
+        self._length = 0
+        self.requests += length // self.EVENT.size
+        self.flushes += 1
+
+    def close(self):
+        if self._fd is not None:
+            try:
+                self.flush()
+                self._ioctl(self._fd, self.UI_DEV_DESTROY)
+            except OSError:
+                pass
+            os.close(self._fd)
+            self._fd = None
+
+
+class UinputFileBackend(UinputBackend):
+    """
+    Stand-in for UinputBackend that writes the same input_event byte stream
+    to a regular file instead of a device, for checking the stream on
+    machines without /dev/uinput. Read it back with decode_input_events().
+    """
+    name = 'uinput-file'
+
+    def __init__(self, path=None, capacity=256):
+        if path is None:
+            import tempfile
+            path = os.path.join(tempfile.gettempdir(), 'bhop-uinput.bin')
+        self.path = path
+        self._init_buffer(capacity)
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+
+    def close(self):
+        if self._fd is not None:
+            self.flush()
+            os.close(self._fd)
+            self._fd = None
+
+
+def decode_input_events(data):
+    """Returns (type, code, value) tuples from a packed input_event stream."""
+    return [(type_, code, value)
+            for _, _, type_, code, value in UinputBackend.EVENT.iter_unpack(data)]
+
+
+class XTestBackend(EmitterBackend):
+    """
+    Emits wheel events as X11 button 4/5 (6/7 horizontal) clicks via XTEST.
+    Keeps a single display connection open for the lifetime of the backend.
+    scroll() only queues the press/release requests in Xlib's output buffer;
+    flush() writes them out in one go, without waiting for a reply
+    (pynput syncs with the server after every scroll call).
+    """
+    name = 'xtest'
+
+    def __init__(self, display_name=None):
+        from Xlib import X
+        from Xlib.display import Display
+        from Xlib.ext import xtest
+        self._press = X.ButtonPress
+        self._release = X.ButtonRelease
+        self._fake_input = xtest.fake_input
+        self._display = Display(display_name)
+        if not self._display.has_extension('XTEST'):
+            self._display.close()
+            raise RuntimeError("X server does not support the XTEST extension")
+        self.requests = 0  # XTestFakeInput requests queued
+        self.flushes = 0   # Writes to the X connection
+
+    def _click(self, button, count):
+        display = self._display
+        fake_input = self._fake_input
+        for _ in range(count):
+            fake_input(display, self._press, button)
+            fake_input(display, self._release, button)
+        self.requests += 2 * count
+
+    def scroll(self, dx, dy):
+        if dy:
+            self._click(4 if dy > 0 else 5, abs(dy))
+        if dx:
+            self._click(7 if dx > 0 else 6, abs(dx))
+
+    def flush(self):
+        self._display.flush()
+        self.flushes += 1
+
+    def close(self):
+        if self._display is not None:
+            self._display.close()
+            self._display = None
+
+
+class RecordingBackend(EmitterBackend):
+    """
+    In-memory backend that timestamps every emitted wheel unit.
+    Needs no display or input device, so the scroll loop can be
+    benchmarked on a headless box. Storage is preallocated; units past
+    capacity are counted in `dropped` but not stored.
+    """
+    name = 'recording'
+
+    def __init__(self, capacity=1 << 20, clock=time.perf_counter_ns):
+        self.capacity = capacity
+        self.clock = clock
+        self.timestamps = array('q', bytes(8 * capacity))
+        self.deltas = array('b', bytes(capacity))
+        self.count = 0
+        self.calls = 0
+        self.dropped = 0
+
+    def scroll(self, dx, dy):
+        # Only the vertical wheel is recorded; it is all the scroller emits
+        now = self.clock()
+        self.calls += 1
+        step = 1 if dy > 0 else -1
+        for _ in range(abs(dy)):
+            if self.count < self.capacity:
+                self.timestamps[self.count] = now
+                self.deltas[self.count] = step
+                self.count += 1
+            else:
+                self.dropped += 1
+
+    def clear(self):
+        """Forgets all recorded units."""
+        self.count = 0
+        self.calls = 0
+        self.dropped = 0
+
+    def events(self):
+        """Returns recorded (timestamp_ns, delta) pairs."""
+        return list(zip(self.timestamps[:self.count], self.deltas[:self.count]))
+
+    def total_units(self):
+        """Returns the net number of wheel units emitted (negative = down)."""
+        return sum(self.deltas[:self.count])
+
+
+BACKENDS = {
+    PynputBackend.name: PynputBackend,
+    UinputBackend.name: UinputBackend,
+    UinputFileBackend.name: UinputFileBackend,
+    XTestBackend.name: XTestBackend,
+    RecordingBackend.name: RecordingBackend,
+}
+
+# Cheapest first: kernel device, then a raw X connection, then pynput
+AUTO_ORDER = ('uinput', 'xtest', 'pynput')
+
+
+def create_backend(name='pynput', **kwargs):
+    """
+    Creates an emitter backend by name.
+    'auto' picks the cheapest backend that can be opened on this machine.
+    """
+    if name == 'auto':
+        errors = []
+        for candidate in AUTO_ORDER:
+            try:
+                return BACKENDS[candidate]()
+            except Exception as e:
+                errors.append(f"{candidate}: {e}")
+        raise RuntimeError("No emitter backend available (" + "; ".join(errors) + ")")
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown emitter backend: {name}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,302 @@
+"""
+Benchmark suite for the scroll hot loop.
+
+Drives AdvancedScroller against the in-memory recording backend for every
+combination of delay, strength, smooth scrolling and acceleration, and
+reports achieved rate, CPU time per tick, jitter percentiles and stop latency.
+
+    python bench.py --save bench_baseline.json
+    python bench.py --compare bench_baseline.json
+
+--engine process runs the scroll loop in a child process; --gui-load keeps
+a GIL-hungry thread busy in this process, the way Qt painting does, to
+compare jitter of both engines under load.
+
+--xvfb starts a throwaway Xvfb server, so the X11 backends can be compared
+headless; backends that count their requests also report requests and
+flushes per tick:
+
+    python bench.py --quick --xvfb --backend xtest
+    python bench.py --quick --xvfb --backend pynput
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import threading
+import itertools
+import select
+import subprocess
+from backends import RecordingBackend, create_backend
+from scroller import AdvancedScroller
+from settings import OVERLOAD_POLICIES
+import realtime as rt
+
+DELAYS_MS = (1, 5, 20)
+STRENGTHS = (1, 5, 10)
+SMOOTH = (False, True)
+ACCELERATION = (False, True)
+
+# Allowed relative change before a metric counts as a regression.
+# Direction: +1 means higher is worse, -1 means lower is worse.
+THRESHOLDS = {
+    'ticks_per_sec': (-1, 0.05),
+    'cpu_us_per_tick': (+1, 0.15),
+    'jitter_p99_us': (+1, 0.25),
+    'jitter_p999_us': (+1, 0.50),
+    'stop_latency_us': (+1, 0.50),
+    'halt_latency_us': (+1, 0.50),
+}
+# Microsecond metrics below this absolute change are treated as noise
+NOISE_FLOOR_US = 50.0
+
+
+def combo_name(delay, strength, smooth, acceleration):
+    """Returns a stable key for a settings combination."""
+    return f"delay={delay}ms strength={strength} smooth={int(smooth)} accel={int(acceleration)}"
+
+
+def start_xvfb(timeout=5.0):
+    """Starts Xvfb on a free display and points DISPLAY at it; returns the process."""
+    read_fd, write_fd = os.pipe()
+    try:
+        process = subprocess.Popen(
+            ['Xvfb', '-displayfd', str(write_fd), '-nolisten', 'tcp', '-screen', '0', '640x480x24'],
+            pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        os.close(read_fd)
+        raise RuntimeError("Xvfb is not installed")
+    finally:
+        os.close(write_fd)
+    # Xvfb writes the display number once it accepts connections
+    deadline = time.monotonic() + timeout
+    number = b''
+    try:
+        while not number.endswith(b'\n'):
+            remaining = deadline - time.monotonic()
+            ready = remaining > 0 and select.select([read_fd], [], [], remaining)[0]
+            chunk = os.read(read_fd, 16) if ready else b''
+            if not chunk:
+                # Timed out, or Xvfb exited without announcing a display
+                process.kill()
+                process.wait()
+                raise RuntimeError("Xvfb did not start")
+            number += chunk
+    finally:
+        os.close(read_fd)
+    os.environ['DISPLAY'] = f":{number.decode().strip()}"
+    return process
+
+
+class GuiLoad(threading.Thread):
+    """Pure-Python busy work in bursts, holding the GIL like Qt painting does."""
+
+    def __init__(self, busy_s=0.004, idle_s=0.004):
+        super().__init__(daemon=True)
+        self.busy_s = busy_s
+        self.idle_s = idle_s
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            end = time.perf_counter() + self.busy_s
+            while time.perf_counter() < end:
+                sum(range(200))
+            self._stop_event.wait(self.idle_s)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_case(settings, duration, backend='recording', engine='thread', gui_load=False,
+             realtime=None):
+    """Runs one settings combination and returns its metrics."""
+    if engine == 'process':
+        from engine_process import ProcessScroller
+        emitter = None  # Lives in the engine process
+        scroller = ProcessScroller(backend=backend, realtime=realtime)
+    else:
+        emitter = RecordingBackend() if backend == 'recording' else create_backend(backend)
+        scroller = AdvancedScroller(backend=emitter, realtime=realtime)
+    scroller.update_settings(settings)
+    scroller.start()
+    if engine == 'process':
+        scroller.wait_ready()
+    load = GuiLoad() if gui_load else None
+    try:
+        if load:
+            load.start()
+        # CPU time of the scroll loop thread only, wherever it runs
+        cpu_start = scroller.get_status()['cpu_s']
+        wall_start = time.perf_counter_ns()
+        scroller.start_scrolling()
+        time.sleep(duration)
+
+        stop_requested = time.perf_counter_ns()
+        scroller.stop_scrolling()
+        ticks = scroller.telemetry.head
+        wall_end = time.perf_counter_ns()
+
+        # Let any in-flight tick finish before reading the recording
+        time.sleep(max(0.05, scroller.config.delay * 2))
+        status = scroller.get_status()
+    finally:
+        if load:
+            load.stop()
+        scroller.stop()
+
+    latency = status['latency']
+    cpu_end = status['cpu_s']
+    if cpu_start is None or cpu_end is None:
+        cpu_us_per_tick = 0.0  # No per-thread CPU clock on this platform
+    else:
+        cpu_us_per_tick = (cpu_end - cpu_start) * 1e6 / ticks if ticks else 0.0
+    elapsed = (wall_end - wall_start) / 1e9
+    result = {
+        'target_ticks_per_sec': 1.0 / scroller.config.tick_period,
+        'ticks_per_sec': ticks / elapsed if elapsed else 0.0,
+        'units_per_sec': latency['units'] / elapsed if elapsed else 0.0,
+        'cpu_us_per_tick': cpu_us_per_tick,
+        'jitter_p50_us': latency['jitter_us'].get('p50', 0.0),
+        'jitter_p99_us': latency['jitter_us'].get('p99', 0.0),
+        'jitter_p999_us': latency['jitter_us'].get('p99.9', 0.0),
+        'emit_p50_us': latency['emit_duration_us'].get('p50', 0.0),
+        'emit_p99_us': latency['emit_duration_us'].get('p99', 0.0),
+        'missed_deadlines': status['scheduler']['missed_deadlines'],
+        'halt_latency_us': latency['release_to_halt_us'].get('max', 0.0),
+        'stop_latency_us': 0.0,
+        'overloads': latency['overloads'],
+        'realtime': status['realtime']['policy'],
+    }
+    if isinstance(emitter, RecordingBackend) and emitter.count:
+        # How long wheel units kept coming after the stop request
+        last_emit = emitter.timestamps[emitter.count - 1]
+        result['stop_latency_us'] = max(0, last_emit - stop_requested) / 1000
+    if emitter is not None and emitter.requests is not None and latency['ticks']:
+        result['requests_per_tick'] = emitter.requests / latency['ticks']
+        result['flushes_per_tick'] = emitter.flushes / latency['ticks']
+    return result
+
+
+def run_suite(duration, backend='recording', quick=False, engine='thread', gui_load=False,
+              realtime=None, overload_policy='coalesce'):
+    """Runs every settings combination and returns {combo: metrics}."""
+    delays = DELAYS_MS[:1] if quick else DELAYS_MS
+    strengths = STRENGTHS[::2] if quick else STRENGTHS
+    results = {}
+    for delay, strength, smooth, acceleration in itertools.product(
+            delays, strengths, SMOOTH, ACCELERATION):
+        settings = {
+            'delay': delay,
+            'strength': strength,
+            'smooth_scrolling': smooth,
+            'acceleration': acceleration,
+            'overload_policy': overload_policy
+        }
+        name = combo_name(delay, strength, smooth, acceleration)
+        results[name] = run_case(settings, duration, backend, engine, gui_load, realtime)
+        print_result(name, results[name])
+    return results
+
+
+def print_result(name, r):
+    """Prints one result line."""
+    requests = ''
+    if 'requests_per_tick' in r:
+        requests = f"  req/flush {r['requests_per_tick']:.1f}/{r['flushes_per_tick']:.1f} per tick"
+    print(f"{name:<46} {r['ticks_per_sec']:8.0f}/{r['target_ticks_per_sec']:<6.0f} ticks/s "
+          f"{r['units_per_sec']:8.0f} units/s  cpu {r['cpu_us_per_tick']:6.1f} us/tick  "
+          f"emit p50/p99 {r['emit_p50_us']:.0f}/{r['emit_p99_us']:.0f} us  "
+          f"jitter p50/p99/p99.9 {r['jitter_p50_us']:.0f}/{r['jitter_p99_us']:.0f}/"
+          f"{r['jitter_p999_us']:.0f} us  stop {r['stop_latency_us']:.0f} us  "
+          f"halt {r['halt_latency_us']:.0f} us  overloads {r['overloads']}{requests}  "
+          f"[{r['realtime']}]")
+
+
+def compare(results, baseline):
+    """Returns a list of regression messages against a baseline results dict."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric, (direction, allowed) in THRESHOLDS.items():
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) * direction
+            if metric.endswith('_us') and change < NOISE_FLOOR_US:
+                continue
+            if change > abs(old) * allowed:
+                regressions.append(f"{name}: {metric} {old:.1f} -> {new:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scroll hot loop benchmark")
+    parser.add_argument('--duration', type=float, default=0.5,
+                        help="seconds of scrolling per combination (default: 0.5)")
+    parser.add_argument('--backend', default='recording',
+                        help="emitter backend to drive (default: recording)")
+    parser.add_argument('--quick', action='store_true',
+                        help="run a reduced set of combinations")
+    parser.add_argument('--engine', choices=('thread', 'process'), default='thread',
+                        help="run the scroll loop in a thread (default) or a child process")
+    parser.add_argument('--gui-load', action='store_true',
+                        help="keep a GIL-hungry thread busy, like a GUI repainting")
+    parser.add_argument('--xvfb', action='store_true',
+                        help="run against a throwaway Xvfb server (for the X11 backends)")
+    parser.add_argument('--overload-policy', choices=OVERLOAD_POLICIES, default='coalesce',
+                        help="what the loop does when the backend can't keep up")
+    rt.add_arguments(parser)
+    parser.add_argument('--save', metavar='FILE', help="write results as a JSON baseline")
+    parser.add_argument('--compare', metavar='FILE', help="compare against a JSON baseline")
+    args = parser.parse_args()
+
+    realtime = rt.from_args(args)
+    try:
+        xvfb = start_xvfb() if args.xvfb else None
+    except RuntimeError as e:
+        parser.error(str(e))
+    try:
+        results = run_suite(args.duration, args.backend, args.quick, args.engine, args.gui_load,
+                            realtime, args.overload_policy)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'backend': args.backend,
+                    'engine': args.engine,
+                    'gui_load': args.gui_load,
+                    'realtime': realtime,
+                    'overload_policy': args.overload_policy,
+                    'duration': args.duration,
+                },
+                'results': results
+            }, f, indent=2)
+        print(f"Baseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
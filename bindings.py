@@ -0,0 +1,97 @@
+def compile_bindings(primary, specs=None):
+    """
+    Compiles a binding table: {key: ScrollSettings}.
+    The primary snapshot is bound to its own key; each extra binding spec
+    (a settings dict with at least 'key') inherits every value it doesn't set
+    from the primary snapshot.
+    """
+    table = {primary.key: primary}
+    for spec in specs or ():
+        table[spec['key']] = primary.merged(spec)
+    return table
+
+
+class BindingTable:
+    """
+    Key binding table with O(1) dispatch and gapless, diff-based rebinding.
+    Each key maps to its own precompiled ScrollSettings (mode and parameters).
+    The table is replaced whole, never mutated, so listener threads can read
+    it without a lock. When armed, apply() hooks added keys before it
+    publishes the new table and unhooks removed keys only afterwards, so keys
+    bound both before and after a rebind are never unhooked at all.
+    """
+
+    def __init__(self, on_press, on_release):
+        self._on_press = on_press      # Called as on_press(key, settings)
+        self._on_release = on_release  # Called as on_release(key, settings)
+        self._table = {}
+        self._hooks = {}  # key -> listener handle
+        self.listener = None
+        self.rebinds = 0
+
+    def get(self, key):
+        """Returns the snapshot bound to a key, or None."""
+        return self._table.get(key)
+
+    def keys(self):
+        """Returns the bound keys."""
+        return list(self._table)
+
+    @property
+    def armed(self):
+        """True while keys are hooked on a listener."""
+        return self.listener is not None
+
+    def _hook(self, key):
+        self._hooks[key] = self.listener.hook(
+            key,
+            on_press=lambda key=key: self._dispatch(self._on_press, key),
+            on_release=lambda key=key: self._dispatch(self._on_release, key),
+            suppress=True)
+
+    def _unhook(self, key):
+        hook = self._hooks.pop(key, None)
+        if hook is not None:
+            try:
+                self.listener.unhook(hook)
+            except Exception:
+                pass
+
+    def _dispatch(self, callback, key):
+        settings = self._table.get(key)
+        if settings is not None:
+            callback(key, settings)
+
+    def arm(self, listener):
+        """Hooks every bound key on a listener."""
+        self.disarm()
+        self.listener = listener
+        for key in self._table:
+            self._hook(key)
+
+    def disarm(self):
+        """Unhooks every key."""
+        if self.listener is None:
+            return
+        for key in list(self._hooks):
+            self._unhook(key)
+        self.listener = None
+
+    def apply(self, table):
+        """
+        Publishes a new {key: ScrollSettings} table.
+        Returns the keys that were removed.
+        """
+        removed = [key for key in self._table if key not in table]
+        if self.armed:
+            # Add before remove: a moved binding is live on its new key first
+            for key in table:
+                if key not in self._hooks:
+                    self._hook(key)
+            self._table = table
+            for key in removed:
+                self._unhook(key)
+            self.rebinds += 1
+        else:
+            self._table = table
+        return removed
@@ -0,0 +1,107 @@
+import time
+import heapq
+import threading
+
+
+class MonotonicClock:
+    """
+    Real time from the monotonic high-resolution counter.
+    Never jumps with wall-clock (NTP) adjustments. All values are nanoseconds.
+    """
+    name = 'monotonic'
+    virtual = False
+
+    now_ns = staticmethod(time.perf_counter_ns)
+
+    def sleep_ns(self, ns):
+        """Sleeps for `ns` nanoseconds."""
+        time.sleep(ns / 1e9)
+
+    def wait_ns(self, event, ns=None):
+        """Waits up to `ns` nanoseconds (forever if None) for a threading.Event."""
+        return event.wait(None if ns is None else ns / 1e9)
+
+
+class VirtualClock:
+    """
+    Simulated time that only moves when something sleeps or waits on it.
+    Sleeps and timed waits return instantly after advancing the clock, so a
+    tick costs only the scroll loop's own work: a few microseconds, about
+    100x faster than real time at a 1 ms delay (less with smooth scrolling,
+    which emits several times per tick). Callbacks scheduled with
+    call_at() fire, in order, on the thread that advances time past them;
+    that is how a simulation presses and releases keys at exact instants.
+    """
+    name = 'virtual'
+    virtual = True
+
+    def __init__(self, start_ns=1_000_000_000):
+        # Starts past zero: code treats a zero timestamp as "never"
+        self._now = start_ns
+        self._timers = []  # heap of (due_ns, seq, callback)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def now_ns(self):
+        return self._now
+
+    def call_at(self, due_ns, callback):
+        """Schedules `callback()` for virtual time `due_ns`."""
+        with self._lock:
+            self._seq += 1
+            heapq.heappush(self._timers, (int(due_ns), self._seq, callback))
+
+    def call_later(self, delay_ns, callback):
+        """Schedules `callback()` `delay_ns` nanoseconds from now."""
+        self.call_at(self._now + delay_ns, callback)
+
+    def pending(self):
+        """Returns the number of callbacks not yet fired."""
+        return len(self._timers)
+
+    def _pop_due(self, until_ns):
+        """Pops the next callback due at or before `until_ns`, advancing to it."""
+        with self._lock:
+            if not self._timers or (until_ns is not None and self._timers[0][0] > until_ns):
+                return None
+            due, _, callback = heapq.heappop(self._timers)
+            self._now = max(self._now, due)
+            return callback
+
+    def advance(self, ns, event=None):
+        """
+        Moves time forward by `ns`, firing due callbacks on the way.
+        Stops early, at the firing callback's instant, once `event` is set.
+        Returns True if it stopped because of `event`.
+        """
+        until = self._now + int(ns)
+        timers = self._timers
+        # Peek before locking: most advances (a tick, a smooth-scroll gap)
+        # have nothing due and just move the clock
+        while timers and timers[0][0] <= until:
+            callback = self._pop_due(until)
+            if callback is None:
+                break
+            callback()
+            if event is not None and event.is_set():
+                return True
+        if until > self._now:
+            self._now = until
+        return False
+
+    def sleep_ns(self, ns):
+        self.advance(ns)
+
+    def wait_ns(self, event, ns=None):
+        if event.is_set():
+            return True
+        if ns is not None:
+            return self.advance(ns, event)
+        # Untimed: run scheduled callbacks until one sets the event;
+        # with nothing left to fire, block in real time like a real wait
+        while not event.is_set():
+            callback = self._pop_due(None)
+            if callback is None:
+                return event.wait()
+            callback()
+        return True
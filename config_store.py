@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import logging
+import threading
+from wakeups import audit
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigStore:
+    """
+    Dirty-tracked, debounced, atomic persistence for config.json.
+    update() only records the new settings; a background worker writes them
+    once edits have been quiet for `debounce` seconds, through a temp file
+    and os.replace so a crash can never leave a truncated config. When
+    nothing changed the worker sleeps without a timeout and does no I/O.
+    """
+
+    def __init__(self, path='config.json', debounce=1.0):
+        self.path = path
+        self.debounce = debounce
+        self.writes = 0
+        self._data = {}
+        self._version = 0        # Bumped on every accepted update
+        self._saved_version = 0  # Version last written to disk
+        self._dirty = False
+        self._due = 0.0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._worker = None
+        self._write_lock = threading.Lock()  # Serializes worker and flush() writes
+
+    def load(self, defaults=None):
+        """Reads the config file; returns defaults when missing or unreadable."""
+        data = dict(defaults or {})
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    data.update(json.load(f))
+            except Exception as e:
+                logger.warning(f"Failed to read {self.path}: {e}")
+        with self._cond:
+            self._data = dict(data)
+        return data
+
+    def update(self, settings):
+        """
+        Records new settings and schedules a debounced write.
+        Returns False (and schedules nothing) if nothing changed.
+        """
+        with self._cond:
+            if settings == self._data:
+                return False
+            self._data = dict(settings)
+            self._version += 1
+            self._dirty = True
+            self._due = time.monotonic() + self.debounce
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='config-writer', daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return True
+
+    @property
+    def dirty(self):
+        """True while there are changes not yet written to disk."""
+        return self._dirty
+
+    def _run(self):
+        """Worker thread: waits for dirty data, debounces, then writes."""
+        with self._cond:
+            while not self._closed:
+                if not self._dirty:
+                    self._cond.wait()
+                    audit.count('config-writer')
+                    continue
+                remaining = self._due - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    audit.count('config-writer')
+                    continue
+                data, version = self._data, self._version
+                self._dirty = False
+                self._cond.release()
+                try:
+                    self._write(data, version)
+                finally:
+                    self._cond.acquire()
+
+    def _write(self, data, version):
+        """
+        Writes atomically: temp file in the same directory, fsync, os.replace.
+        A failed write marks the store dirty again, to be retried after the debounce.
+        """
+        with self._write_lock:
+            if version <= self._saved_version:
+                return  # A newer snapshot already made it to disk
+            if self._write_file(data):
+                self._saved_version = version
+                return
+        with self._cond:
+            if version == self._version:  # Otherwise a newer update is already pending
+                self._dirty = True
+                self._due = time.monotonic() + self.debounce
+                self._cond.notify()
+
+    def _write_file(self, data):
+        """Returns True once the file is replaced, False if writing failed."""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.writes += 1
+            logger.debug(f"Settings written to {self.path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save settings: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+    def flush(self):
+        """Writes pending changes now, on the calling thread."""
+        with self._cond:
+            if not self._dirty:
+                return
+            data, version = self._data, self._version
+            self._dirty = False
+        self._write(data, version)
+
+    def close(self):
+        """Flushes pending changes and stops the worker."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._worker is not None:
+            self._worker.join(timeout=1.0)
+        self.flush()
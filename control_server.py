@@ -0,0 +1,235 @@
+"""
+Local control API for a running instance: JSON lines over a Unix socket.
+
+Each request is one JSON object per line, answered by one line:
+
+    {"id": 1, "cmd": "start_scrolling", "settings": {"key": "space", "delay": 5}}
+    {"id": 1, "ok": true, "result": true, "handled_ns": 123456789}
+
+Commands: ping, start_scrolling [settings], stop_scrolling,
+update_settings settings, switch_profile name, get_status, and
+activate/deactivate, which start and stop the wheel exactly like the bound
+key would. `handled_ns` is time.perf_counter_ns() right after the command
+ran, for measuring command-to-effect latency against emit timestamps.
+
+    python control_server.py /tmp/bhop.sock get_status
+    python control_server.py /tmp/bhop.sock update_settings '{"settings": {"strength": 5}}'
+    python control_server.py /tmp/bhop.sock ping --repeat 1000
+"""
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import selectors
+import threading
+from wakeups import audit
+
+logger = logging.getLogger(__name__)
+
+MAX_LINE = 65536
+
+
+class ControlServer:
+    """
+    Serves the control API for a BhopController on a Unix socket.
+    Clients may keep their connection open and send any number of requests;
+    one thread multiplexes all of them and blocks until something arrives.
+    `dispatch(fn)` runs each command, e.g. on the GUI thread; by default it
+    runs on the server thread.
+    """
+
+    def __init__(self, controller, path, dispatch=None):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise RuntimeError("Unix domain sockets are not supported on this platform")
+        self.controller = controller
+        self.path = path
+        self.dispatch = dispatch or (lambda fn: fn())
+        self.requests = 0
+        self._socket = None
+        self._thread = None
+        self._wake_r, self._wake_w = socket.socketpair()
+        self.commands = {
+            'ping': lambda request: 'pong',
+            'start_scrolling': self._start_scrolling,
+            'stop_scrolling': lambda request: controller.stop_scrolling(),
+            'update_settings': lambda request: controller.update_settings(request['settings']),
+            'switch_profile': lambda request: controller.switch_profile(request['name']),
+            'get_status': lambda request: controller.get_status(),
+            'activate': lambda request: self._scroller().start_scrolling(),
+            'deactivate': lambda request: self._scroller().stop_scrolling(),
+        }
+
+    def _start_scrolling(self, request):
+        settings = request.get('settings')
+        if settings is None:
+            # Re-arm with what was last used, or the active profile
+            controller = self.controller
+            settings = controller.current_settings or (
+                controller.profiles.settings() if controller.profiles is not None else {})
+        return self.controller.start_scrolling(settings)
+
+    def _scroller(self):
+        if self.controller.scroller is None:
+            raise RuntimeError("Scroller not started")
+        return self.controller.scroller
+
+    def start(self):
+        """Binds the socket (owner access only) and starts serving."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # Left over from a previous run
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(self.path)
+            os.chmod(self.path, 0o600)  # The socket injects input: owner only
+            sock.listen(8)
+        except OSError:
+            sock.close()
+            raise
+        self._socket = sock
+        self._thread = threading.Thread(target=self._run, name='control-server', daemon=True)
+        self._thread.start()
+        logger.info(f"Control socket listening on {self.path}")
+
+    def _run(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self._socket, selectors.EVENT_READ, None)
+        selector.register(self._wake_r, selectors.EVENT_READ, None)
+        buffers = {}  # client socket -> unparsed bytes
+        try:
+            while True:
+                ready = selector.select()
+                audit.count('control-server')
+                for key, _ in ready:
+                    sock = key.fileobj
+                    if sock is self._wake_r:
+                        return
+                    if sock is self._socket:
+                        try:
+                            conn, _ = sock.accept()
+                        except OSError:
+                            continue
+                        selector.register(conn, selectors.EVENT_READ, None)
+                        buffers[conn] = b''
+                    elif not self._read(sock, buffers):
+                        selector.unregister(sock)
+                        buffers.pop(sock, None)
+                        sock.close()
+        finally:
+            for conn in buffers:
+                conn.close()
+            selector.close()
+
+    def _read(self, conn, buffers):
+        """Handles every complete line from a client; returns False once it is gone."""
+        try:
+            data = conn.recv(MAX_LINE)
+        except OSError:
+            return False
+        if not data:
+            return False
+        buffer = buffers[conn] + data
+        *lines, rest = buffer.split(b'\n')
+        if len(rest) > MAX_LINE:
+            return False  # No newline in sight: not a JSON-lines client
+        buffers[conn] = rest
+        try:
+            for line in lines:
+                if line.strip():
+                    conn.sendall(self.handle(line) + b'\n')
+        except OSError:
+            return False
+        return True
+
+    def handle(self, line):
+        """Runs one JSON request line and returns the JSON response line."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            command = self.commands.get(request.get('cmd'))
+            if command is None:
+                raise ValueError(f"Unknown command: {request.get('cmd')}")
+            self.requests += 1
+            result = self.dispatch(lambda: command(request))
+            response = {'id': request_id, 'ok': True, 'result': result}
+        except Exception as e:
+            response = {'id': request_id, 'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        response['handled_ns'] = time.perf_counter_ns()
+        return json.dumps(response, separators=(',', ':'), default=str).encode('utf-8')
+
+    def stop(self):
+        """Stops serving, disconnects clients and removes the socket."""
+        if self._thread is not None:
+            self._wake_w.send(b'\x01')
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        self._wake_r.close()
+        self._wake_w.close()
+
+
+class ControlClient:
+    """Blocking client for the control socket; one request in flight at a time."""
+
+    def __init__(self, path, timeout=5.0):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+        self._file = self._socket.makefile('rb')
+        self._next_id = 0
+
+    def call(self, cmd, **args):
+        """Sends a command and returns the response dict."""
+        self._next_id += 1
+        request = dict(args, id=self._next_id, cmd=cmd)
+        self._socket.sendall(json.dumps(request, separators=(',', ':')).encode('utf-8') + b'\n')
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Control socket closed")
+        return json.loads(line)
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a command to a running Bhop Control")
+    parser.add_argument('socket', help="control socket path (main.py --control)")
+    parser.add_argument('cmd', help="command, e.g. get_status, start_scrolling, ping")
+    parser.add_argument('args', nargs='?', default='{}', help="JSON object of arguments")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="send the command N times and report round-trip times")
+    args = parser.parse_args()
+
+    client = ControlClient(args.socket)
+    try:
+        extra = json.loads(args.args)
+        rtts = []
+        for _ in range(args.repeat):
+            start = time.perf_counter_ns()
+            response = client.call(args.cmd, **extra)
+            rtts.append(time.perf_counter_ns() - start)
+    finally:
+        client.close()
+
+    if args.repeat > 1:
+        rtts.sort()
+        pick = lambda q: rtts[min(len(rtts) - 1, int(len(rtts) * q))] / 1000
+        print(f"{args.repeat} round trips: p50 {pick(0.5):.0f} us, p99 {pick(0.99):.0f} us, "
+              f"max {rtts[-1] / 1000:.0f} us")
+    print(json.dumps(response, indent=2))
+    sys.exit(0 if response.get('ok') else 1)
+
+
+if __name__ == '__main__':
+    main()
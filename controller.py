@@ -0,0 +1,236 @@
+import logging
+from scroller import AdvancedScroller
+from startup import trace
+
+logger = logging.getLogger(__name__)
+
+
+class Signal:
+    """
+    Minimal callback signal with the connect/emit shape of pyqtSignal.
+    Keeps the controller usable without importing Qt.
+    """
+    
+    def __init__(self):
+        self._slots = []
+    
+    def connect(self, slot):
+        """Connects a callable to the signal."""
+        self._slots.append(slot)
+    
+    def disconnect(self, slot):
+        """Disconnects a previously connected callable."""
+        self._slots.remove(slot)
+    
+    def emit(self, *args):
+        """Calls every connected slot with the given arguments."""
+        for slot in list(self._slots):
+            slot(*args)
+
+
+class BhopController:
+    """
+    Main controller class managing the application logic.
+    Implements MVC pattern for clean separation of concerns.
+    """
+    
+    def __init__(self, backend=None, listener=None, record=None, engine='thread', realtime=None):
+        # Signals for status updates
+        self.status_changed = Signal()  # message, color
+        self.error_occurred = Signal()  # message
+        self.profile_changed = Signal()  # profile name
+        self.activity_changed = Signal()  # True/False as scrolling starts/stops (hook thread)
+        
+        if record and engine == 'process':
+            # Emits happen in the engine process: a log of keys alone can't be replayed
+            raise ValueError("Session recording needs the thread engine")
+        self.backend = backend  # Emitter backend name/instance, None = default
+        self.listener = listener  # Key listener name/instance, None = default
+        self.record = record  # Session log path, None = no recording
+        self.engine = engine  # 'thread' or 'process' (scroll loop in a child process)
+        self.realtime = realtime  # Affinity/priority for the scroll loop, see realtime.py
+        self.recorder = None
+        self.scroller = None
+        self.is_running = False
+        self.current_settings = {}
+        self.profiles = None  # ProfileStore, see set_profiles()
+        self._profile_hooks = []
+        
+    def initialize_scroller(self):
+        """Initializes the scroller thread."""
+        try:
+            if self.scroller is None:
+                backend, listener = self.backend, self.listener
+                if self.record:
+                    # Record keys and emits as they pass through backend/listener
+                    from recording import SessionRecorder
+                    self.recorder = SessionRecorder(self.record)
+                    backend = self.recorder.wrap_backend(backend)
+                    listener = self.recorder.wrap_listener(listener)
+                    logger.info(f"Recording session to {self.record}")
+                if self.engine == 'process':
+                    # Deferred: only needed when the engine runs out of process
+                    from engine_process import ProcessScroller
+                    self.scroller = ProcessScroller(backend=backend, listener=listener,
+                                                    realtime=self.realtime)
+                else:
+                    self.scroller = AdvancedScroller(backend=backend, listener=listener,
+                                                     realtime=self.realtime)
+                self.scroller.on_activity = self.activity_changed.emit
+                self.scroller.start()
+                logger.info(f"Scroller {self.engine} initialized ({self.scroller.backend.name} backend)")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to initialize scroller: {e}")
+            self.error_occurred.emit(f"Failed to initialize scroller: {e}")
+            return False
+    
+    def start_scrolling(self, settings):
+        """Starts the scrolling with given settings."""
+        try:
+            if not self.initialize_scroller():
+                return False
+            
+            # Update scroller settings
+            self.scroller.update_settings(settings)
+            if self.recorder is not None:
+                self.recorder.settings(settings)
+            self.scroller.register_key_handlers()
+            self.register_profile_hotkeys()
+            
+            self.is_running = True
+            self.current_settings = settings
+            
+            key, mode = self.emit_active_status()
+            logger.info(f"Scrolling started with key: {key}, mode: {mode}")
+            trace.mark('armed')
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to start scrolling: {e}")
+            self.error_occurred.emit(f"Failed to start: {str(e)}")
+            return False
+    
+    def update_settings(self, settings):
+        """Applies settings changes (same keys as start_scrolling) to the running scroller."""
+        try:
+            self.current_settings = dict(self.current_settings, **settings)
+            if self.scroller is not None:
+                self.scroller.update_settings(settings)
+            if self.recorder is not None:
+                self.recorder.settings(self.current_settings)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update settings: {e}")
+            self.error_occurred.emit(f"Failed to update settings: {str(e)}")
+            return False
+    
+    def get_status(self):
+        """Returns the controller's state and, once it exists, the scroller's status."""
+        return {
+            'running': self.is_running,
+            'engine': self.engine,
+            'profile': self.profiles.active if self.profiles is not None else None,
+            'settings': self.current_settings,
+            'scroller': self.scroller.get_status() if self.scroller is not None else None
+        }
+    
+    def emit_active_status(self):
+        """Emits the 'Active' status line for the current settings; returns (key, mode)."""
+        key = self.current_settings.get('key', 'space').upper()
+        mode = "Hold" if self.current_settings.get('hold_mode', True) else "Toggle"
+        message = f"✅ Active | Key: {key} | Mode: {mode}"
+        if self.profiles is not None and len(self.profiles.names()) > 1:
+            message += f" | Profile: {self.profiles.active}"
+        self.status_changed.emit(message, "#00AA00")
+        return key, mode
+    
+    def set_profiles(self, profiles):
+        """Sets the ProfileStore used for profile switching and hotkeys."""
+        self.profiles = profiles
+        if self.is_running:
+            self.register_profile_hotkeys()
+    
+    def register_profile_hotkeys(self):
+        """Hooks every profile hotkey on the scroller's listener."""
+        self.unregister_profile_hotkeys()
+        if self.profiles is None or self.scroller is None or self.scroller.listener is None:
+            return
+        for hotkey, name in self.profiles.hotkeys().items():
+            hook = self.scroller.listener.hook(
+                hotkey, on_press=lambda name=name: self.switch_profile(name), suppress=False)
+            self._profile_hooks.append(hook)
+    
+    def unregister_profile_hotkeys(self):
+        """Removes all profile hotkeys."""
+        for hook in self._profile_hooks:
+            try:
+                self.scroller.listener.unhook(hook)
+            except Exception:
+                pass
+        self._profile_hooks = []
+    
+    def switch_profile(self, name):
+        """
+        Switches to a named profile.
+        The profile's precompiled snapshot and binding table are swapped into
+        the running scroller; unchanged hooks and the scroller thread stay up.
+        """
+        try:
+            if self.profiles is None:
+                raise KeyError("No profiles loaded")
+            config = self.profiles.activate(name)
+            self.current_settings = self.profiles.settings(name)
+            if self.scroller is not None:
+                self.scroller.apply_config(config, self.profiles.bindings(name),
+                                           self.current_settings.get('bindings'))
+            if self.recorder is not None:
+                self.recorder.settings(dict(config.to_dict(),
+                                            bindings=self.current_settings.get('bindings', [])))
+            
+            self.profile_changed.emit(name)
+            if self.is_running:
+                self.emit_active_status()
+            logger.info(f"Switched to profile: {name}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to switch profile: {e}")
+            self.error_occurred.emit(f"Failed to switch profile: {str(e)}")
+            return False
+    
+    def stop_scrolling(self):
+        """Stops the scrolling."""
+        try:
+            if self.scroller:
+                self.unregister_profile_hotkeys()
+                self.scroller.unregister_key_handlers()
+                self.scroller.stop_scrolling()
+                
+            self.is_running = False
+            self.status_changed.emit("⚫ Stopped", "#FF8C00")
+            
+            logger.info("Scrolling stopped")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to stop scrolling: {e}")
+            self.error_occurred.emit(f"Failed to stop: {str(e)}")
+            return False
+    
+    def metrics(self):
+        """Returns the scroller's counters (see AdvancedScroller.metrics), or None before it exists."""
+        scroller = self.scroller
+        return scroller.metrics() if scroller is not None else None
+    
+    def cleanup(self):
+        """Cleanup resources on exit."""
+        try:
+            if self.scroller:
+                self.scroller.stop()
+                logger.info("Scroller thread stopped")
+            if self.recorder is not None:
+                self.recorder.close()
+                logger.info(f"Session recorded to {self.record}")
+        except Exception as e:
+            logger.error(f"Error during cleanup: {e}")
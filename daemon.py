@@ -0,0 +1,93 @@
+import sys
+import os
+import signal
+import logging
+import threading
+from controller import BhopController
+from startup import trace
+from config_store import ConfigStore
+from profiles import ProfileStore
+from wakeups import audit
+
+logger = logging.getLogger(__name__)
+
+
+class HeadlessDaemon:
+    """
+    Runs the controller and scroller without any GUI.
+    Never imports PyQt6; settings come from the same config.json the GUI writes.
+    """
+
+    DEFAULT_SETTINGS = {
+        'key': 'space',
+        'delay': 1,
+        'strength': 1,
+        'hold_mode': True
+    }
+
+    def __init__(self, config_file='config.json', backend=None, listener=None, profile=None,
+                 record=None, engine='thread', realtime=None, metrics=None, control=None):
+        self.config_file = config_file
+        self.profile = profile
+        self.config_store = ConfigStore(config_file)
+        self.controller = BhopController(backend=backend, listener=listener, record=record,
+                                         engine=engine, realtime=realtime)
+        self._stop_event = threading.Event()
+        self.metrics_server = None
+        if metrics:
+            # Deferred: only needed when metrics are exported
+            from metrics_server import MetricsServer
+            self.metrics_server = MetricsServer(self.controller.metrics, metrics)
+        self.control_server = None
+        if control:
+            from control_server import ControlServer
+            self.control_server = ControlServer(self.controller, control)
+
+        # Controller status goes to the log instead of a window
+        self.controller.status_changed.connect(lambda message, color: logger.info(message))
+        self.controller.error_occurred.connect(lambda message: logger.error(message))
+
+    def load_settings(self):
+        """Loads settings from the config file, falling back to defaults."""
+        if not os.path.exists(self.config_file):
+            logger.warning(f"{self.config_file} not found, using defaults")
+        return self.config_store.load(self.DEFAULT_SETTINGS)
+
+    def request_stop(self, *args):
+        """Asks the daemon to shut down; safe to call from signal handlers."""
+        self._stop_event.set()
+
+    def run(self):
+        """Arms the scroller and blocks until SIGINT/SIGTERM."""
+        signal.signal(signal.SIGINT, self.request_stop)
+        signal.signal(signal.SIGTERM, self.request_stop)
+
+        profiles = ProfileStore.from_config(self.load_settings())
+        if self.profile:
+            profiles.activate(self.profile)
+        self.controller.set_profiles(profiles)
+
+        if not self.controller.start_scrolling(profiles.settings()):
+            return 1
+        if self.metrics_server is not None:
+            self.metrics_server.start()
+        if self.control_server is not None:
+            self.control_server.start()
+        trace.log_summary()
+
+        try:
+            # Windows only delivers Ctrl+C between waits, so poll there;
+            # elsewhere the main thread never wakes until a signal arrives
+            timeout = 1.0 if sys.platform == 'win32' else None
+            while not self._stop_event.wait(timeout):
+                audit.count('daemon')
+        finally:
+            logger.info("Headless daemon shutting down...")
+            if self.control_server is not None:
+                self.control_server.stop()
+            self.controller.stop_scrolling()
+            self.controller.cleanup()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+            audit.log_summary()
+        return 0
@@ -0,0 +1,395 @@
+import json
+import time
+import struct
+import logging
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from backends import EmitterBackend
+from scroller import AdvancedScroller
+from telemetry import TelemetryRing
+from settings import OVERLOAD_POLICIES
+
+logger = logging.getLogger(__name__)
+
+# Control block: one 8-byte slot per field, then the emission pattern as
+# JSON. The parent writes commands and settings under a seqlock (`seq` is odd
+# while a write is in progress); the child only reads them and writes `ready`.
+# A pattern too large for the block goes into a shared memory segment of its
+# own, numbered by `pattern_segment` (0 = inline), once per settings change.
+FIELDS = (
+    'seq', 'active', 'shutdown', 'report_seq', 'settings_version',
+    'delay_ms', 'strength', 'smooth_scrolling', 'acceleration', 'overload_policy',
+    'pattern_segment', 'pattern_segment_len', 'pattern_len', 'pattern', 'ready'
+)
+SLOTS = tuple(name for name in FIELDS if name != 'pattern')
+OFFSETS = {name: i * 8 for i, name in enumerate(SLOTS)}
+FLOAT_FIELDS = ('delay_ms',)
+INT = struct.Struct('<q')
+FLOAT = struct.Struct('<d')
+PATTERN_OFFSET = len(SLOTS) * 8
+PATTERN_SIZE = 4096  # Room for the JSON of a typical custom pattern
+CONTROL_SIZE = PATTERN_OFFSET + PATTERN_SIZE
+
+# Metrics kept by the engine's scroll loop; hook-side ones stay in the parent
+LOOP_METRICS = (
+    'units', 'ticks', 'overruns', 'skipped_periods', 'overloads', 'dropped_units',
+    'emit_duration_bounds_ns', 'emit_duration_buckets', 'emit_duration_sum_ns'
+)
+
+
+class ControlBlock:
+    """Typed view of the control fields at the start of a shared buffer."""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def get(self, name):
+        if name == 'pattern':
+            length = self.get('pattern_len')
+            return bytes(self.buffer[PATTERN_OFFSET:PATTERN_OFFSET + length])
+        fmt = FLOAT if name in FLOAT_FIELDS else INT
+        return fmt.unpack_from(self.buffer, OFFSETS[name])[0]
+
+    def set(self, name, value):
+        if name == 'pattern':
+            if len(value) > PATTERN_SIZE:
+                raise ValueError(f"Pattern too large for the control block ({len(value)} bytes)")
+            self.buffer[PATTERN_OFFSET:PATTERN_OFFSET + len(value)] = value
+            self.set('pattern_len', len(value))
+            return
+        fmt = FLOAT if name in FLOAT_FIELDS else INT
+        fmt.pack_into(self.buffer, OFFSETS[name], value)
+
+    def write(self, **fields):
+        """Writes fields as one seqlock-protected update. Single writer only."""
+        seq = self.get('seq')
+        self.set('seq', seq + 1)
+        for name, value in fields.items():
+            self.set(name, value)
+        self.set('seq', seq + 2)
+
+    def read(self, names):
+        """Returns a consistent {name: value} snapshot of the given fields."""
+        while True:
+            seq = self.get('seq')
+            if seq & 1:
+                continue  # Write in progress
+            values = {name: self.get(name) for name in names}
+            if self.get('seq') == seq:
+                return values
+
+
+def pattern_segment_name(shm_name, number):
+    """Name of the shared memory segment holding a large pattern."""
+    return f"{shm_name}_p{number}"
+
+
+def read_pattern(shm_name, state):
+    """
+    Returns the pattern JSON of a control block snapshot, or None if its
+    segment is already gone (a newer pattern replaced it).
+    """
+    if not state['pattern_segment']:
+        return state['pattern']
+    try:
+        segment = shared_memory.SharedMemory(
+            name=pattern_segment_name(shm_name, state['pattern_segment']))
+    except FileNotFoundError:
+        return None
+    try:
+        return bytes(segment.buf[:state['pattern_segment_len']])
+    finally:
+        segment.close()
+
+
+class SharedTelemetryRing(TelemetryRing):
+    """TelemetryRing whose arrays and head live in a shared buffer."""
+
+    def __init__(self, buffer, offset, capacity):
+        if capacity & (capacity - 1):
+            raise ValueError("Capacity must be a power of two")
+        self.capacity = capacity
+        self._mask = capacity - 1
+        view = memoryview(buffer)
+        self._head = view[offset:offset + 8].cast('q')
+        offset += 8
+        self.timestamps = view[offset:offset + 8 * capacity].cast('q')
+        offset += 8 * capacity
+        self.jitter = view[offset:offset + 8 * capacity].cast('q')
+        offset += 8 * capacity
+        self.strength = view[offset:offset + 2 * capacity].cast('H')
+        offset += 2 * capacity
+        self.units = view[offset:offset + 2 * capacity].cast('H')
+
+    @staticmethod
+    def size(capacity):
+        """Bytes needed for a ring of `capacity` samples."""
+        return 8 + 20 * capacity
+
+    @property
+    def head(self):
+        return self._head[0]
+
+    def push(self, timestamp, strength, units, jitter):
+        head = self._head[0]
+        i = head & self._mask
+        self.timestamps[i] = timestamp
+        self.strength[i] = strength
+        self.units[i] = units
+        self.jitter[i] = jitter
+        self._head[0] = head + 1  # Publish only after the slot is complete
+
+    def release(self):
+        """Releases the views so the shared buffer can be closed."""
+        for view in (self._head, self.timestamps, self.jitter, self.strength, self.units):
+            view.release()
+
+
+class RemoteBackend(EmitterBackend):
+    """Stands in for the emitter backend that lives in the engine process."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def scroll(self, dx, dy):
+        raise RuntimeError("Wheel events are emitted by the engine process")
+
+
+def engine_main(shm_name, telemetry_capacity, backend, wake_conn, report_conn, realtime=None):
+    """
+    Engine process entry point: runs an AdvancedScroller driven by the
+    control block. Wakes only when the parent writes to the wake pipe.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    block = ControlBlock(shm.buf)
+    scroller = AdvancedScroller(backend=backend, realtime=realtime)
+    scroller.telemetry = SharedTelemetryRing(shm.buf, CONTROL_SIZE, telemetry_capacity)
+    scroller.start()
+    block.set('ready', 1)
+
+    settings_version = None
+    report_seq = 0
+    try:
+        while True:
+            state = block.read(FIELDS[1:-1])
+            if state['shutdown']:
+                break
+            pattern = None
+            if state['settings_version'] != settings_version:
+                pattern = read_pattern(shm_name, state)
+            if pattern is not None:
+                settings_version = state['settings_version']
+                scroller.update_settings({
+                    'delay': state['delay_ms'],
+                    'strength': state['strength'],
+                    'smooth_scrolling': bool(state['smooth_scrolling']),
+                    'acceleration': bool(state['acceleration']),
+                    'overload_policy': OVERLOAD_POLICIES[state['overload_policy']],
+                    'pattern': json.loads(pattern or b'null')
+                })
+            if state['active']:
+                scroller.start_scrolling()
+            else:
+                scroller.stop_scrolling()
+            if state['report_seq'] != report_seq:
+                report_seq = state['report_seq']
+                status = scroller.get_status()
+                report_conn.send({'seq': report_seq, 'cpu_s': status['cpu_s'],
+                                  'realtime': status['realtime'],
+                                  'scheduler': status['scheduler'], 'latency': status['latency'],
+                                  'metrics': scroller.metrics()})
+
+            # Sleep until the parent signals, then drain coalesced signals
+            wake_conn.poll(None)
+            while wake_conn.poll(0):
+                wake_conn.recv_bytes()
+    except (EOFError, OSError, KeyboardInterrupt):
+        pass  # Parent went away
+    finally:
+        scroller.stop()
+        scroller.telemetry.release()
+        shm.close()
+
+
+class ProcessScroller(AdvancedScroller):
+    """
+    AdvancedScroller whose scroll loop runs in a child process, away from the
+    GUI's GIL. Key hooks, bindings and modes stay in this process; start/stop
+    and settings cross over as plain values in a shared-memory control block,
+    followed by one byte on a wake pipe, with no pickling per command.
+    Telemetry is read straight from shared memory; get_status() asks the
+    engine for its scheduler and latency stats.
+    """
+    TELEMETRY_CAPACITY = 4096
+
+    def __init__(self, backend=None, listener=None, realtime=None):
+        backend_name = backend.name if isinstance(backend, EmitterBackend) else backend
+        self._engine_backend = backend_name or 'pynput'
+        size = CONTROL_SIZE + SharedTelemetryRing.size(self.TELEMETRY_CAPACITY)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.block = ControlBlock(self._shm.buf)
+        self._block_lock = threading.Lock()  # Serializes writers in this process
+        self._wake_send = None
+        self._report_recv = None
+        self._report_seq = 0
+        self._report_lock = threading.Lock()  # One report round trip at a time
+        self._last_report = None  # Fallback when the engine doesn't answer in time
+        self._settings_seq = 0  # Snapshot versions can repeat across bindings
+        self._pattern_segment = None  # Segment of the current large pattern, if any
+        self._pattern_segments = 0
+        self.process = None
+        self._engine_realtime = dict(realtime) if realtime else None
+        super().__init__(backend=RemoteBackend(self._engine_backend), listener=listener)
+        self.telemetry = SharedTelemetryRing(self._shm.buf, CONTROL_SIZE, self.TELEMETRY_CAPACITY)
+
+    @property
+    def config(self):
+        return self._config
+
+    @config.setter
+    def config(self, settings):
+        # Every snapshot swap is forwarded to the engine
+        self._config = settings
+        self._settings_seq += 1
+        pattern = json.dumps(settings.pattern, separators=(',', ':')).encode('utf-8')
+        previous = self._pattern_segment
+        if len(pattern) > PATTERN_SIZE:
+            # Too large for the control block: hand it over in a segment of its own
+            self._pattern_segments += 1
+            segment = shared_memory.SharedMemory(
+                name=pattern_segment_name(self._shm.name, self._pattern_segments),
+                create=True, size=len(pattern))
+            segment.buf[:len(pattern)] = pattern
+            self._pattern_segment = segment
+            fields = {'pattern_segment': self._pattern_segments,
+                      'pattern_segment_len': len(pattern), 'pattern': b''}
+        else:
+            self._pattern_segment = None
+            fields = {'pattern_segment': 0, 'pattern': pattern}
+        self._publish_engine(
+            **fields,
+            settings_version=self._settings_seq,
+            delay_ms=float(settings.delay_ms),
+            strength=settings.strength,
+            smooth_scrolling=int(settings.smooth_scrolling),
+            acceleration=int(settings.acceleration),
+            overload_policy=OVERLOAD_POLICIES.index(settings.overload_policy))
+        if previous is not None:
+            # The engine only ever reads the latest pattern; a stale read just retries
+            self._release_segment(previous)
+
+    @staticmethod
+    def _release_segment(segment):
+        segment.close()
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _publish_engine(self, **fields):
+        """Writes control fields and wakes the engine."""
+        with self._block_lock:
+            self.block.write(**fields)
+            if self._wake_send is not None:
+                try:
+                    self._wake_send.send_bytes(b'\x01')
+                except OSError:
+                    pass  # Engine already gone
+
+    def start(self):
+        """Starts the engine process."""
+        ctx = multiprocessing.get_context('spawn')
+        wake_recv, self._wake_send = ctx.Pipe(duplex=False)
+        self._report_recv, report_send = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(
+            target=engine_main, name='scroll-engine', daemon=True,
+            args=(self._shm.name, self.TELEMETRY_CAPACITY, self._engine_backend,
+                  wake_recv, report_send, self._engine_realtime))
+        self.process.start()
+        wake_recv.close()
+        report_send.close()
+
+    def wait_ready(self, timeout=10.0):
+        """Blocks until the engine process is up; returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while not self.block.get('ready'):
+            if time.monotonic() > deadline or not self.process.is_alive():
+                return False
+            time.sleep(0.01)
+        return True
+
+    def start_scrolling(self):
+        if not self._scroll_active.is_set():
+            super().start_scrolling()
+            self._publish_engine(active=1)
+
+    def stop_scrolling(self):
+        if self._scroll_active.is_set():
+            super().stop_scrolling()
+            self._publish_engine(active=0)
+
+    def request_report(self, timeout=1.0):
+        """
+        Asks the engine for its current stats. Callers on different threads
+        (GUI, metrics, control socket) take turns on the report pipe; if the
+        engine doesn't answer, the last report is returned (None if there is none).
+        """
+        with self._report_lock:
+            if self.process is None or not self.process.is_alive():
+                return self._last_report
+            with self._block_lock:
+                self._report_seq += 1
+                seq = self._report_seq
+            self._publish_engine(report_seq=seq)
+            deadline = time.monotonic() + timeout
+            try:
+                while self._report_recv.poll(max(0.0, deadline - time.monotonic())):
+                    report = self._report_recv.recv()
+                    if report['seq'] == seq:
+                        self._last_report = report
+                        break
+            except (EOFError, OSError):
+                pass
+            return self._last_report
+
+    def get_status(self):
+        status = super().get_status()
+        status['engine'] = 'process'
+        status['engine_pid'] = self.process.pid if self.process else None
+        report = self.request_report()
+        if report:
+            status['cpu_s'] = report['cpu_s']
+            status['realtime'] = report['realtime']
+            status['scheduler'] = report['scheduler']
+            status['latency'] = report['latency']
+        return status
+
+    def metrics(self):
+        """Hook-side counters from this process, scroll loop counters from the engine."""
+        result = super().metrics()
+        report = self.request_report()
+        if report:
+            for name in LOOP_METRICS:
+                result[name] = report['metrics'][name]
+        return result
+
+    def stop(self):
+        """Stops the engine process and releases the shared memory."""
+        super().stop()
+        self._publish_engine(shutdown=1)
+        if self.process is not None:
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                logger.warning("Engine process did not exit, terminating it")
+                self.process.terminate()
+                self.process.join(timeout=1.0)
+            self._wake_send.close()
+            self._report_recv.close()
+            self._wake_send = None
+        self.telemetry.release()
+        if self._pattern_segment is not None:
+            self._release_segment(self._pattern_segment)
+            self._pattern_segment = None
+        self._shm.close()
+        self._shm.unlink()
@@ -1,6 +1,5 @@
 import sys
-import json
-import os
+import time
 from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QLineEdit, QDoubleSpinBox, QPushButton, 
                              QFrame, QSizePolicy, QSystemTrayIcon, QMenu,
@@ -10,42 +9,63 @@ from PyQt6.QtGui import (QFont, QPalette, QColor, QPainter, QRegion, QBrush,
                         QMouseEvent, QLinearGradient, QPen, QIcon, QPixmap,
                         QCursor)
 from PyQt6.QtCore import (Qt, QByteArray, QPoint, QPropertyAnimation, QEasingCurve,
-                         QRect, pyqtSignal, QTimer, QSize)
+                         QRect, pyqtSignal, QTimer, QSize, QEvent)
 from PyQt6.QtSvgWidgets import QSvgWidget
+from startup import trace
+from config_store import ConfigStore
+from profiles import ProfileStore
+from stats import PaintStats
 
 class BhopAppGUI(QWidget):
     """
     Enhanced GUI with minimized state and modern design.
     Provides advanced controls for the scroller with animations.
+    Overlay mode is meant for running on top of a game: an opaque window with
+    no effects, translucency or animations, painted from a cached pixmap.
     """
     # Custom signals
     settings_changed = pyqtSignal(dict)
+    profile_selected = pyqtSignal(str)
     
-    def __init__(self):
+    def __init__(self, config_file='config.json', overlay=False):
         super().__init__()
+        self.overlay = overlay
+        self.paint_stats = PaintStats()
+        self._background = None  # Cached background pixmap (overlay mode)
         self.old_pos = QPoint()
         self.is_minimized_mode = False
-        self.config_file = 'config.json'
+        self.config_file = config_file
+        self.config_store = ConfigStore(config_file)
         self.settings = self.load_settings()
+        self.profiles = ProfileStore.from_config(self.settings)
+        self._applying_settings = False
+        self.profile_menu = None
         self.tray_icon = None
         self.animation = None
+        self.compact_widget = None  # Built on first switch to compact mode
         self.init_ui()
-        self.setup_tray_icon()
         self.apply_settings()
+        self.connect_auto_save()
 
     def init_ui(self):
         self.setWindowTitle('Bhop Script Control')
         self.setGeometry(100, 100, 420, 380)
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint)
-        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        
-        # Add drop shadow effect
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(20)
-        shadow.setXOffset(0)
-        shadow.setYOffset(0)
-        shadow.setColor(QColor(0, 0, 0, 80))
-        self.setGraphicsEffect(shadow)
+        
+        if self.overlay:
+            # Opaque window: Qt neither erases nor composites what's behind it
+            self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+            self.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground)
+        else:
+            self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+            
+            # Add drop shadow effect
+            shadow = QGraphicsDropShadowEffect()
+            shadow.setBlurRadius(20)
+            shadow.setXOffset(0)
+            shadow.setYOffset(0)
+            shadow.setColor(QColor(0, 0, 0, 80))
+            self.setGraphicsEffect(shadow)
 
         # --- Title Bar ---
         self.title_bar = self.create_title_bar()
@@ -57,24 +77,14 @@ class BhopAppGUI(QWidget):
         self.main_layout.setSpacing(12)
         self.setLayout(self.main_layout)
         
-        # Create normal and compact widgets
-        self.normal_widget = self.create_normal_view()
-        self.compact_widget = self.create_compact_view()
-        self.compact_widget.hide()
-        
+        # Create normal widget; the compact one is deferred until first use
+        with trace.phase('gui.normal_view'):
+            self.normal_widget = self.create_normal_view()
         self.main_layout.addWidget(self.normal_widget)
-        self.main_layout.addWidget(self.compact_widget)
         
         # Apply stylesheet after all widgets are created
-        self.apply_stylesheet()
-
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setBrush(QBrush(QColor(255, 255, 255, 240))) # Slightly transparent white
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawRoundedRect(self.rect(), 10, 10) # Less rounded corners
-        # super().paintEvent(event) # Don't call super, we are handling the painting
+        with trace.phase('gui.stylesheet'):
+            self.apply_stylesheet()
 
     def mousePressEvent(self, event: QMouseEvent):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -252,6 +262,16 @@ class BhopAppGUI(QWidget):
             }
         """)
         
+        # Live telemetry, refreshed at a fixed rate while running
+        self.telemetry_label = QLabel("")
+        self.telemetry_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.telemetry_label.setStyleSheet("""
+            QLabel {
+                color: #666666;
+                font-size: 9pt;
+            }
+        """)
+        
         # Advanced Settings
         settings_widget = self.create_advanced_settings()
         
@@ -260,6 +280,7 @@ class BhopAppGUI(QWidget):
         
         layout.addWidget(logo_widget, alignment=Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.status_label)
+        layout.addWidget(self.telemetry_label)
         layout.addWidget(settings_widget)
         layout.addWidget(button_widget)
         
@@ -294,12 +315,29 @@ class BhopAppGUI(QWidget):
             }
         """)
         
+        # Compact live telemetry
+        self.compact_telemetry_label = QLabel(self.telemetry_label.text())
+        self.compact_telemetry_label.setStyleSheet("""
+            QLabel {
+                color: #666666;
+                font-size: 8pt;
+            }
+        """)
+        
         # Compact controls
         self.compact_start = QPushButton("▶")
         self.compact_stop = QPushButton("■")
         self.compact_start.setFixedSize(35, 35)
         self.compact_stop.setFixedSize(35, 35)
-        self.compact_stop.setEnabled(False)
+        
+        # Mirror the normal view's buttons and state, it may already be running
+        self.compact_start.clicked.connect(self.start_button.click)
+        self.compact_stop.clicked.connect(self.stop_button.click)
+        self.compact_start.setEnabled(self.start_button.isEnabled())
+        self.compact_stop.setEnabled(self.stop_button.isEnabled())
+        if self.stop_button.isEnabled():
+            self.compact_status.setText("🟢")
+            self.compact_status.setStyleSheet("QLabel { color: #00AA00; font-size: 20pt; }")
         
         compact_button_style = """
             QPushButton {
@@ -330,6 +368,7 @@ class BhopAppGUI(QWidget):
         
         layout.addWidget(self.compact_status)
         layout.addWidget(self.compact_key_label)
+        layout.addWidget(self.compact_telemetry_label)
         layout.addStretch()
         layout.addWidget(self.compact_start)
         layout.addWidget(self.compact_stop)
@@ -525,6 +564,10 @@ class BhopAppGUI(QWidget):
             self.compact_button.setToolTip("Compact Mode")
         else:
             # Switch to compact mode
+            if self.compact_widget is None:
+                with trace.phase('gui.compact_view'):
+                    self.compact_widget = self.create_compact_view()
+                    self.main_layout.addWidget(self.compact_widget)
             self.animate_resize(320, 120)
             self.normal_widget.hide()
             self.compact_widget.show()
@@ -536,7 +579,10 @@ class BhopAppGUI(QWidget):
             self.compact_key_label.setText(f"Key: {key.upper()}")
     
     def animate_resize(self, width, height):
-        """Animates window resize."""
+        """Animates window resize (instant in overlay mode)."""
+        if self.overlay:
+            self.resize(width, height)
+            return
         self.animation = QPropertyAnimation(self, b"geometry")
         self.animation.setDuration(200)
         self.animation.setStartValue(self.geometry())
@@ -545,8 +591,16 @@ class BhopAppGUI(QWidget):
         self.animation.setEasingCurve(QEasingCurve.Type.InOutQuad)
         self.animation.start()
     
+    def showEvent(self, event):
+        """Defers tray icon creation until the window is first on screen."""
+        super().showEvent(event)
+        if self.tray_icon is None:
+            QTimer.singleShot(0, self.setup_tray_icon)
+    
     def setup_tray_icon(self):
         """Sets up system tray icon."""
+        if self.tray_icon is not None:
+            return
         if QSystemTrayIcon.isSystemTrayAvailable():
             self.tray_icon = QSystemTrayIcon(self)
             # Create a simple orange icon
@@ -566,6 +620,8 @@ class BhopAppGUI(QWidget):
             tray_menu = QMenu()
             show_action = tray_menu.addAction("Show")
             show_action.triggered.connect(self.show)
+            self.profile_menu = tray_menu.addMenu("Profiles")
+            self.update_profile_menu()
             tray_menu.addSeparator()
             quit_action = tray_menu.addAction("Quit")
             quit_action.triggered.connect(self.close)
@@ -573,6 +629,28 @@ class BhopAppGUI(QWidget):
             self.tray_icon.setContextMenu(tray_menu)
             self.tray_icon.activated.connect(self.on_tray_activated)
             self.tray_icon.show()
+            trace.mark('tray')
+    
+    def update_profile_menu(self):
+        """Rebuilds the tray's profile list, checking the active profile."""
+        if self.profile_menu is None:
+            return
+        self.profile_menu.clear()
+        for name in self.profiles.names():
+            action = self.profile_menu.addAction(name)
+            action.setCheckable(True)
+            action.setChecked(name == self.profiles.active)
+            action.triggered.connect(lambda checked, name=name: self.profile_selected.emit(name))
+    
+    def show_profile(self, name):
+        """Shows a profile's values in the UI after a switch."""
+        self.profiles.activate(name)
+        self.settings = self.profiles.to_config(self.settings)
+        self.apply_settings()
+        self.save_settings()
+        self.update_profile_menu()
+        if self.compact_widget is not None:
+            self.compact_key_label.setText(f"Key: {self.key_input.currentText().upper()}")
     
     def on_tray_activated(self, reason):
         """Handles tray icon activation."""
@@ -583,58 +661,121 @@ class BhopAppGUI(QWidget):
     
     def load_settings(self):
         """Loads settings from config file."""
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        return {
+        return self.config_store.load({
             'key': 'space',
             'delay': 1,
             'strength': 1,
             'hold_mode': True
-        }
+        })
     
     def save_settings(self):
-        """Saves current settings to config file."""
-        settings = {
+        """
+        Saves current settings to config file.
+        Never blocks on disk: the config store only writes when something
+        changed, debounced, on its background worker. Edits go to the
+        active profile.
+        """
+        if self._applying_settings:
+            return
+        self.profiles.update(self.profiles.active, {
             'key': self.key_input.currentText() if hasattr(self, 'key_input') else 'space',
             'delay': self.delay_input.value() if hasattr(self, 'delay_input') else 1,
             'strength': self.strength_slider.value() if hasattr(self, 'strength_slider') else 1,
             'hold_mode': self.hold_mode.isChecked() if hasattr(self, 'hold_mode') else True
-        }
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(settings, f, indent=2)
-        except Exception as e:
-            print(f"Failed to save settings: {e}")
+        })
+        self.settings = self.profiles.to_config(self.settings)
+        self.config_store.update(self.settings)
+    
+    def connect_auto_save(self):
+        """Saves settings after every edit (the store debounces the writes)."""
+        self.key_input.currentTextChanged.connect(self.save_settings)
+        self.delay_input.valueChanged.connect(self.save_settings)
+        self.strength_slider.valueChanged.connect(self.save_settings)
+        self.hold_mode.toggled.connect(self.save_settings)
     
     def apply_settings(self):
         """Applies loaded settings to UI."""
-        if hasattr(self, 'key_input'):
-            self.key_input.setCurrentText(self.settings.get('key', 'space'))
-        if hasattr(self, 'delay_input'):
-            self.delay_input.setValue(self.settings.get('delay', 1))
-        if hasattr(self, 'strength_slider'):
-            self.strength_slider.setValue(self.settings.get('strength', 1))
-        if hasattr(self, 'hold_mode'):
-            self.hold_mode.setChecked(self.settings.get('hold_mode', True))
+        # Widgets are set one at a time; don't save the half-applied state
+        self._applying_settings = True
+        try:
+            if hasattr(self, 'key_input'):
+                self.key_input.setCurrentText(self.settings.get('key', 'space'))
+            if hasattr(self, 'delay_input'):
+                self.delay_input.setValue(self.settings.get('delay', 1))
+            if hasattr(self, 'strength_slider'):
+                self.strength_slider.setValue(self.settings.get('strength', 1))
+            if hasattr(self, 'hold_mode'):
+                self.hold_mode.setChecked(self.settings.get('hold_mode', True))
+        finally:
+            self._applying_settings = False
+    
+    def event(self, event):
+        """Times every repaint pass (a backing-store sync of the whole window)."""
+        if event.type() != QEvent.Type.UpdateRequest:
+            return super().event(event)
+        start = time.perf_counter_ns()
+        result = super().event(event)
+        self.paint_stats.pass_duration.record(time.perf_counter_ns() - start)
+        self.paint_stats.passes += 1
+        return result
     
     def paintEvent(self, event):
         """Custom paint event with gradient background."""
+        start = time.perf_counter_ns()
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = event.rect()
         
-        # Create gradient background
+        if self.overlay:
+            # Blit only the dirty part of the cached background
+            if self._background is None or self._background.size() != self.size():
+                self._background = self.render_background()
+            painter.drawPixmap(rect, self._background, rect)
+        else:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            self.draw_background(painter)
+        painter.end()
+        
+        stats = self.paint_stats
+        stats.background_duration.record(time.perf_counter_ns() - start)
+        stats.background_paints += 1
+        stats.background_pixels += rect.width() * rect.height()
+    
+    def draw_background(self, painter, rounded=True):
+        """Draws the gradient window background."""
         gradient = QLinearGradient(0, 0, 0, self.height())
         gradient.setColorAt(0, QColor(255, 255, 255, 245))
         gradient.setColorAt(1, QColor(255, 248, 240, 245))
         
         painter.setBrush(QBrush(gradient))
         painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawRoundedRect(self.rect(), 12, 12)
+        if rounded:
+            painter.drawRoundedRect(self.rect(), 12, 12)
+        else:
+            painter.drawRect(self.rect())
+    
+    def render_background(self):
+        """Renders the static background into a pixmap, rebuilt only on resize."""
+        pixmap = QPixmap(self.size())
+        pixmap.fill(QColor(255, 255, 255))
+        painter = QPainter(pixmap)
+        self.draw_background(painter, rounded=False)
+        painter.end()
+        return pixmap
 
+    def show_telemetry(self, sample):
+        """Shows a telemetry sample (see TelemetryReader) in both views; None clears it."""
+        if sample is None:
+            text = compact_text = ""
+        else:
+            text = (f"{sample['events_per_sec']:.0f} events/s | Strength {sample['strength']} | "
+                    f"Jitter {sample['jitter_us']:.0f} us (max {sample['jitter_max_us']:.0f})")
+            compact_text = f"{sample['events_per_sec']:.0f}/s  x{sample['strength']}  ±{sample['jitter_us']:.0f}us"
+        # Unchanged text would still cost a relayout and repaint
+        if self.telemetry_label.text() != text:
+            self.telemetry_label.setText(text)
+        if self.compact_widget is not None and self.compact_telemetry_label.text() != compact_text:
+            self.compact_telemetry_label.setText(compact_text)
+    
     def set_status_running(self):
         """Updates UI to reflect 'Running' state."""
         self.status_label.setText("Status: Running")
@@ -0,0 +1,299 @@
+import os
+import sys
+import glob
+import struct
+import select
+import threading
+from wakeups import audit
+
+
+class KeyListener:
+    """
+    Base class for key listener backends.
+    A listener calls on_press/on_release callbacks for the keys hooked on it.
+    """
+    name = 'base'
+
+    def hook(self, key, on_press=None, on_release=None, suppress=True):
+        """Hooks a key by name and returns a handle for unhook()."""
+        raise NotImplementedError
+
+    def unhook(self, handle):
+        """Removes a hook returned by hook()."""
+        raise NotImplementedError
+
+    def close(self):
+        """Stops the listener and releases its resources."""
+        pass
+
+
+class KeyboardListener(KeyListener):
+    """Global hook through the `keyboard` package (Windows, Linux as root)."""
+    name = 'keyboard'
+
+    def __init__(self):
+        import keyboard
+        self._keyboard = keyboard
+
+    def hook(self, key, on_press=None, on_release=None, suppress=True):
+        hooks = []
+        if on_press is not None:
+            hooks.append(self._keyboard.on_press_key(key, lambda _: on_press(), suppress=suppress))
+        if on_release is not None:
+            hooks.append(self._keyboard.on_release_key(key, lambda _: on_release(), suppress=suppress))
+        return hooks
+
+    def unhook(self, handle):
+        for hook in handle:
+            try:
+                self._keyboard.unhook(hook)
+            except Exception:
+                pass
+
+
+# linux/input-event-codes.h key codes for the names the GUI offers
+EVDEV_KEY_CODES = {
+    'esc': (1,), 'backspace': (14,), 'tab': (15,), 'enter': (28,), 'space': (57,),
+    'capslock': (58,), 'ctrl': (29, 97), 'shift': (42, 54), 'alt': (56, 100),
+    'left ctrl': (29,), 'right ctrl': (97,), 'left shift': (42,), 'right shift': (54,),
+    'left alt': (56,), 'right alt': (100,),
+    'mouse1': (0x110,), 'mouse2': (0x111,), 'mouse3': (0x112,),
+    'mouse4': (0x113,), 'mouse5': (0x114,),
+}
+EVDEV_KEY_CODES.update((c, (code,)) for c, code in zip('1234567890', range(2, 12)))
+EVDEV_KEY_CODES.update((c, (code,)) for c, code in zip('qwertyuiop', range(16, 26)))
+EVDEV_KEY_CODES.update((c, (code,)) for c, code in zip('asdfghjkl', range(30, 39)))
+EVDEV_KEY_CODES.update((c, (code,)) for c, code in zip('zxcvbnm', range(44, 51)))
+EVDEV_KEY_CODES.update((f'f{n}', (code,)) for n, code in zip(range(1, 11), range(59, 69)))
+EVDEV_KEY_CODES.update({'f11': (87,), 'f12': (88,)})
+
+
+class EvdevListener(KeyListener):
+    """
+    Linux listener that reads raw input_event structs from /dev/input/event*.
+    Only devices that can produce a bound key are opened, all of them are
+    multiplexed with epoll on one thread, and reads are decoded in bulk.
+    Callbacks run only for bound key codes; every other keystroke is dropped
+    after a dict lookup. Needs read access to the devices (root or the
+    `input` group). Keys cannot be suppressed, so `suppress` is ignored.
+
+    `devices` may name explicit paths, including a FIFO or regular file
+    holding recorded input_event records, as a stand-in for real devices.
+    """
+    name = 'evdev'
+
+    EV_KEY = 0x01
+    KEY_PRESS = 1
+    KEY_RELEASE = 0
+    # struct input_event {struct timeval time; __u16 type; __u16 code; __s32 value;}
+    EVENT = struct.Struct('llHHi')
+    READ_EVENTS = 64  # Events decoded per read
+    KEY_BITS_SIZE = 96  # (KEY_MAX + 1) / 8
+
+    def __init__(self, devices=None):
+        if not sys.platform.startswith('linux'):
+            raise RuntimeError("evdev listener is only available on Linux")
+        self._explicit_devices = devices
+        self._bindings = {}  # code -> [(handle, on_press, on_release)]
+        self._lock = threading.Lock()  # Guards binding changes, not dispatch
+        self._next_handle = 0
+        self._fds = {}  # fd -> path
+        self._files = set()  # Regular-file stand-ins epoll can't watch
+        self._epoll = select.epoll()
+        self._wake_r, self._wake_w = os.pipe()
+        self._epoll.register(self._wake_r, select.EPOLLIN)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='evdev-listener', daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def key_codes(key):
+        """Returns the evdev key codes for a key name."""
+        codes = EVDEV_KEY_CODES.get(key.lower())
+        if codes is None:
+            raise ValueError(f"Unsupported key for evdev listener: {key}")
+        return codes
+
+    def hook(self, key, on_press=None, on_release=None, suppress=True):
+        codes = self.key_codes(key)
+        with self._lock:
+            self._next_handle += 1
+            handle = (self._next_handle, codes)
+            # Copy-on-write so the reader thread never sees a half-updated list
+            bindings = dict(self._bindings)
+            for code in codes:
+                bindings[code] = bindings.get(code, []) + [(handle, on_press, on_release)]
+            self._bindings = bindings
+            self._refresh_devices()
+        return handle
+
+    def unhook(self, handle):
+        with self._lock:
+            bindings = dict(self._bindings)
+            for code in handle[1]:
+                remaining = [b for b in bindings.get(code, []) if b[0] != handle]
+                if remaining:
+                    bindings[code] = remaining
+                else:
+                    bindings.pop(code, None)
+            self._bindings = bindings
+            self._refresh_devices()
+
+    def _device_key_bits(self, fd):
+        """Returns the EV_KEY capability bitmap of a device, or None if unknown."""
+        import fcntl
+        # EVIOCGBIT(EV_KEY, len) = _IOC(_IOC_READ, 'E', 0x20 + EV_KEY, len)
+        request = (2 << 30) | (self.KEY_BITS_SIZE << 16) | (ord('E') << 8) | (0x20 + self.EV_KEY)
+        try:
+            return fcntl.ioctl(fd, request, bytes(self.KEY_BITS_SIZE))
+        except OSError:
+            return None
+
+    def _wanted(self, fd):
+        """True if the device can produce any bound key code."""
+        bits = self._device_key_bits(fd)
+        if bits is None:
+            return True  # Stand-ins have no capabilities to query
+        return any(bits[code >> 3] & (1 << (code & 7)) for code in self._bindings)
+
+    def _refresh_devices(self):
+        """Opens devices that can produce bound keys and closes the rest."""
+        if self._explicit_devices is not None:
+            paths = list(self._explicit_devices)
+        else:
+            paths = sorted(glob.glob('/dev/input/event*'))
+
+        open_paths = {path: fd for fd, path in self._fds.items()}
+        for path in paths:
+            if path in open_paths:
+                fd = open_paths.pop(path)
+                if self._bindings and (fd in self._files or self._wanted(fd)):
+                    continue
+                self._close_fd(fd)
+                continue
+            if not self._bindings:
+                continue
+            try:
+                fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+            except OSError:
+                continue
+            if not self._wanted(fd):
+                os.close(fd)
+                continue
+            self._fds[fd] = path
+            try:
+                self._epoll.register(fd, select.EPOLLIN)
+            except PermissionError:
+                # Regular files are always readable and can't be polled
+                self._files.add(fd)
+        for fd in open_paths.values():
+            self._close_fd(fd)
+        os.write(self._wake_w, b'\0')
+
+    def _close_fd(self, fd):
+        self._fds.pop(fd, None)
+        if fd in self._files:
+            self._files.discard(fd)
+        else:
+            try:
+                self._epoll.unregister(fd)
+            except (OSError, ValueError):
+                pass
+        os.close(fd)
+
+    def _run(self):
+        """Reader thread: waits on all devices and dispatches bound key events."""
+        size = self.EVENT.size
+        chunk = size * self.READ_EVENTS
+        while not self._closed:
+            with self._lock:
+                timeout = 0 if self._files else -1
+            try:
+                ready = self._epoll.poll(timeout)
+            except (OSError, ValueError):
+                break
+            audit.count('evdev-listener')
+            # Read under the lock, so hook()/unhook() can't close an fd (or
+            # open another under the same number) halfway; dispatch outside it
+            batches = []
+            with self._lock:
+                for fd in [fd for fd, _ in ready] + list(self._files):
+                    if fd == self._wake_r:
+                        os.read(self._wake_r, 4096)
+                        continue
+                    if fd not in self._fds:
+                        continue  # Closed since the poll
+                    if fd in self._files:
+                        # Stand-in files are read whole, once, so the loop never spins on them
+                        data = self._read_file(fd, chunk)
+                        self._close_fd(fd)
+                    else:
+                        try:
+                            data = os.read(fd, chunk)
+                        except BlockingIOError:
+                            continue
+                        except OSError:
+                            data = b''
+                        if not data:
+                            # Device unplugged or FIFO writer gone
+                            self._close_fd(fd)
+                            continue
+                    batches.append(data)
+            for data in batches:
+                self._dispatch(data[:len(data) - len(data) % size])
+
+    @staticmethod
+    def _read_file(fd, chunk):
+        """Reads a regular file to the end."""
+        parts = []
+        while True:
+            try:
+                data = os.read(fd, chunk)
+            except OSError:
+                break
+            if not data:
+                break
+            parts.append(data)
+        return b''.join(parts)
+
+    def _dispatch(self, data):
+        """Decodes a batch of input_event records and fires bound callbacks."""
+        bindings = self._bindings
+        ev_key = self.EV_KEY
+        for _sec, _usec, ev_type, code, value in self.EVENT.iter_unpack(data):
+            if ev_type != ev_key:
+                continue
+            targets = bindings.get(code)
+            if targets is None:
+                continue
+            # value 2 is autorepeat; holding a key must not re-trigger toggles
+            for _handle, on_press, on_release in targets:
+                if value == self.KEY_PRESS and on_press is not None:
+                    on_press()
+                elif value == self.KEY_RELEASE and on_release is not None:
+                    on_release()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            os.write(self._wake_w, b'\0')
+        self._thread.join(timeout=1.0)
+        with self._lock:
+            for fd in list(self._fds):
+                self._close_fd(fd)
+            self._epoll.close()
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+
+
+LISTENERS = {
+    KeyboardListener.name: KeyboardListener,
+    EvdevListener.name: EvdevListener,
+}
+
+
+def create_listener(name='keyboard', **kwargs):
+    """Creates a key listener backend by name."""
+    if name not in LISTENERS:
+        raise ValueError(f"Unknown key listener: {name}")
+    return LISTENERS[name](**kwargs)
@@ -0,0 +1,188 @@
+import os
+import socket
+import logging
+import selectors
+import threading
+from wakeups import audit
+
+logger = logging.getLogger(__name__)
+
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+MAX_REQUEST = 8192
+
+# name, type, help, key in the scroller's metrics() dict
+METRICS = (
+    ('bhop_up', 'gauge', "1 once the scroller exists.", None),
+    ('bhop_active', 'gauge', "1 while scrolling.", 'active'),
+    ('bhop_units_total', 'counter', "Wheel units emitted.", 'units'),
+    ('bhop_ticks_total', 'counter', "Scroll loop ticks.", 'ticks'),
+    ('bhop_overruns_total', 'counter', "Ticks that started after their deadline.", 'overruns'),
+    ('bhop_skipped_periods_total', 'counter', "Whole tick periods skipped after overruns.",
+     'skipped_periods'),
+    ('bhop_overloads_total', 'counter', "Ticks whose backend calls didn't fit the tick period.", 'overloads'),
+    ('bhop_dropped_units_total', 'counter', "Units dropped under the 'drop' overload policy.",
+     'dropped_units'),
+    ('bhop_hook_events_total', 'counter', "Bound key presses and releases.", 'hook_events'),
+    ('bhop_activations_total', 'counter', "Times scrolling was started.", 'activations'),
+    ('bhop_active_seconds_total', 'counter', "Time spent scrolling.", 'active_seconds'),
+)
+
+
+def render(metrics):
+    """Renders a scroller metrics() dict (or None) in the Prometheus text format."""
+    lines = []
+    for name, kind, text, key in METRICS:
+        if key is None:
+            value = 0 if metrics is None else 1
+        elif metrics is None:
+            continue
+        else:
+            value = metrics[key]
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value}")
+
+    if metrics is not None:
+        name = 'bhop_emit_duration_seconds'
+        buckets = metrics['emit_duration_buckets']
+        lines.append(f"# HELP {name} Time spent inside the emitter backend per tick.")
+        lines.append(f"# TYPE {name} histogram")
+        for bound, count in zip(metrics['emit_duration_bounds_ns'], buckets):
+            lines.append(f'{name}_bucket{{le="{bound / 1e9:g}"}} {count}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {buckets[-1]}')
+        lines.append(f"{name}_sum {metrics['emit_duration_sum_ns'] / 1e9:.9f}")
+        lines.append(f"{name}_count {buckets[-1]}")
+    lines.append('')
+    return '\n'.join(lines).encode('utf-8')
+
+
+def parse_address(address):
+    """
+    Parses 'PORT', 'HOST:PORT' or 'unix:PATH'. TCP is loopback only.
+    Returns (family, address).
+    """
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[5:]
+    host, _, port = address.rpartition(':')
+    host = host.strip('[]') or '127.0.0.1'
+    if host not in LOOPBACK_HOSTS:
+        raise ValueError(f"Metrics are served on localhost only, not {host}")
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    return family, (host, int(port))
+
+
+class MetricsServer:
+    """
+    Serves GET /metrics in the Prometheus text format on localhost or a Unix
+    socket. Each scrape calls `collect()` (e.g. BhopController.metrics), which
+    only reads counters the scroller already keeps. One thread answers
+    requests one at a time and blocks until a connection or stop(), so an
+    idle server never wakes up.
+    """
+
+    def __init__(self, collect, address):
+        self.collect = collect
+        self.family, self.address = parse_address(address)
+        self.scrapes = 0
+        self._socket = None
+        self._thread = None
+        self._wake_r, self._wake_w = socket.socketpair()
+
+    def start(self):
+        """Binds the socket and starts serving."""
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        try:
+            if self.family == socket.AF_UNIX:
+                if os.path.exists(self.address):
+                    os.unlink(self.address)  # Left over from a previous run
+            else:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(self.address)
+            sock.listen(8)
+        except OSError:
+            sock.close()
+            raise
+        self._socket = sock
+        if self.family != socket.AF_UNIX:
+            self.address = sock.getsockname()[:2]  # Port 0 picks a free port
+        self._thread = threading.Thread(target=self._run, name='metrics-server', daemon=True)
+        self._thread.start()
+        logger.info(f"Serving metrics on {self.url}")
+
+    @property
+    def url(self):
+        if self.family == socket.AF_UNIX:
+            return f"unix:{self.address}"
+        host, port = self.address
+        return f"http://{host}:{port}/metrics"
+
+    def _run(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self._socket, selectors.EVENT_READ)
+        selector.register(self._wake_r, selectors.EVENT_READ)
+        try:
+            while True:
+                ready = selector.select()
+                audit.count('metrics-server')
+                if any(key.fileobj is self._wake_r for key, _ in ready):
+                    break
+                try:
+                    conn, _ = self._socket.accept()
+                except OSError:
+                    continue
+                with conn:
+                    self._handle(conn)
+        finally:
+            selector.close()
+
+    def _handle(self, conn):
+        """Answers one HTTP request."""
+        conn.settimeout(1.0)
+        request = b''
+        try:
+            while b'\r\n\r\n' not in request and len(request) < MAX_REQUEST:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    break
+                request += chunk
+            parts = request.split(b'\r\n', 1)[0].split()
+            if len(parts) < 2 or parts[0] != b'GET':
+                self._respond(conn, '405 Method Not Allowed', b'')
+            elif parts[1].split(b'?', 1)[0] not in (b'/metrics', b'/'):
+                self._respond(conn, '404 Not Found', b'')
+            else:
+                self.scrapes += 1
+                self._respond(conn, '200 OK', render(self.collect()))
+        except OSError as e:
+            logger.debug(f"Metrics request failed: {e}")
+        except Exception as e:
+            logger.error(f"Error rendering metrics: {e}")
+            try:
+                self._respond(conn, '500 Internal Server Error', b'')
+            except OSError:
+                pass
+
+    @staticmethod
+    def _respond(conn, status, body):
+        head = (f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n").encode('ascii')
+        conn.sendall(head + body)
+
+    def stop(self):
+        """Stops serving and closes the socket."""
+        if self._thread is not None:
+            self._wake_w.send(b'\x01')
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            if self.family == socket.AF_UNIX:
+                try:
+                    os.unlink(self.address)
+                except OSError:
+                    pass
+        self._wake_r.close()
+        self._wake_w.close()
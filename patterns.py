@@ -0,0 +1,154 @@
+"""
+Emission patterns: what the scroll loop emits on each tick.
+
+A pattern is a plain dict, so it can live in config.json and in profiles:
+
+    {'type': 'ramp', 'from': 1.0, 'to': 3.0, 'ticks': 40, 'curve': 'linear'}
+    {'type': 'steps', 'steps': [[units, interval_ms], ...], 'repeat': True}
+    {'type': 'burst', 'units': 4, 'count': 3, 'interval_ms': 1, 'pause_ms': 30}
+
+or the name of a built-in pattern from PATTERNS. Ramps scale the binding's
+strength and run at its tick period; steps and bursts give absolute units
+and intervals. Any pattern may set 'gap_us', the pause between the emits of
+a smooth scroll.
+
+compile_pattern() evaluates a pattern once, when the settings snapshot is
+built, into a Schedule of flat arrays. The scroll loop then only indexes:
+units[i], period_ns[i], and next[i] for the tick after.
+"""
+from array import array
+
+DEFAULT_GAP_US = 100  # Pause between the emits of a smooth scroll
+MAX_TICKS = 65536     # Longest schedule a pattern may compile to
+MAX_UNITS = 1000      # Most units a single tick may emit
+
+# Easing curves over t in [0, 1]
+CURVES = {
+    'linear': lambda t: t,
+    'ease-in': lambda t: t * t,
+    'ease-out': lambda t: 1 - (1 - t) * (1 - t),
+    'smoothstep': lambda t: t * t * (3 - 2 * t),
+}
+
+# Built-in patterns. 'accelerate' is the classic acceleration curve:
+# +5% of the strength per tick, up to 3x after 40 ticks.
+PATTERNS = {
+    'constant': {'type': 'ramp', 'from': 1.0, 'to': 1.0, 'ticks': 0},
+    'accelerate': {'type': 'ramp', 'from': 1.0, 'to': 3.0, 'ticks': 40, 'curve': 'linear'},
+}
+
+
+class Schedule:
+    """
+    A compiled pattern: per-tick units and periods in flat arrays.
+    `next` holds the index of the following tick, so looping and holding the
+    last tick cost the loop nothing but another array lookup.
+    """
+    __slots__ = ('name', 'units', 'period_ns', 'next', 'gap_ns')
+
+    def __init__(self, name, units, period_ns, next_index, gap_ns):
+        self.name = name
+        self.units = array('H', units)
+        self.period_ns = array('q', period_ns)
+        self.next = array('l', next_index)
+        self.gap_ns = gap_ns
+
+    def __len__(self):
+        return len(self.units)
+
+    def __repr__(self):
+        return f"Schedule({self.name}, {len(self)} ticks)"
+
+    def preview(self, ticks):
+        """Returns the first `ticks` (units, period_ns) pairs, for inspection."""
+        result = []
+        i = 0
+        for _ in range(ticks):
+            result.append((self.units[i], self.period_ns[i]))
+            i = self.next[i]
+        return result
+
+
+def _clamp_units(value):
+    return max(1, min(MAX_UNITS, int(value)))
+
+
+def _interval_ns(ms):
+    ns = int(float(ms) * 1e6)
+    if ns < 100_000:
+        raise ValueError(f"Interval too short: {ms} ms (minimum 0.1 ms)")
+    return ns
+
+
+def _compile_ramp(spec, strength, period_ns):
+    ticks = int(spec.get('ticks', 0))
+    if not 0 <= ticks < MAX_TICKS:
+        raise ValueError(f"Ramp length out of range: {ticks}")
+    start = float(spec.get('from', 1.0))
+    end = float(spec.get('to', start))
+    curve = spec.get('curve', 'linear')
+    if curve not in CURVES:
+        raise ValueError(f"Unknown curve: {curve}")
+    f = CURVES[curve]
+    # Whole curve in one pass; the last tick is held for as long as the key is
+    span = end - start
+    factors = [start + span * f(n / ticks) for n in range(ticks)] + [end]
+    units = [_clamp_units(strength * factor) for factor in factors]
+    next_index = list(range(1, ticks + 1)) + [ticks]
+    return units, [period_ns] * len(units), next_index
+
+
+def _compile_steps(spec):
+    steps = spec.get('steps') or []
+    if not 0 < len(steps) <= MAX_TICKS:
+        raise ValueError("A steps pattern needs between 1 and 65536 steps")
+    units = [_clamp_units(step[0]) for step in steps]
+    periods = [_interval_ns(step[1]) for step in steps]
+    last = len(steps) - 1
+    # Repeat from the top, or hold the last step
+    next_index = list(range(1, last + 1)) + [0 if spec.get('repeat', True) else last]
+    return units, periods, next_index
+
+
+def _compile_burst(spec):
+    count = int(spec.get('count', 1))
+    if not 0 < count <= MAX_TICKS:
+        raise ValueError(f"Burst count out of range: {count}")
+    interval = _interval_ns(spec.get('interval_ms', 1))
+    pause = _interval_ns(spec.get('pause_ms', 20))
+    units = [_clamp_units(spec.get('units', 1))] * count
+    periods = [interval] * (count - 1) + [pause]
+    next_index = list(range(1, count)) + [0]
+    return units, periods, next_index
+
+
+def compile_pattern(pattern, strength, period_s):
+    """
+    Compiles a pattern (dict, built-in name, or None for constant) into a
+    Schedule for the given strength and tick period.
+    Raises ValueError for a malformed pattern.
+    """
+    name = pattern if isinstance(pattern, str) else 'constant'
+    if pattern is None or isinstance(pattern, str):
+        if name not in PATTERNS:
+            raise ValueError(f"Unknown pattern: {name}")
+        pattern = PATTERNS[name]
+    elif isinstance(pattern, dict):
+        name = pattern.get('name', pattern.get('type'))
+    else:
+        raise ValueError(f"Invalid pattern: {pattern!r}")
+
+    kind = pattern.get('type')
+    try:
+        if kind == 'ramp':
+            units, periods, next_index = _compile_ramp(pattern, strength, max(int(period_s * 1e9), 1))
+        elif kind == 'steps':
+            units, periods, next_index = _compile_steps(pattern)
+        elif kind == 'burst':
+            units, periods, next_index = _compile_burst(pattern)
+        else:
+            raise ValueError(f"Unknown pattern type: {kind}")
+        gap_ns = int(float(pattern.get('gap_us', DEFAULT_GAP_US)) * 1000)
+    except (TypeError, IndexError, KeyError) as e:
+        raise ValueError(f"Malformed {kind} pattern: {e}")
+    return Schedule(name, units, periods, next_index, max(0, gap_ns))
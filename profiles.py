@@ -0,0 +1,103 @@
+from settings import ScrollSettings, SETTING_KEYS
+from bindings import compile_bindings
+
+DEFAULT_PROFILE = 'default'
+
+
+class ProfileStore:
+    """
+    Named settings profiles stored in config.json.
+    Every profile is precompiled into a ready-to-run ScrollSettings snapshot,
+    so switching profiles is a dict lookup plus a snapshot swap.
+
+    Config layout (the flat top-level keys mirror the active profile so
+    older readers of config.json keep working):
+
+        {
+            "key": "space", "delay": 1, ...,
+            "active_profile": "default",
+            "profiles": {
+                "default": {"key": "space", "delay": 1, ...},
+                "surf": {"key": "v", "delay": 5, "hotkey": "f6", ...}
+            }
+        }
+
+    A profile may name a `hotkey` that switches to it while armed, and may
+    list extra key `bindings`, which are precompiled into a binding table.
+    """
+
+    def __init__(self, profiles=None, active=DEFAULT_PROFILE):
+        self._profiles = {}
+        self._compiled = {}
+        self._tables = {}
+        for name, settings in (profiles or {DEFAULT_PROFILE: {}}).items():
+            self.set(name, settings)
+        self.active = active if active in self._profiles else next(iter(self._profiles))
+
+    @classmethod
+    def from_config(cls, config):
+        """Builds the store from a config dict, migrating flat single-profile configs."""
+        profiles = config.get('profiles')
+        if not profiles:
+            flat = {k: config[k] for k in SETTING_KEYS if k in config}
+            profiles = {DEFAULT_PROFILE: flat}
+        return cls(profiles, config.get('active_profile', DEFAULT_PROFILE))
+
+    def names(self):
+        """Returns profile names in insertion order."""
+        return list(self._profiles)
+
+    def settings(self, name=None):
+        """Returns a copy of a profile's settings dict (the active one by default)."""
+        return dict(self._profiles[name or self.active])
+
+    def compiled(self, name=None):
+        """Returns the precompiled snapshot of a profile (the active one by default)."""
+        return self._compiled[name or self.active]
+
+    def bindings(self, name=None):
+        """Returns the precompiled binding table of a profile (the active one by default)."""
+        return self._tables[name or self.active]
+
+    def hotkeys(self):
+        """Returns {hotkey: profile name} for profiles that define one."""
+        return {p['hotkey']: name for name, p in self._profiles.items() if p.get('hotkey')}
+
+    def set(self, name, settings):
+        """Creates or replaces a profile and recompiles it."""
+        self._profiles[name] = dict(settings)
+        self._compiled[name] = ScrollSettings.from_dict(settings)
+        self._tables[name] = compile_bindings(self._compiled[name], settings.get('bindings'))
+
+    def update(self, name, changes):
+        """Applies changes to a profile; recompiles only if something changed."""
+        merged = dict(self._profiles.get(name, {}))
+        merged.update(changes)
+        if merged != self._profiles.get(name):
+            self.set(name, merged)
+
+    def remove(self, name):
+        """Deletes a profile; the last remaining profile cannot be removed."""
+        if len(self._profiles) <= 1:
+            raise ValueError("Cannot remove the only profile")
+        del self._profiles[name]
+        del self._compiled[name]
+        del self._tables[name]
+        if self.active == name:
+            self.active = next(iter(self._profiles))
+
+    def activate(self, name):
+        """Makes a profile active and returns its precompiled snapshot."""
+        if name not in self._compiled:
+            raise KeyError(f"Unknown profile: {name}")
+        self.active = name
+        return self._compiled[name]
+
+    def to_config(self, base=None):
+        """Returns a config dict holding all profiles, mirroring the active one at top level."""
+        config = dict(base or {})
+        config.update(self._profiles[self.active])
+        config.pop('hotkey', None)
+        config['active_profile'] = self.active
+        config['profiles'] = {name: dict(p) for name, p in self._profiles.items()}
+        return config
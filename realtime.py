@@ -0,0 +1,107 @@
+import os
+import sys
+import threading
+
+POLICIES = ('normal', 'nice', 'fifo', 'rr')
+
+# Defaults when no priority is given
+DEFAULT_RT_PRIORITY = 10  # SCHED_FIFO/SCHED_RR, 1-99 on Linux
+DEFAULT_NICE = -10
+
+# Windows thread priorities used in place of the POSIX policies
+WIN_PRIORITIES = {'nice': 2, 'fifo': 15, 'rr': 15}  # HIGHEST, TIME_CRITICAL
+
+
+def _set_affinity(cpu):
+    if hasattr(os, 'sched_setaffinity'):
+        # On Linux pid 0 is the calling thread, not the whole process
+        os.sched_setaffinity(0, {cpu})
+    elif sys.platform == 'win32':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        if not kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), 1 << cpu):
+            raise ctypes.WinError()
+    else:
+        raise OSError("CPU affinity is not supported on this platform")
+
+
+def _set_policy(policy, priority):
+    """Applies one policy to the calling thread; returns the priority used."""
+    if sys.platform == 'win32':
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        value = WIN_PRIORITIES[policy]
+        if not kernel32.SetThreadPriority(kernel32.GetCurrentThread(), value):
+            raise ctypes.WinError()
+        return value
+
+    if policy == 'nice':
+        value = DEFAULT_NICE if priority is None else priority
+        # Linux applies PRIO_PROCESS to a single thread when given its id
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), value)
+        return value
+
+    if not hasattr(os, 'sched_setscheduler'):
+        raise OSError("Real-time scheduling is not supported on this platform")
+    native = os.SCHED_FIFO if policy == 'fifo' else os.SCHED_RR
+    value = DEFAULT_RT_PRIORITY if priority is None else priority
+    value = max(os.sched_get_priority_min(native), min(os.sched_get_priority_max(native), value))
+    os.sched_setscheduler(0, native, os.sched_param(value))
+    return value
+
+
+def apply_realtime(cpu=None, policy='normal', priority=None):
+    """
+    Pins the calling thread to a CPU and raises its scheduling priority.
+    Everything is best effort: a step that isn't permitted is skipped, and a
+    real-time policy that is refused falls back to nice, then to normal.
+
+    Args:
+        cpu: CPU index to pin to, or None to leave affinity alone
+        policy: 'normal', 'nice', 'fifo' or 'rr'
+        priority: Nice value for 'nice', 1-99 for 'fifo'/'rr'; None = default
+
+    Returns:
+        The applied policy: {'cpu', 'policy', 'priority', 'errors'}
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown scheduling policy: {policy}")
+    applied = {'cpu': None, 'policy': 'normal', 'priority': None, 'errors': []}
+
+    if cpu is not None:
+        try:
+            _set_affinity(cpu)
+            applied['cpu'] = cpu
+        except (OSError, ValueError) as e:
+            applied['errors'].append(f"affinity: {e}")
+
+    # Fall back one step at a time; a refused real-time priority is not
+    # a reason to run at plain normal priority when nice is allowed
+    chain = {'fifo': ('fifo', 'nice'), 'rr': ('rr', 'nice'), 'nice': ('nice',)}.get(policy, ())
+    for step in chain:
+        try:
+            # A real-time priority means nothing as a nice value
+            value = _set_policy(step, priority if step == policy else None)
+            applied['policy'] = step
+            applied['priority'] = value
+            break
+        except (OSError, AttributeError) as e:
+            applied['errors'].append(f"{step}: {e}")
+    return applied
+
+
+def add_arguments(parser):
+    """Adds the opt-in CPU pinning and scheduling flags to an ArgumentParser."""
+    parser.add_argument('--cpu', type=int, default=None,
+                        help="pin the scroll loop to this CPU core")
+    parser.add_argument('--rt-policy', choices=POLICIES, default='normal',
+                        help="scheduling policy for the scroll loop; falls back when not permitted")
+    parser.add_argument('--rt-priority', type=int, default=None,
+                        help="nice value for 'nice', 1-99 for 'fifo'/'rr'")
+
+
+def from_args(args):
+    """Returns realtime options from parsed flags, or None if none were given."""
+    if args.cpu is None and args.rt_policy == 'normal':
+        return None
+    return {'cpu': args.cpu, 'policy': args.rt_policy, 'priority': args.rt_priority}
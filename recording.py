@@ -0,0 +1,468 @@
+"""
+Compact binary record/replay of input sessions.
+
+A session log holds key presses/releases, settings changes and scroller
+emits as fixed-width 8-byte records with nanosecond deltas from a monotonic
+clock, so multi-hour sessions stay small, the file can be appended to across
+runs, and it is read back through mmap without parsing. Each run appended to
+an existing log starts a new session with its own start time; on the log's
+timeline it follows right after the previous session's last record.
+
+    python main.py --record session.bhr
+    python recording.py info session.bhr
+    python recording.py replay session.bhr --speed 10
+    python recording.py replay session.bhr --virtual
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+import threading
+from backends import EmitterBackend, RecordingBackend, create_backend
+from listeners import KeyListener, create_listener
+from clock import MonotonicClock, VirtualClock
+
+# File header: magic, format version, record size, session start (ns)
+HEADER = struct.Struct('<4sHHq')
+MAGIC = b'BHRS'
+VERSION = 3  # 2: SESSION records, 3: long payloads
+
+# Record: delta from the previous record (ns), kind, key id, value
+RECORD = struct.Struct('<IBBh')
+MAX_DELTA = 0xFFFFFFFF
+
+# Record kinds
+PRESS = 1     # key id
+RELEASE = 2   # key id
+EMIT = 3      # value = dy of one backend call
+GAP = 4       # time passes, nothing happens (deltas too long for one record)
+KEY_NAME = 5  # defines key id; value = name length, name follows in raw slots
+SETTINGS = 6  # value = JSON length, JSON follows in raw slots
+SESSION = 7   # a run appended to the log starts; value = 8, its start (ns) follows
+
+# Payloads longer than `value` can hold set it to LONG_PAYLOAD and put their
+# length in the first raw slot instead
+LONG_PAYLOAD = -1
+MAX_SHORT_PAYLOAD = 0x7FFF
+PAYLOAD_LENGTH = struct.Struct('<Q')
+SESSION_START = struct.Struct('<q')
+
+KIND_NAMES = {PRESS: 'press', RELEASE: 'release', EMIT: 'emit', SETTINGS: 'settings',
+              SESSION: 'session'}
+
+
+class SessionRecorder:
+    """
+    Appends session events to a binary log.
+    Records are packed into a preallocated buffer and written out when it
+    fills up, on flush() and on close(). Safe to call from several threads.
+    """
+
+    def __init__(self, path, buffer_records=4096, clock=time.perf_counter_ns):
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._buffer = bytearray(RECORD.size * buffer_records)
+        self._used = 0
+        self._keys = {}  # name -> id
+        self.records = 0
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            # Append: keep the key ids of the existing log, but start a new
+            # session; this run's clock isn't comparable with the last one's
+            log = SessionLog(path)
+            try:
+                version = log.version
+                self._keys = {name: key_id for key_id, name in log.key_names.items()}
+            finally:
+                log.close()
+            if version < VERSION:
+                # Older readers would misread the newer records: make them refuse the file
+                with open(path, 'r+b') as f:
+                    f.seek(len(MAGIC))  # Version field
+                    f.write(struct.pack('<H', VERSION))
+            self._file = open(path, 'ab')
+            self._last = clock()
+            self._pack(0, SESSION, 0, SESSION_START.size)
+            self._pack_raw(SESSION_START.pack(self._last))
+        else:
+            self._last = clock()
+            self._file = open(path, 'wb')
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self._last))
+
+    def _append(self, kind, key_id=0, value=0, payload=b''):
+        """Packs one record (plus raw payload slots). Caller holds the lock."""
+        now = self.clock()
+        delta = max(0, now - self._last)
+        self._last = now
+        while delta > MAX_DELTA:
+            self._pack(MAX_DELTA, GAP, 0, 0)
+            delta -= MAX_DELTA
+        if len(payload) > MAX_SHORT_PAYLOAD:
+            value = LONG_PAYLOAD
+            payload = PAYLOAD_LENGTH.pack(len(payload)) + payload
+        self._pack(delta, kind, key_id, value)
+        for offset in range(0, len(payload), RECORD.size):
+            chunk = payload[offset:offset + RECORD.size]
+            self._pack_raw(chunk.ljust(RECORD.size, b'\0'))
+
+    def _pack(self, delta, kind, key_id, value):
+        if self._used == len(self._buffer):
+            self._write_buffer()
+        RECORD.pack_into(self._buffer, self._used, delta, kind, key_id, value)
+        self._used += RECORD.size
+        self.records += 1
+
+    def _pack_raw(self, chunk):
+        if self._used == len(self._buffer):
+            self._write_buffer()
+        self._buffer[self._used:self._used + RECORD.size] = chunk
+        self._used += RECORD.size
+
+    def _write_buffer(self):
+        self._file.write(memoryview(self._buffer)[:self._used])
+        self._used = 0
+
+    def _key_id(self, key):
+        """Returns the id of a key name, defining it on first use. Caller holds the lock."""
+        key_id = self._keys.get(key)
+        if key_id is None:
+            key_id = len(self._keys)
+            if key_id > 0xFF:
+                raise ValueError("Too many distinct keys in one session log")
+            self._keys[key] = key_id
+            name = key.encode('utf-8')
+            self._append(KEY_NAME, key_id, len(name), name)
+        return key_id
+
+    def key(self, key, pressed):
+        """Records a key press or release."""
+        with self._lock:
+            key_id = self._key_id(key)
+            self._append(PRESS if pressed else RELEASE, key_id)
+
+    def emit(self, dy):
+        """Records one backend scroll call."""
+        with self._lock:
+            self._append(EMIT, 0, dy)
+
+    def settings(self, settings):
+        """Records the settings the scroller runs with from now on."""
+        data = json.dumps(settings, separators=(',', ':')).encode('utf-8')
+        with self._lock:
+            self._append(SETTINGS, 0, len(data), data)
+
+    def wrap_backend(self, backend=None):
+        """Returns an emitter backend that records every scroll call."""
+        if not isinstance(backend, EmitterBackend):
+            backend = create_backend(backend or 'pynput')
+        return RecorderBackend(backend, self)
+
+    def wrap_listener(self, listener=None):
+        """Returns a key listener that records every hooked press/release."""
+        if not isinstance(listener, KeyListener):
+            listener = create_listener(listener or 'keyboard')
+        return RecorderListener(listener, self)
+
+    def flush(self):
+        """Writes buffered records to disk."""
+        with self._lock:
+            self._write_buffer()
+            self._file.flush()
+
+    def close(self):
+        """Flushes and closes the log."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._write_buffer()
+            self._file.close()
+
+
+class RecorderBackend(EmitterBackend):
+    """Emitter backend wrapper that records each scroll call before passing it on."""
+
+    def __init__(self, backend, recorder):
+        self.backend = backend
+        self.recorder = recorder
+        self.name = backend.name
+
+    def scroll(self, dx, dy):
+        self.recorder.emit(dy)
+        self.backend.scroll(dx, dy)
+
+    def flush(self):
+        self.backend.flush()
+
+    def close(self):
+        self.backend.close()
+
+
+class RecorderListener(KeyListener):
+    """Key listener wrapper that records hooked presses/releases before dispatching them."""
+
+    def __init__(self, listener, recorder):
+        self.listener = listener
+        self.recorder = recorder
+        self.name = listener.name
+
+    def hook(self, key, on_press=None, on_release=None, suppress=True):
+        recorder = self.recorder
+
+        def pressed():
+            recorder.key(key, True)
+            if on_press is not None:
+                on_press()
+
+        def released():
+            recorder.key(key, False)
+            if on_release is not None:
+                on_release()
+
+        return self.listener.hook(key, on_press=pressed, on_release=released, suppress=suppress)
+
+    def unhook(self, handle):
+        self.listener.unhook(handle)
+
+    def close(self):
+        self.listener.close()
+
+
+class SessionLog:
+    """
+    Read-only, mmap-backed view of a session log.
+    A partially written trailing record (e.g. after a crash) is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.version, record_size, self.start_ns = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a session log")
+        if self.version > VERSION:
+            self.close()
+            raise ValueError(f"{path} uses unsupported format version {self.version}")
+        self.count = (len(self._map) - HEADER.size) // RECORD.size  # Slots, payload included
+        self.key_names = {}  # id -> name
+        self.end_ns = self.start_ns
+        for _ in self.records():
+            pass  # Fills key_names and end_ns
+
+    def records(self):
+        """
+        Yields (timestamp_ns, kind, arg): the key name for PRESS/RELEASE,
+        dy for EMIT, the settings dict for SETTINGS and, for SESSION, the
+        new session's start on its own clock. Timestamps are on the log's
+        timeline, which runs on from one session into the next.
+        """
+        data = self._map
+        unpack = RECORD.unpack_from
+        offset = HEADER.size
+        end = HEADER.size + self.count * RECORD.size
+        now = self.start_ns
+        while offset < end:
+            delta, kind, key_id, value = unpack(data, offset)
+            offset += RECORD.size
+            now += delta
+            if kind in (KEY_NAME, SETTINGS, SESSION):
+                # Payload occupies the following raw slots
+                if value == LONG_PAYLOAD:
+                    if offset + RECORD.size > end:
+                        break
+                    value = PAYLOAD_LENGTH.unpack_from(data, offset)[0]
+                    offset += RECORD.size
+                payload = data[offset:offset + value]
+                offset += -(-value // RECORD.size) * RECORD.size
+                if offset > end:
+                    break  # Payload cut short by a truncated file
+                if kind == KEY_NAME:
+                    self.key_names[key_id] = payload.decode('utf-8')
+                elif kind == SESSION:
+                    yield now, kind, SESSION_START.unpack(payload)[0]
+                else:
+                    yield now, kind, json.loads(payload)
+            elif kind in (PRESS, RELEASE):
+                yield now, kind, self.key_names.get(key_id, str(key_id))
+            elif kind == EMIT:
+                yield now, kind, value
+        self.end_ns = now
+
+    def summary(self):
+        """Returns counts, duration and emitted units of the log, over all its sessions."""
+        counts = {name: 0 for name in KIND_NAMES.values()}
+        units = 0
+        for _, kind, arg in self.records():
+            counts[KIND_NAMES[kind]] += 1
+            if kind == EMIT:
+                units -= arg
+        return {
+            'bytes': HEADER.size + self.count * RECORD.size,
+            'sessions': 1 + counts.pop('session'),
+            'duration_s': (self.end_ns - self.start_ns) / 1e9,
+            'keys': sorted(self.key_names.values()),
+            'units': units,
+            **counts
+        }
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class ReplayListener(KeyListener):
+    """Key listener driven by the replayer instead of a keyboard."""
+    name = 'replay'
+
+    def __init__(self):
+        self._hooks = {}
+        self._next = 0
+
+    def hook(self, key, on_press=None, on_release=None, suppress=True):
+        self._next += 1
+        self._hooks[self._next] = (key, on_press, on_release)
+        return self._next
+
+    def unhook(self, handle):
+        self._hooks.pop(handle, None)
+
+    def press(self, key):
+        for hooked, on_press, _ in list(self._hooks.values()):
+            if hooked == key and on_press is not None:
+                on_press()
+
+    def release(self, key):
+        for hooked, _, on_release in list(self._hooks.values()):
+            if hooked == key and on_release is not None:
+                on_release()
+
+
+def replay(log, speed=1.0, virtual=False):
+    """
+    Feeds a session's key stream and settings back into an AdvancedScroller
+    running against the recording backend, and compares what it emits with
+    what the session emitted.
+
+    In real time, delays are divided by `speed` so accelerated replays keep
+    the number of ticks per key hold. With `virtual`, the scroller runs on a
+    VirtualClock instead: inputs fire at their exact recorded instants, the
+    whole session replays as fast as the CPU allows, and the result is the
+    same on every run.
+    """
+    from scroller import AdvancedScroller
+
+    if virtual:
+        speed = 1.0
+        clock = VirtualClock()
+        backend = RecordingBackend(clock=clock.now_ns)
+    else:
+        clock = MonotonicClock()
+        backend = RecordingBackend()
+    listener = ReplayListener()
+    scroller = AdvancedScroller(backend=backend, listener=listener, clock=clock)
+    scroller.register_key_handlers()
+
+    def feed(kind, arg):
+        if kind == SETTINGS:
+            settings = dict(arg)
+            settings['delay'] = settings.get('delay', 1) / speed
+            settings['bindings'] = [
+                dict(spec, delay=spec['delay'] / speed) if 'delay' in spec else spec
+                for spec in settings.get('bindings') or ()
+            ]
+            scroller.update_settings(settings)
+        elif kind == SESSION:
+            scroller.stop_scrolling()  # A new run starts with the wheel at rest
+        elif kind == PRESS:
+            listener.press(arg)
+        else:
+            listener.release(arg)
+
+    recorded_emits = 0
+    recorded_units = 0
+    key_events = 0
+    started = time.perf_counter_ns()
+    try:
+        if virtual:
+            # Schedule every input on the virtual clock, then let the scroller run
+            origin = clock.now_ns()
+            for timestamp, kind, arg in log.records():
+                if kind == EMIT:
+                    recorded_emits += 1
+                    recorded_units -= arg
+                    continue
+                key_events += kind in (PRESS, RELEASE)
+                clock.call_at(origin + timestamp - log.start_ns,
+                              lambda kind=kind, arg=arg: feed(kind, arg))
+            finished = threading.Event()
+            end = origin + log.end_ns - log.start_ns
+            clock.call_at(end, scroller.stop_scrolling)
+            clock.call_at(end + 1_000_000_000, finished.set)
+            scroller.start()
+            finished.wait()
+        else:
+            scroller.start()
+            for timestamp, kind, arg in log.records():
+                if kind == EMIT:
+                    recorded_emits += 1
+                    recorded_units -= arg
+                    continue
+                # Hold each input to its recorded (scaled) offset
+                due = started + (timestamp - log.start_ns) / speed
+                remaining = (due - time.perf_counter_ns()) / 1e9
+                if remaining > 0:
+                    time.sleep(remaining)
+                key_events += kind in (PRESS, RELEASE)
+                feed(kind, arg)
+            scroller.stop_scrolling()
+            time.sleep(max(0.05, scroller.config.delay * 2))
+    finally:
+        scroller.stop()
+
+    return {
+        'key_events': key_events,
+        'recorded_emits': recorded_emits,
+        'recorded_units': recorded_units,
+        'replayed_emits': backend.calls,
+        'replayed_units': scroller.stats.units,
+        'replay_s': (time.perf_counter_ns() - started) / 1e9,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or replay a recorded session")
+    commands = parser.add_subparsers(dest='command', required=True)
+    info = commands.add_parser('info', help="print a summary of a session log")
+    info.add_argument('path')
+    info.add_argument('--events', action='store_true', help="also print every event")
+    replayer = commands.add_parser('replay', help="replay a session against the recording backend")
+    replayer.add_argument('path')
+    replayer.add_argument('--speed', type=float, default=1.0,
+                          help="replay speed multiplier (default: 1.0)")
+    replayer.add_argument('--virtual', action='store_true',
+                          help="replay on a virtual clock: instant and deterministic")
+    args = parser.parse_args()
+
+    log = SessionLog(args.path)
+    try:
+        if args.command == 'info':
+            if args.events:
+                for timestamp, kind, arg in log.records():
+                    print(f"{(timestamp - log.start_ns) / 1e6:12.3f} ms  {KIND_NAMES[kind]:<8} {arg}")
+            print(json.dumps(log.summary(), indent=2))
+        else:
+            print(json.dumps(replay(log, args.speed, args.virtual), indent=2))
+    except KeyboardInterrupt:
+        sys.exit(130)
+    finally:
+        log.close()
+
+
+if __name__ == '__main__':
+    main()
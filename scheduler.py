@@ -0,0 +1,106 @@
+from clock import MonotonicClock
+
+
+class TickScheduler:
+    """
+    Drift-free tick scheduler working from absolute nanosecond deadlines on a
+    clock (monotonic by default, see clock.py). Tick n is due at
+    anchor + n * period, so emit cost and sleep overshoot never accumulate.
+    Waits use a coarse sleep followed by a short spin to hit the deadline
+    with bounded jitter.
+    """
+
+    def __init__(self, period_s=0.001, spin_ns=200_000, clock=None):
+        self.clock = clock or MonotonicClock()
+        self.period_ns = max(int(period_s * 1e9), 1)
+        # Spinning only makes sense against real time
+        self.spin_ns = 0 if self.clock.virtual else spin_ns
+        self._next_deadline = 0
+
+        # Statistics
+        self.ticks = 0
+        self.missed = 0   # Ticks that started after their deadline
+        self.skipped = 0  # Whole periods dropped when re-anchoring
+        self.max_lateness_ns = 0
+        self.interrupts = 0  # Waits cut short by a wake event
+
+    def reset(self, period_s=None):
+        """Anchors the schedule at now; the next tick is due one period from now."""
+        if period_s is not None:
+            self.period_ns = max(int(period_s * 1e9), 1)
+        self._next_deadline = self.clock.now_ns() + self.period_ns
+
+    def set_period(self, period_s):
+        """Changes the period, keeping the phase of the previous deadline."""
+        self.set_period_ns(int(period_s * 1e9))
+
+    def set_period_ns(self, period_ns):
+        """Like set_period(), in nanoseconds."""
+        period_ns = max(period_ns, 1)
+        if period_ns != self.period_ns:
+            self._next_deadline += period_ns - self.period_ns
+            self.period_ns = period_ns
+
+    def wait(self, wake=None):
+        """
+        Blocks until the next deadline and schedules the one after it.
+        Returns how late the tick started in nanoseconds (0 if on time).
+
+        If `wake` (a threading.Event) is set while waiting, the wait returns
+        None immediately with the event cleared and the deadline still
+        pending, so control changes take effect without waiting out the tick.
+        """
+        deadline = self._next_deadline
+        period = self.period_ns
+        clock = self.clock
+        now_ns = clock.now_ns
+        now = now_ns()
+        self.ticks += 1
+
+        if now >= deadline:
+            # Already late: don't sleep, and don't burst to catch up
+            lateness = now - deadline
+            self.missed += 1
+            if lateness > self.max_lateness_ns:
+                self.max_lateness_ns = lateness
+            if lateness >= period:
+                # Re-anchor rather than firing a backlog of ticks
+                behind = lateness // period
+                self.skipped += behind
+                deadline += behind * period
+            self._next_deadline = deadline + period
+            return lateness
+
+        # Coarse sleep up to the spin window, then spin to the deadline
+        remaining = deadline - now
+        if wake is None:
+            if remaining > self.spin_ns:
+                clock.sleep_ns(remaining - self.spin_ns)
+            while now_ns() < deadline:
+                pass
+        else:
+            if remaining > self.spin_ns and clock.wait_ns(wake, remaining - self.spin_ns):
+                return self._interrupted(wake)
+            while now_ns() < deadline:
+                if wake.is_set():
+                    return self._interrupted(wake)
+
+        self._next_deadline = deadline + period
+        return 0
+
+    def _interrupted(self, wake):
+        wake.clear()
+        self.ticks -= 1  # The tick is still pending
+        self.interrupts += 1
+        return None
+
+    def get_stats(self):
+        """Returns scheduler counters."""
+        return {
+            'period_us': self.period_ns / 1000,
+            'ticks': self.ticks,
+            'missed_deadlines': self.missed,
+            'skipped_periods': self.skipped,
+            'max_lateness_us': self.max_lateness_ns / 1000,
+            'interrupts': self.interrupts,
+        }
@@ -1,128 +1,301 @@
 import time
+import logging
 import threading
-from pynput.mouse import Controller as MouseController
-import keyboard
+from backends import EmitterBackend, create_backend
+from clock import MonotonicClock
+from realtime import apply_realtime
+from bindings import BindingTable, compile_bindings
+from listeners import KeyListener, create_listener
+from scheduler import TickScheduler
+from settings import ScrollSettings
+from stats import ScrollerStats
+from telemetry import TelemetryRing
+from wakeups import audit
+
+logger = logging.getLogger(__name__)
+
+# Most ticks' worth of units a coalesced emit may carry
+MAX_COALESCE_TICKS = 4
 
 class AdvancedScroller(threading.Thread):
     """
     Advanced scrolling manager with multiple modes and precise controls.
     Features smooth scrolling, adjustable strength, and toggle/hold modes.
+    Wheel events go through a pluggable emitter backend (see backends.py),
+    key presses arrive through a pluggable listener (see listeners.py).
+    Any number of keys can be bound at once, each with its own settings.
     """
-    def __init__(self):
+    def __init__(self, backend=None, listener=None, clock=None, realtime=None):
         super().__init__(daemon=True)
-        self.mouse = MouseController()
-        
-        # Settings
-        self.settings = {
-            'key': 'space',
-            'delay': 0.001,
-            'strength': 1,
-            'hold_mode': True,
-            'smooth_scrolling': False,
-            'acceleration': False
-        }
+        
+        # Time source for ticks, waits and acceleration; a VirtualClock
+        # (see clock.py) simulates long sessions without waiting them out
+        self.clock = clock or MonotonicClock()
+        
+        # Emitter backend: an EmitterBackend instance or a backend name
+        if backend is None:
+            backend = 'pynput'
+        if not isinstance(backend, EmitterBackend):
+            backend = create_backend(backend)
+        self.backend = backend
+        
+        # Settings: immutable snapshots, swapped whole by update_settings()
+        self._primary = ScrollSettings()  # Settings of the primary key binding
+        self._binding_specs = []  # Extra key bindings (settings dicts)
+        self.config = self._primary  # Snapshot the scroll loop runs with
+        self._config_lock = threading.Lock()  # Serializes writers only
         
         # State management
         self._scroll_active = threading.Event()
         self._shutdown = threading.Event()
+        self._wake = threading.Event()  # Set on every control change to cut waits short
+        self._backend_ns = 0  # Time the last smooth scroll spent inside the backend
         self._is_toggled = False
-        self._scroll_counter = 0
-        self._last_scroll_time = 0
+        self.on_activity = None  # Called with True/False as scrolling starts/stops
+        
+        # Opt-in CPU pinning/priority, applied by the scroll thread itself at start-up
+        # (see realtime.py); `realtime` holds what was actually applied
+        self._realtime_request = dict(realtime) if realtime else None
+        self.realtime = {'cpu': None, 'policy': 'normal', 'priority': None, 'errors': []}
         
-        # Key hooks
-        self._key_hooks = []
+        # Absolute-deadline tick timing
+        self.scheduler = TickScheduler(self.config.delay, clock=self.clock)
+        
+        # Latency/jitter instrumentation
+        self.stats = ScrollerStats()
+        self._activated_at = 0  # Clock ns of the hook that started scrolling
+        self._stop_requested_at = 0  # Clock ns of the last stop request
+        
+        # Live per-tick samples for the GUI, polled at a fixed rate
+        self.telemetry = TelemetryRing()
+        
+        # Key bindings: listener instance or name, created on first registration
+        self._listener_spec = listener or 'keyboard'
+        self.listener = listener if isinstance(listener, KeyListener) else None
+        self.bindings = BindingTable(self._on_key_press, self._on_key_release)
+        self.bindings.apply(compile_bindings(self._primary))
+        self._active_key = None  # Binding that started the current activation
         
     def run(self):
         """
         Main scrolling thread with smooth scrolling support.
         """
+        scheduler = self.scheduler
+        stats = self.stats
+        telemetry = self.telemetry
+        clock = self.clock.now_ns
+        wait_ns = self.clock.wait_ns
+        
+        wake = self._wake
+        
+        if self._realtime_request is not None:
+            self._apply_realtime()
+        
         while not self._shutdown.is_set():
-            self._scroll_active.wait()
+            # Idle: block until a control event, no periodic wakeups
+            if not self._scroll_active.is_set():
+                wait_ns(wake)
+                audit.count('scroller')
+                wake.clear()
+                continue
+            
+            # First tick fires immediately, the rest on the deadline grid
+            scheduler.reset(self.config.tick_period)
+            last_emit = 0
+            owed = 0  # Units of skipped ticks, carried over when coalescing
+            schedule = self.config.schedule
+            index = 0  # Position in the compiled pattern; restarts on every activation
             
             while self._scroll_active.is_set() and not self._shutdown.is_set():
                 try:
-                    # Calculate scroll strength with acceleration
-                    strength = self.calculate_scroll_strength()
+                    # Pick up the latest settings snapshot once per tick
+                    config = self.config
+                    if config.schedule is not schedule:
+                        # New settings: carry on at the same position if it exists
+                        schedule = config.schedule
+                        if index >= len(schedule):
+                            index = 0
+                    
+                    # This tick's units and period come straight from the pattern
+                    strength = schedule.units[index]
+                    budget = schedule.period_ns[index]
+                    index = schedule.next[index]
+                    gap = schedule.gap_ns
+                    policy = config.overload_policy
+                    units = strength + owed
+                    owed = 0
+                    
+                    # Backpressure: fit this tick's emits to the measured backend cost
+                    calls = units if config.smooth_scrolling else 1
+                    cost = stats.emit_cost_ns
+                    if cost * calls > budget:
+                        # The backend itself can't keep up: that's an overload
+                        stats.overloads += 1
+                        fit = max(1, budget // cost)
+                        if fit < calls:
+                            if policy == 'coalesce':
+                                calls = fit  # Same units, fewer and larger emits
+                            elif policy == 'drop':
+                                stats.dropped_units += units - fit
+                                units = calls = fit
+                    elif calls > 1 and policy != 'stretch':
+                        # Only the smooth-scroll pauses don't fit: emit the same
+                        # units in fewer steps, whatever the policy
+                        pause = max(gap, stats.pause_cost_ns)
+                        fit = max(1, (budget + pause) // (cost + pause))
+                        if fit < calls:
+                            calls = fit
+                            stats.gap_fits += 1
                     
                     # Perform scroll
-                    if self.settings.get('smooth_scrolling', False):
-                        self.smooth_scroll(strength)
+                    emit_start = clock()
+                    if calls > 1:
+                        units = self.smooth_scroll(units, calls, gap)
+                    else:
+                        # All of the tick's units, then a single flush
+                        self.backend.scroll(0, -units)
+                        self.backend.flush()
+                    emit_end = clock()
+                    
+                    # Moving averages (1/8) of what one backend call costs, pauses
+                    # excluded, and of how long a pause really takes
+                    if calls > 1:
+                        cost = self._backend_ns // calls
+                        pause = (emit_end - emit_start - self._backend_ns) // (calls - 1)
+                        stats.pause_cost_ns += (pause - stats.pause_cost_ns) >> 3
                     else:
-                        self.mouse.scroll(0, -strength)
+                        cost = emit_end - emit_start
+                    stats.emit_cost_ns += (cost - stats.emit_cost_ns) >> 3
                     
-                    # Dynamic delay for smoother feel
-                    delay = self.calculate_delay()
-                    if delay > 0:
-                        time.sleep(delay)
+                    # Record timing
+                    stats.emit_duration.record(emit_end - emit_start)
+                    jitter = 0
+                    if last_emit:
+                        interval = emit_start - last_emit
+                        jitter = abs(interval - scheduler.period_ns)
+                        stats.emit_interval.record(interval)
+                        stats.jitter.record(jitter)
+                    elif self._activated_at:
+                        stats.hook_to_emit.record(emit_start - self._activated_at)
+                    last_emit = emit_start
+                    stats.ticks += 1
+                    stats.units += units
+                    telemetry.push(emit_start, strength, units, jitter)
+                    
+                    # Dynamic delay for smoother feel, held to absolute deadlines
+                    period = budget
+                    if policy == 'stretch' and emit_end - emit_start > budget:
+                        # Lengthen the tick to what the emits really take
+                        period = (emit_end - emit_start) * 5 // 4
+                        stats.stretched_ticks += 1
+                    scheduler.set_period_ns(period)
+                    lateness = scheduler.wait(wake)
+                    audit.count('scroller')
+                    while lateness is None and self._scroll_active.is_set() and not self._shutdown.is_set():
+                        # Woken by a settings change: re-aim the pending deadline
+                        pending = self.config.schedule
+                        scheduler.set_period_ns(pending.period_ns[index if index < len(pending) else 0])
+                        lateness = scheduler.wait(wake)
+                    if lateness:
+                        stats.overrun.record(lateness)
+                        behind = lateness // scheduler.period_ns
+                        if behind:
+                            # Whole ticks were skipped: carry or drop their units
+                            if policy == 'coalesce':
+                                owed = min(behind, MAX_COALESCE_TICKS) * strength
+                                stats.coalesced_units += owed
+                            elif policy == 'drop':
+                                stats.dropped_units += behind * strength
                         
                 except Exception as e:
                     print(f"Error during scroll: {e}")
                     self._scroll_active.clear()
                     break
-    
-    def calculate_scroll_strength(self):
-        """
-        Calculates scroll strength with optional acceleration.
-        """
-        base_strength = self.settings.get('strength', 1)
-        
-        if self.settings.get('acceleration', False):
-            # Accelerate scrolling over time
-            current_time = time.time()
-            if self._last_scroll_time > 0:
-                elapsed = current_time - self._last_scroll_time
-                if elapsed < 0.1:  # Within 100ms
-                    self._scroll_counter += 1
-                else:
-                    self._scroll_counter = 0
-            else:
-                self._scroll_counter = 0
-                
-            self._last_scroll_time = current_time
             
-            # Apply acceleration curve
-            acceleration_factor = min(1 + (self._scroll_counter * 0.05), 3)
-            return int(base_strength * acceleration_factor)
-        
-        return base_strength
+            # Halted: measure how long the stop request took to take effect
+            if self._stop_requested_at:
+                stats.release_to_halt.record(clock() - self._stop_requested_at)
+                self._stop_requested_at = 0
+    
+    def _apply_realtime(self):
+        """Applies the requested affinity/priority to the calling (scroll) thread."""
+        request, self._realtime_request = self._realtime_request, None
+        self.realtime = apply_realtime(**request)
+        for error in self.realtime['errors']:
+            logger.warning(f"Real-time setting not applied: {error}")
     
-    def calculate_delay(self):
+    def calculate_delay(self, config=None):
         """
         Calculates dynamic delay based on settings.
+        Smooth scrolling halves the delay; the result is precomputed in the snapshot.
         """
-        base_delay = self.settings.get('delay', 0.001)
-        
-        if self.settings.get('smooth_scrolling', False):
-            # Reduce delay for smoother scrolling
-            return base_delay * 0.5
-        
-        return base_delay
+        return (config or self.config).tick_period
     
-    def smooth_scroll(self, strength):
+    def smooth_scroll(self, strength, steps=None, gap_ns=None):
         """
         Performs smooth scrolling with interpolation.
+        Spreads `strength` units over `steps` emits (one per unit by default;
+        fewer, larger ones when coalescing under backpressure), `gap_ns` apart
+        (the pattern's gap by default).
+        Each step is flushed before its pause so it reaches the display on its own.
+        Returns the number of units emitted; a stop request aborts the rest.
+        The time spent inside the backend, pauses excluded, is left in _backend_ns.
         """
+        backend = self.backend
+        steps = strength if steps is None else max(1, min(steps, strength))
         # Break large scrolls into smaller increments
-        if strength > 1:
-            for i in range(strength):
-                self.mouse.scroll(0, -1)
-                if i < strength - 1:
-                    time.sleep(0.0001)  # Micro-delay for smoothness
+        if steps > 1:
+            wake = self._wake
+            wait_ns = self.clock.wait_ns
+            if gap_ns is None:
+                gap_ns = self.config.schedule.gap_ns
+            now_ns = self.clock.now_ns
+            size, extra = divmod(strength, steps)
+            emitted = 0
+            busy = 0
+            for i in range(steps):
+                step = size + 1 if i < extra else size
+                start = now_ns()
+                backend.scroll(0, -step)
+                backend.flush()
+                busy += now_ns() - start
+                emitted += step
+                if i < steps - 1 and wait_ns(wake, gap_ns):  # Micro-delay for smoothness
+                    if not self._scroll_active.is_set() or self._shutdown.is_set():
+                        self._backend_ns = busy
+                        return emitted
+                    wake.clear()  # Settings change: picked up at the next tick
+            self._backend_ns = busy
+            return strength
         else:
-            self.mouse.scroll(0, -strength)
+            backend.scroll(0, -strength)
+            backend.flush()
+            return strength
     
     def start_scrolling(self):
         """Activates scrolling."""
         if not self._scroll_active.is_set():
-            self._scroll_counter = 0
-            self._last_scroll_time = 0
+            if self._active_key is None:
+                self.config = self._primary
+            self._activated_at = self.clock.now_ns()
+            self.stats.activations += 1
             self._scroll_active.set()
+            self._wake.set()
+            audit.set_active(True)
+            if self.on_activity is not None:
+                self.on_activity(True)
     
     def stop_scrolling(self):
         """Deactivates scrolling."""
         if self._scroll_active.is_set():
+            self._stop_requested_at = self.clock.now_ns()
+            self.stats.active_ns += self._stop_requested_at - self._activated_at
             self._scroll_active.clear()
-            self._scroll_counter = 0
+            self._active_key = None
+            self._wake.set()
+            audit.set_active(False)
+            if self.on_activity is not None:
+                self.on_activity(False)
     
     def toggle_scrolling(self):
         """Toggles scrolling on/off."""
@@ -134,34 +307,55 @@ class AdvancedScroller(threading.Thread):
             self._is_toggled = True
     
     def register_key_handlers(self):
-        """Registers keyboard event handlers."""
-        self.unregister_key_handlers()
+        """Registers keyboard event handlers for every bound key."""
+        # Deferred: the hook library is only loaded once armed
+        if self.listener is None:
+            self.listener = create_listener(self._listener_spec)
         
-        key = self.settings.get('key', 'space')
-        hold_mode = self.settings.get('hold_mode', True)
-        
-        if hold_mode:
+        # Press and release are both hooked; hold vs toggle is decided per
+        # event from the key's snapshot, so mode changes need no re-hook
+        self.bindings.arm(self.listener)
+    
+    def _on_key_press(self, key, settings):
+        audit.count('hooks')
+        self.stats.hook_events += 1
+        if settings.hold_mode:
             # Hold-to-scroll mode
-            on_press = keyboard.on_press_key(key, lambda _: self.start_scrolling(), suppress=True)
-            on_release = keyboard.on_release_key(key, lambda _: self.stop_scrolling(), suppress=True)
-            self._key_hooks = [on_press, on_release]
+            self._activate(key, settings)
+        elif self._scroll_active.is_set() and self._active_key == key:
+            # Toggle mode: the same key turns it off
+            self.stop_scrolling()
+            self._is_toggled = False
         else:
-            # Toggle mode
-            on_press = keyboard.on_press_key(key, lambda _: self.toggle_scrolling(), suppress=True)
-            self._key_hooks = [on_press]
+            # Toggle mode: turn on, or take over from another binding
+            self._activate(key, settings)
+            self._is_toggled = True
+    
+    def _on_key_release(self, key, settings):
+        audit.count('hooks')
+        self.stats.hook_events += 1
+        if settings.hold_mode and self._active_key == key:
+            self.stop_scrolling()
+    
+    def _activate(self, key, settings):
+        """Runs the loop with a binding's snapshot and starts scrolling."""
+        self._active_key = key
+        if self.config is not settings:
+            self.config = settings
+            self._wake.set()
+        self.start_scrolling()
     
     def unregister_key_handlers(self):
         """Unregisters all keyboard event handlers."""
-        for hook in self._key_hooks:
-            try:
-                keyboard.unhook(hook)
-            except:
-                pass
-        self._key_hooks = []
+        self.bindings.disarm()
     
     def update_settings(self, new_settings):
         """
         Updates scroller settings.
+        Compiles a new immutable snapshot and swaps it in atomically; the
+        scroll loop picks it up at the next tick boundary. `new_settings`
+        is never modified. Keys are rebound as a diff: keys that stay bound
+        are never unhooked, new keys are live before old ones go away.
         
         Args:
             new_settings: Dictionary with settings like:
@@ -171,41 +365,131 @@ class AdvancedScroller(threading.Thread):
                 - hold_mode: True for hold, False for toggle (bool)
                 - smooth_scrolling: Enable smooth scrolling (bool)
                 - acceleration: Enable scroll acceleration (bool)
+                - bindings: Extra key bindings, each a dict with 'key' plus any
+                  settings that differ from the primary ones (list)
         """
-        # Convert delay from ms to seconds
-        if 'delay' in new_settings:
-            new_settings['delay'] = max(new_settings['delay'] / 1000.0, 0.0001)
-        
-        # Validate strength
-        if 'strength' in new_settings:
-            new_settings['strength'] = max(1, min(10, new_settings['strength']))
+        # Build and publish the new snapshots (validation happens in ScrollSettings)
+        with self._config_lock:
+            primary = self._primary.merged(new_settings)
+            if 'bindings' in new_settings:
+                self._binding_specs = [dict(spec) for spec in new_settings['bindings'] or ()]
+            self._publish(primary, compile_bindings(primary, self._binding_specs))
+    
+    def apply_config(self, config, bindings=None, specs=None):
+        """
+        Swaps in a precompiled ScrollSettings snapshot (e.g. a profile) and,
+        optionally, its precompiled binding table ({key: ScrollSettings}).
+        `specs` are the binding specs the table was compiled from; they are
+        kept so a later update_settings() recompiles the same extra keys.
+        Constant time; the scroller thread and unchanged key hooks stay in place.
+        """
+        with self._config_lock:
+            primary = config.with_version(self._primary.version + 1)
+            table = dict(bindings or {})
+            table[primary.key] = primary
+            self._binding_specs = [dict(spec) for spec in specs or ()]
+            self._publish(primary, table)
+    
+    def _publish(self, primary, table):
+        """Swaps in new snapshots and rebinds keys as a diff. Caller holds _config_lock."""
+        old_config = self.config
+        self._primary = primary
+        removed = self.bindings.apply(table)
         
-        # Update settings
-        self.settings.update(new_settings)
+        active_key = self._active_key
+        self.config = table.get(active_key, primary) if active_key is not None else primary
+        self._wake.set()
         
-        # Re-register key handlers if key or mode changed
-        if 'key' in new_settings or 'hold_mode' in new_settings:
-            if hasattr(self, '_key_hooks'):
-                self.register_key_handlers()
+        if active_key is not None and active_key in removed:
+            # The binding that is scrolling is gone; its release would never arrive
+            self.stop_scrolling()
+            self._is_toggled = False
+        elif self.config.hold_mode != old_config.hold_mode:
+            # Don't carry a held or toggled state across a mode change
+            self.stop_scrolling()
+            self._is_toggled = False
     
     def stop(self):
         """Stops the scroller thread and cleans up."""
         self.unregister_key_handlers()
         self.stop_scrolling()
         self._shutdown.set()
+        self._wake.set()
         if self.is_alive():
             self.join(timeout=1.0)
+        if self.listener is not None:
+            self.listener.close()
+        self.backend.close()
     
     def get_status(self):
         """Returns current scroller status."""
+        config = self.config
         return {
             'active': self._scroll_active.is_set(),
             'toggled': self._is_toggled,
-            'key': self.settings.get('key', 'space'),
-            'mode': 'hold' if self.settings.get('hold_mode', True) else 'toggle',
-            'strength': self.settings.get('strength', 1),
-            'delay_ms': int(self.settings.get('delay', 0.001) * 1000)
+            'key': config.key,
+            'mode': 'hold' if config.hold_mode else 'toggle',
+            'strength': config.strength,
+            'delay_ms': config.delay_ms,
+            'pattern': config.schedule.name,
+            'settings_version': config.version,
+            'bindings': self.bindings.keys(),
+            'active_key': self._active_key,
+            'backend': self.backend.name,
+            'listener': self.listener.name if self.listener else self._listener_spec,
+            'engine': 'thread',
+            'realtime': self.realtime,
+            'cpu_s': self.cpu_time(),
+            'scheduler': self.scheduler.get_stats(),
+            'latency': self.stats.to_dict()
         }
+    
+    def metrics(self, bounds_ns=(5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 500_000,
+                                 1_000_000, 2_500_000, 5_000_000, 10_000_000)):
+        """
+        Returns the scroller's counters as plain numbers, for export.
+        Only reads attributes the scroll loop writes; takes no locks.
+        """
+        stats = self.stats
+        active = self._scroll_active.is_set()
+        active_ns = stats.active_ns
+        if active:
+            active_ns += self.clock.now_ns() - self._activated_at
+        return {
+            'active': int(active),
+            'units': stats.units,
+            'ticks': stats.ticks,
+            'overruns': self.scheduler.missed,
+            'skipped_periods': self.scheduler.skipped,
+            'overloads': stats.overloads,
+            'dropped_units': stats.dropped_units,
+            'hook_events': stats.hook_events,
+            'activations': stats.activations,
+            'active_seconds': active_ns / 1e9,
+            'emit_duration_bounds_ns': bounds_ns,
+            'emit_duration_buckets': stats.emit_duration.cumulative(bounds_ns),
+            'emit_duration_sum_ns': stats.emit_duration.total,
+        }
+    
+    def cpu_time(self):
+        """Returns CPU seconds used by the scroll loop thread, or None where unsupported."""
+        if self.ident is None or not hasattr(time, 'pthread_getcpuclockid'):
+            return None
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(self.ident))
+        except OSError:
+            return None
+    
+    def export_stats(self, path=None, include_buckets=False):
+        """
+        Exports latency/jitter measurements as JSON.
+        Writes to `path` if given; always returns the JSON string.
+        """
+        data = self.stats.to_json(include_buckets)
+        if path:
+            with open(path, 'w') as f:
+                f.write(data)
+        return data
 
 
 # For backwards compatibility
@@ -0,0 +1,116 @@
+import logging
+from patterns import compile_pattern
+
+logger = logging.getLogger(__name__)
+
+# Acceleration builds up only while ticks come less than 100 ms apart
+ACCELERATION_MAX_PERIOD = 0.1
+
+
+class ScrollSettings:
+    """
+    Immutable, versioned snapshot of scroller settings.
+    Values are validated and converted once when the snapshot is built, so the
+    scroll loop reads plain attributes instead of doing dict lookups per tick.
+    A new snapshot replaces the old one atomically; it is never mutated.
+    """
+    __slots__ = (
+        'version', 'key', 'delay_ms', 'delay', 'tick_period', 'strength',
+        'hold_mode', 'smooth_scrolling', 'acceleration', 'overload_policy', 'pattern',
+        'schedule'
+    )
+
+    def __init__(self, key='space', delay=1, strength=1, hold_mode=True,
+                 smooth_scrolling=False, acceleration=False, overload_policy='coalesce',
+                 pattern=None, version=0):
+        """
+        Args:
+            key: Activation key (string)
+            delay: Delay in milliseconds (number)
+            strength: Scroll strength, clamped to 1-10 (int)
+            hold_mode: True for hold, False for toggle (bool)
+            smooth_scrolling: Enable smooth scrolling (bool)
+            acceleration: Enable scroll acceleration (bool)
+            overload_policy: What to do when the backend can't keep up:
+                'coalesce', 'drop' or 'stretch' (see OVERLOAD_POLICIES)
+            pattern: Emission pattern dict or built-in name (see patterns.py);
+                None for constant, or the acceleration curve if enabled
+            version: Monotonic snapshot version (int)
+        """
+        delay_s = max(delay / 1000.0, 0.0001)
+        init = object.__setattr__
+        init(self, 'version', version)
+        init(self, 'key', key)
+        init(self, 'delay_ms', delay)
+        init(self, 'delay', delay_s)
+        # Smooth scrolling halves the tick period for a smoother feel
+        init(self, 'tick_period', delay_s * 0.5 if smooth_scrolling else delay_s)
+        init(self, 'strength', max(1, min(10, int(strength))))
+        init(self, 'hold_mode', bool(hold_mode))
+        init(self, 'smooth_scrolling', bool(smooth_scrolling))
+        init(self, 'acceleration', bool(acceleration))
+        init(self, 'overload_policy',
+             overload_policy if overload_policy in OVERLOAD_POLICIES else 'coalesce')
+        # The pattern is compiled into per-tick arrays here, once per snapshot
+        accelerate = acceleration and self.tick_period < ACCELERATION_MAX_PERIOD
+        default = 'accelerate' if accelerate else None
+        try:
+            schedule = compile_pattern(default if pattern is None else pattern,
+                                       self.strength, self.tick_period)
+        except ValueError as e:
+            logger.warning(f"Invalid pattern ignored: {e}")
+            pattern = None  # Malformed: fall back to the plain curve
+            schedule = compile_pattern(default, self.strength, self.tick_period)
+        init(self, 'pattern', pattern)
+        init(self, 'schedule', schedule)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ScrollSettings is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ScrollSettings is immutable")
+
+    def __repr__(self):
+        return f"ScrollSettings(v{self.version}, {self.to_dict()})"
+
+    @classmethod
+    def from_dict(cls, settings, version=0):
+        """Builds a snapshot from a GUI/config style dict (delay in ms); unknown keys are ignored."""
+        return cls(version=version, **{k: settings[k] for k in SETTING_KEYS if k in settings})
+
+    def merged(self, changes):
+        """Returns a new snapshot with `changes` applied and the version bumped."""
+        values = self.to_dict()
+        values.update((k, changes[k]) for k in SETTING_KEYS if k in changes)
+        return ScrollSettings(version=self.version + 1, **values)
+
+    def with_version(self, version):
+        """Returns a copy of this snapshot carrying a different version (no recompiling)."""
+        copy = object.__new__(ScrollSettings)
+        for name in self.__slots__:
+            object.__setattr__(copy, name, getattr(self, name))
+        object.__setattr__(copy, 'version', version)
+        return copy
+
+    def to_dict(self):
+        """Returns the settings as a GUI/config style dict (delay in ms)."""
+        return {
+            'key': self.key,
+            'delay': self.delay_ms,
+            'strength': self.strength,
+            'hold_mode': self.hold_mode,
+            'smooth_scrolling': self.smooth_scrolling,
+            'acceleration': self.acceleration,
+            'overload_policy': self.overload_policy,
+            'pattern': self.pattern
+        }
+
+
+SETTING_KEYS = ('key', 'delay', 'strength', 'hold_mode', 'smooth_scrolling', 'acceleration',
+                'overload_policy', 'pattern')
+
+# When emits cost more than the tick period allows:
+#   coalesce - send owed units in fewer, larger emits (keeps the scroll distance)
+#   drop     - skip the units that don't fit (keeps the rate of small emits)
+#   stretch  - lengthen the tick period to fit the emit cost (keeps every emit)
+OVERLOAD_POLICIES = ('coalesce', 'drop', 'stretch')
@@ -0,0 +1,66 @@
+import time
+import logging
+import importlib
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTrace:
+    """
+    Records per-module import time and per-phase construction time during
+    startup, plus milestones (time-to-first-window, time-to-armed) measured
+    from process start.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter_ns()
+        self.entries = []     # (kind, name, duration_ns)
+        self.milestones = {}  # name -> ns since start
+
+    @contextmanager
+    def phase(self, name):
+        """Times a construction phase."""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self._record('phase', name, time.perf_counter_ns() - start)
+
+    def import_module(self, name):
+        """Imports a module and records how long it took (0 if already loaded)."""
+        start = time.perf_counter_ns()
+        module = importlib.import_module(name)
+        self._record('import', name, time.perf_counter_ns() - start)
+        return module
+
+    def _record(self, kind, name, duration_ns):
+        self.entries.append((kind, name, duration_ns))
+        logger.debug(f"Startup {kind} {name}: {duration_ns / 1e6:.1f} ms")
+
+    def mark(self, name):
+        """Records a milestone once, relative to process start, and logs it."""
+        if name in self.milestones:
+            return
+        elapsed = time.perf_counter_ns() - self.started_at
+        self.milestones[name] = elapsed
+        logger.info(f"Startup: time-to-{name} {elapsed / 1e6:.1f} ms")
+
+    def summary(self):
+        """Returns the trace as a dict (milliseconds)."""
+        return {
+            'entries': [
+                {'kind': kind, 'name': name, 'ms': duration / 1e6}
+                for kind, name, duration in self.entries
+            ],
+            'milestones_ms': {name: t / 1e6 for name, t in self.milestones.items()},
+        }
+
+    def log_summary(self):
+        """Logs every recorded import and phase, slowest first."""
+        for kind, name, duration in sorted(self.entries, key=lambda e: -e[2]):
+            logger.info(f"Startup {kind:<6} {name:<28} {duration / 1e6:8.1f} ms")
+
+
+# Process-wide trace; created when main.py first imports this module
+trace = StartupTrace()
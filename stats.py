@@ -0,0 +1,219 @@
+import json
+from array import array
+
+
+class Histogram:
+    """
+    Fixed-memory latency histogram with HDR-style log-linear buckets.
+    Each power of two is split into 2**sub_bucket_bits linear buckets, so the
+    relative error stays below 1/2**sub_bucket_bits across the whole range.
+    Counts live in a preallocated array; recording never allocates a bucket.
+    """
+
+    def __init__(self, sub_bucket_bits=4, max_value_bits=40):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self._shift = sub_bucket_bits + 1
+        size = (max_value_bits - sub_bucket_bits + 1) * self.sub_bucket_count
+        self.counts = array('Q', bytes(8 * size))
+        self.reset()
+
+    def reset(self):
+        """Clears all recorded values."""
+        counts = self.counts
+        for i in range(len(counts)):
+            counts[i] = 0
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value):
+        sub = self.sub_bucket_count
+        if value < sub:
+            return value
+        exponent = value.bit_length() - self._shift
+        index = (exponent + 1) * sub + (value >> exponent) - sub
+        return min(index, len(self.counts) - 1)
+
+    def _bucket_value(self, index):
+        """Returns the highest value that maps to bucket `index`."""
+        sub = self.sub_bucket_count
+        if index < sub:
+            return index
+        exponent = index // sub - 1
+        return ((index % sub + sub + 1) << exponent) - 1
+
+    def record(self, value):
+        """Records a non-negative integer value (nanoseconds by convention)."""
+        if value < 0:
+            value = 0
+        self.counts[self._index(value)] += 1
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q):
+        """Returns the value at percentile q (0-100), within bucket precision."""
+        if self.count == 0:
+            return 0
+        target = max(1, int(self.count * q / 100.0 + 0.5))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            if n:
+                seen += n
+                if seen >= target:
+                    return min(self._bucket_value(index), self.max)
+        return self.max
+
+    def buckets(self):
+        """Returns non-empty (upper_bound, count) pairs in ascending order."""
+        return [(self._bucket_value(i), n) for i, n in enumerate(self.counts) if n]
+
+    def cumulative(self, bounds):
+        """
+        Returns how many values fell at or below each of the ascending `bounds`,
+        followed by the total, in one pass over the counts. A bucket counts
+        towards a bound only if its whole range is at or below it.
+        """
+        result = [0] * (len(bounds) + 1)
+        slot = 0
+        last = len(bounds)
+        for index, n in enumerate(self.counts):
+            if n:
+                upper = self._bucket_value(index)
+                while slot < last and upper > bounds[slot]:
+                    slot += 1
+                result[slot] += n
+        for i in range(1, len(result)):
+            result[i] += result[i - 1]
+        return result
+
+    def to_dict(self, scale=1000.0):
+        """Returns a summary; values are divided by `scale` (ns -> us by default)."""
+        if self.count == 0:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'min': self.min / scale,
+            'mean': self.total / self.count / scale,
+            'p50': self.percentile(50) / scale,
+            'p90': self.percentile(90) / scale,
+            'p99': self.percentile(99) / scale,
+            'p99.9': self.percentile(99.9) / scale,
+            'max': self.max / scale,
+        }
+
+
+class ScrollerStats:
+    """
+    Latency and jitter instrumentation for the scroll loop.
+    All values are recorded in nanoseconds and reported in microseconds.
+    """
+    HISTOGRAMS = ('hook_to_emit', 'emit_interval', 'jitter', 'emit_duration', 'overrun',
+                  'release_to_halt')
+
+    def __init__(self):
+        self.hook_to_emit = Histogram()   # Key hook -> first emit of an activation
+        self.emit_interval = Histogram()  # Start of one emit -> start of the next
+        self.jitter = Histogram()         # |emit interval - tick period|
+        self.emit_duration = Histogram()  # Time spent inside the backend per tick
+        self.overrun = Histogram()        # Lateness of ticks that missed their deadline
+        self.release_to_halt = Histogram()  # Stop request -> scroll loop halted
+        self.units = 0
+        self.ticks = 0
+        # Backpressure: the backend couldn't keep up with the tick rate
+        self.emit_cost_ns = 0     # Moving average cost of one backend call
+        self.pause_cost_ns = 0    # Moving average length of a smooth-scroll pause
+        self.overloads = 0        # Ticks that couldn't fit their emits
+        self.coalesced_units = 0  # Units carried over into larger emits
+        self.dropped_units = 0    # Units skipped under the 'drop' policy
+        self.stretched_ticks = 0  # Ticks lengthened under the 'stretch' policy
+        self.gap_fits = 0         # Smooth-scroll ticks emitted in fewer steps so pauses fit
+        # Activity, counted on the hook side
+        self.hook_events = 0      # Bound key presses and releases
+        self.activations = 0      # Times scrolling was started
+        self.active_ns = 0        # Time spent scrolling, up to the last stop
+
+    def reset(self):
+        """Clears all histograms and counters."""
+        for name in self.HISTOGRAMS:
+            getattr(self, name).reset()
+        self.units = 0
+        self.ticks = 0
+        self.emit_cost_ns = 0
+        self.pause_cost_ns = 0
+        self.overloads = 0
+        self.coalesced_units = 0
+        self.dropped_units = 0
+        self.stretched_ticks = 0
+        self.gap_fits = 0
+        self.hook_events = 0
+        self.activations = 0
+        self.active_ns = 0
+
+    def to_dict(self):
+        """Returns a JSON-serializable summary of all measurements (us)."""
+        result = {
+            'ticks': self.ticks,
+            'units': self.units,
+            'emit_cost_us': self.emit_cost_ns / 1000,
+            'pause_cost_us': self.pause_cost_ns / 1000,
+            'overloads': self.overloads,
+            'coalesced_units': self.coalesced_units,
+            'dropped_units': self.dropped_units,
+            'stretched_ticks': self.stretched_ticks,
+            'gap_fits': self.gap_fits
+        }
+        for name in self.HISTOGRAMS:
+            result[name + '_us'] = getattr(self, name).to_dict()
+        return result
+
+    def to_json(self, include_buckets=False):
+        """Exports the measurements as JSON, optionally with raw buckets (ns)."""
+        result = self.to_dict()
+        if include_buckets:
+            result['buckets_ns'] = {
+                name: getattr(self, name).buckets() for name in self.HISTOGRAMS
+            }
+        return json.dumps(result, indent=2)
+
+
+class PaintStats:
+    """
+    Repaint instrumentation for the GUI window.
+    A pass is one backing-store sync of the window: every dirty widget is
+    repainted and flushed. Background paints are the window's own
+    paintEvent calls and the pixels they cover.
+    All durations are recorded in nanoseconds and reported in microseconds.
+    """
+    HISTOGRAMS = ('pass_duration', 'background_duration')
+
+    def __init__(self):
+        self.pass_duration = Histogram()        # Whole repaint pass
+        self.background_duration = Histogram()  # Window background paint
+        self.passes = 0
+        self.background_paints = 0
+        self.background_pixels = 0
+
+    def reset(self):
+        """Clears all histograms and counters."""
+        for name in self.HISTOGRAMS:
+            getattr(self, name).reset()
+        self.passes = 0
+        self.background_paints = 0
+        self.background_pixels = 0
+
+    def to_dict(self):
+        """Returns a JSON-serializable summary of all measurements (us)."""
+        result = {
+            'passes': self.passes,
+            'background_paints': self.background_paints,
+            'background_pixels': self.background_pixels
+        }
+        for name in self.HISTOGRAMS:
+            result[name + '_us'] = getattr(self, name).to_dict()
+        return result
@@ -0,0 +1,95 @@
+from array import array
+
+
+class TelemetryRing:
+    """
+    Single-producer ring buffer of per-tick scroll samples.
+    Written by the scroller thread, read by anyone, with no locks: every slot
+    lives in preallocated arrays, the producer fills a slot and only then
+    advances `head`, and readers never write. A reader that falls more than
+    `capacity` samples behind simply loses the oldest ones.
+    """
+
+    def __init__(self, capacity=4096):
+        if capacity & (capacity - 1):
+            raise ValueError("Capacity must be a power of two")
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self.timestamps = array('q', bytes(8 * capacity))  # perf_counter_ns of the emit
+        self.strength = array('H', bytes(2 * capacity))    # Strength after acceleration
+        self.units = array('H', bytes(2 * capacity))       # Wheel units actually emitted
+        self.jitter = array('q', bytes(8 * capacity))      # |interval - period|, ns
+        self.head = 0  # Samples ever written; only the producer advances it
+
+    def push(self, timestamp, strength, units, jitter):
+        """Records one tick. Producer thread only."""
+        i = self.head & self._mask
+        self.timestamps[i] = timestamp
+        self.strength[i] = strength
+        self.units[i] = units
+        self.jitter[i] = jitter
+        self.head += 1  # Publish only after the slot is complete
+
+
+class TelemetryReader:
+    """
+    Consumer side of a TelemetryRing, meant to be polled at a fixed rate.
+    Each sample() summarizes the ticks written since the previous call.
+    """
+
+    def __init__(self, ring):
+        self.ring = ring
+        self._tail = ring.head
+        self._last_timestamp = 0
+
+    def sample(self):
+        """
+        Returns {'events_per_sec', 'units_per_sec', 'strength', 'jitter_us',
+        'jitter_max_us', 'ticks', 'lost'} for the ticks since the last call.
+        """
+        ring = self.ring
+        head = ring.head
+        # Skip what the producer may be overwriting right now
+        start = max(self._tail, head - ring.capacity + 1)
+        lost = start - self._tail
+        self._tail = head
+
+        ticks = head - start
+        result = {
+            'events_per_sec': 0.0, 'units_per_sec': 0.0, 'strength': 0,
+            'jitter_us': 0.0, 'jitter_max_us': 0.0, 'ticks': ticks, 'lost': lost
+        }
+        if ticks <= 0:
+            return result
+
+        mask = ring._mask
+        first = ring.timestamps[start & mask]
+        last = ring.timestamps[(head - 1) & mask]
+        units = 0
+        jitter_total = 0
+        jitter_max = 0
+        for n in range(start, head):
+            i = n & mask
+            units += ring.units[i]
+            jitter = ring.jitter[i]
+            jitter_total += jitter
+            if jitter > jitter_max:
+                jitter_max = jitter
+
+        # Rate over the span from the previous batch's last tick when known
+        origin = self._last_timestamp if 0 < self._last_timestamp < first else first
+        intervals = ticks if origin != first else ticks - 1
+        span = (last - origin) / 1e9
+        self._last_timestamp = last
+        if span > 0:
+            result['events_per_sec'] = intervals / span
+            result['units_per_sec'] = result['events_per_sec'] * units / ticks
+        result['strength'] = ring.strength[(head - 1) & mask]
+        result['jitter_us'] = jitter_total / ticks / 1000
+        result['jitter_max_us'] = jitter_max / 1000
+        return result
+
+    def reset(self):
+        """Drops everything written so far."""
+        self._tail = self.ring.head
+        self._last_timestamp = 0
@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from listeners import KeyListener
+
+
+class FakeListener(KeyListener):
+    """Key listener that only remembers its hooks; tests press keys by hand."""
+    name = 'fake'
+
+    def __init__(self):
+        self.hooks = {}
+
+    def hook(self, key, on_press=None, on_release=None, suppress=True):
+        self.hooks[key] = (on_press, on_release)
+        return key
+
+    def unhook(self, handle):
+        self.hooks.pop(handle, None)
@@ -0,0 +1,37 @@
+from backends import UinputBackend, UinputFileBackend, decode_input_events
+
+WHEEL = (UinputBackend.EV_REL, UinputBackend.REL_WHEEL)
+HWHEEL = (UinputBackend.EV_REL, UinputBackend.REL_HWHEEL)
+SYN = (UinputBackend.EV_SYN, UinputBackend.SYN_REPORT, 0)
+
+
+def read_events(backend):
+    with open(backend.path, 'rb') as f:
+        return decode_input_events(f.read())
+
+
+def test_uinput_batch_is_one_write_per_flush(tmp_path):
+    backend = UinputFileBackend(str(tmp_path / 'events.bin'))
+    try:
+        backend.scroll(0, -3)
+        backend.scroll(2, 1)
+        backend.scroll(0, 0)  # Nothing to send
+        assert read_events(backend) == []  # Queued until flushed
+        backend.flush()
+        backend.flush()  # Empty: no write
+        assert (backend.requests, backend.flushes) == (5, 1)
+        assert read_events(backend) == [(*WHEEL, -3), SYN, (*WHEEL, 1), (*HWHEEL, 2), SYN]
+    finally:
+        backend.close()
+
+
+def test_uinput_full_buffer_flushes_before_queuing_more(tmp_path):
+    backend = UinputFileBackend(str(tmp_path / 'events.bin'), capacity=8)
+    try:
+        for _ in range(5):
+            backend.scroll(0, -1)
+        backend.close()
+        assert backend.flushes == 2  # One when the buffer filled up, one on close
+        assert read_events(backend) == [(*WHEEL, -1), SYN] * 5
+    finally:
+        backend.close()
@@ -0,0 +1,54 @@
+from bindings import BindingTable, compile_bindings
+from settings import ScrollSettings
+from conftest import FakeListener
+
+
+class LoggingListener(FakeListener):
+    def __init__(self):
+        super().__init__()
+        self.log = []
+
+    def hook(self, key, on_press=None, on_release=None, suppress=True):
+        self.log.append(('hook', key))
+        return super().hook(key, on_press, on_release, suppress)
+
+    def unhook(self, handle):
+        self.log.append(('unhook', handle))
+        super().unhook(handle)
+
+
+def test_compiled_bindings_inherit_from_the_primary():
+    primary = ScrollSettings(key='space', delay=5, strength=2)
+    table = compile_bindings(primary, [{'key': 'c', 'strength': 7}])
+    assert table['space'] is primary
+    assert (table['c'].key, table['c'].delay_ms, table['c'].strength) == ('c', 5, 7)
+
+
+def test_rebind_adds_before_it_removes_and_keeps_shared_keys_hooked():
+    pressed = []
+    bindings = BindingTable(lambda key, s: pressed.append((key, s.strength)), lambda key, s: None)
+    listener = LoggingListener()
+    primary = ScrollSettings(key='space')
+    bindings.apply(compile_bindings(primary, [{'key': 'a'}]))
+    bindings.arm(listener)
+    listener.log.clear()
+
+    removed = bindings.apply(compile_bindings(primary, [{'key': 'b', 'strength': 9}]))
+    assert removed == ['a']
+    assert listener.log == [('hook', 'b'), ('unhook', 'a')]  # 'space' never unhooked
+    assert sorted(listener.hooks) == ['b', 'space']
+    assert bindings.rebinds == 1
+
+    listener.hooks['b'][0]()
+    assert pressed == [('b', 9)]
+
+
+def test_apply_while_disarmed_only_swaps_the_table():
+    bindings = BindingTable(lambda key, s: None, lambda key, s: None)
+    bindings.apply({'x': ScrollSettings(key='x')})
+    assert bindings.keys() == ['x'] and not bindings.armed
+    listener = FakeListener()
+    bindings.arm(listener)
+    assert list(listener.hooks) == ['x']
+    bindings.disarm()
+    assert listener.hooks == {} and not bindings.armed
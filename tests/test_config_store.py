@@ -0,0 +1,17 @@
+import json
+from config_store import ConfigStore
+
+
+def test_failed_write_keeps_changes_dirty(tmp_path):
+    path = tmp_path / 'missing' / 'config.json'  # Directory doesn't exist yet
+    store = ConfigStore(str(path), debounce=60.0)
+    store.update({'key': 'space'})
+    store.flush()
+    assert store.dirty
+    assert store.writes == 0
+
+    path.parent.mkdir()
+    store.flush()
+    assert not store.dirty
+    assert json.loads(path.read_text()) == {'key': 'space'}
+    store.close()
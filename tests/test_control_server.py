@@ -0,0 +1,72 @@
+import os
+import stat
+import pytest
+from backends import RecordingBackend
+from control_server import ControlClient, ControlServer
+from controller import BhopController
+from profiles import ProfileStore
+from conftest import FakeListener
+
+
+@pytest.fixture
+def served(tmp_path):
+    controller = BhopController(backend=RecordingBackend(capacity=1 << 12), listener=FakeListener())
+    controller.set_profiles(ProfileStore({'a': {'key': 'space'}, 'b': {'key': 'v'}}, 'a'))
+    dispatched = []
+
+    def dispatch(fn):
+        dispatched.append(fn)
+        return fn()
+
+    path = str(tmp_path / 'control.sock')
+    server = ControlServer(controller, path, dispatch=dispatch)
+    server.start()
+    client = ControlClient(path)
+    yield controller, server, client, dispatched
+    client.close()
+    server.stop()
+    controller.cleanup()
+
+
+def test_socket_is_owner_only_and_removed_on_stop(served):
+    controller, server, client, _ = served
+    assert stat.S_IMODE(os.stat(server.path).st_mode) == 0o600
+    server.stop()
+    assert not os.path.exists(server.path)
+
+
+def test_commands_run_through_the_dispatcher(served):
+    controller, server, client, dispatched = served
+    response = client.call('ping')
+    assert (response['id'], response['ok'], response['result']) == (1, True, 'pong')
+    assert isinstance(response['handled_ns'], int)
+    assert len(dispatched) == 1 and server.requests == 1
+
+
+def test_start_update_and_switch_reach_the_controller(served):
+    controller, server, client, _ = served
+    assert client.call('start_scrolling')['result'] is True  # Active profile's settings
+    assert controller.is_running and controller.current_settings['key'] == 'space'
+
+    assert client.call('update_settings', settings={'strength': 4})['result'] is True
+    status = client.call('get_status')['result']
+    assert status['running'] and status['settings']['strength'] == 4
+    assert controller.scroller.config.strength == 4
+
+    assert client.call('switch_profile', name='b')['result'] is True
+    assert controller.scroller.config.key == 'v'
+
+    assert client.call('activate')['ok']
+    assert controller.scroller.get_status()['active']
+    assert client.call('deactivate')['ok']
+    assert not controller.scroller.get_status()['active']
+
+
+def test_errors_are_answered_not_raised(served):
+    controller, server, client, _ = served
+    response = client.call('bogus')
+    assert not response['ok'] and response['error'] == "ValueError: Unknown command: bogus"
+    assert client.call('activate')['error'] == "RuntimeError: Scroller not started"
+    assert 'KeyError' in client.call('update_settings')['error']  # Missing 'settings'
+    assert server.handle(b'not json').startswith(b'{"id":null,"ok":false')
+    assert client.call('ping')['ok']  # The connection survives every error
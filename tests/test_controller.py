@@ -0,0 +1,58 @@
+import pytest
+from backends import RecordingBackend
+from controller import BhopController
+from profiles import ProfileStore
+from conftest import FakeListener
+
+
+def make_controller():
+    listener = FakeListener()
+    controller = BhopController(backend=RecordingBackend(), listener=listener)
+    controller.set_profiles(ProfileStore({
+        'a': {'key': 'space'},
+        'b': {'key': 'v', 'bindings': [{'key': 'c', 'strength': 5}]},
+    }, 'a'))
+    return controller, listener
+
+
+def test_switch_profile_then_update_settings_keeps_profile_bindings():
+    controller, listener = make_controller()
+    try:
+        assert controller.start_scrolling(controller.profiles.settings())
+        assert controller.switch_profile('b')
+        assert sorted(controller.scroller.bindings.keys()) == ['c', 'v']
+
+        assert controller.update_settings({'strength': 3})
+        scroller = controller.scroller
+        assert sorted(scroller.bindings.keys()) == ['c', 'v']
+        assert sorted(listener.hooks) == ['c', 'v']
+        assert scroller.bindings.get('v').strength == 3
+        assert scroller.bindings.get('c').strength == 5
+    finally:
+        controller.stop_scrolling()
+        controller.cleanup()
+
+
+def test_switch_profile_swaps_in_the_precompiled_snapshot():
+    controller, listener = make_controller()
+    switched = []
+    controller.profile_changed.connect(switched.append)
+    try:
+        assert controller.start_scrolling(controller.profiles.settings())
+        scroller = controller.scroller
+        assert controller.switch_profile('b')
+        assert controller.scroller is scroller  # Same thread, no restart
+        assert scroller.config.key == 'v'
+        assert scroller.config.schedule is controller.profiles.compiled('b').schedule
+        assert sorted(listener.hooks) == ['c', 'v']
+        assert switched == ['b']
+        assert not controller.switch_profile('missing')
+        assert scroller.config.key == 'v'
+    finally:
+        controller.stop_scrolling()
+        controller.cleanup()
+
+
+def test_recording_refuses_the_process_engine(tmp_path):
+    with pytest.raises(ValueError):
+        BhopController(record=str(tmp_path / 'session.bhr'), engine='process')
@@ -0,0 +1,100 @@
+import time
+import threading
+import pytest
+from engine_process import (CONTROL_SIZE, FIELDS, PATTERN_SIZE, ControlBlock, ProcessScroller,
+                            SharedTelemetryRing)
+from telemetry import TelemetryReader
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_control_block_fields_round_trip():
+    block = ControlBlock(bytearray(CONTROL_SIZE))
+    block.write(active=1, delay_ms=2.5, strength=7, pattern=b'{"type":"ramp"}')
+    state = block.read(FIELDS[1:-1])
+    assert (state['active'], state['delay_ms'], state['strength']) == (1, 2.5, 7)
+    assert state['pattern'] == b'{"type":"ramp"}'
+    assert block.get('seq') == 2  # Even: no write in progress
+    with pytest.raises(ValueError):
+        block.set('pattern', b'x' * (PATTERN_SIZE + 1))
+
+
+def test_control_block_reads_are_never_torn():
+    block = ControlBlock(bytearray(CONTROL_SIZE))
+    done = threading.Event()
+
+    def writer():
+        n = 0
+        while not done.is_set():
+            n += 1
+            block.write(strength=n, delay_ms=float(n), report_seq=n)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(20000):
+            state = block.read(('strength', 'delay_ms', 'report_seq'))
+            assert state['strength'] == state['delay_ms'] == state['report_seq']
+    finally:
+        done.set()
+        thread.join()
+
+
+def test_shared_telemetry_ring_is_readable_through_the_buffer():
+    buffer = bytearray(CONTROL_SIZE + SharedTelemetryRing.size(8))
+    producer = SharedTelemetryRing(buffer, CONTROL_SIZE, 8)
+    consumer = SharedTelemetryRing(buffer, CONTROL_SIZE, 8)  # Another view, like the parent's
+    reader = TelemetryReader(consumer)
+    for n in range(3):
+        producer.push(n * 1_000_000, 5, 2, 100)
+    assert consumer.head == 3
+    sample = reader.sample()
+    assert sample['ticks'] == 3 and sample['strength'] == 5
+    assert sample['units_per_sec'] == pytest.approx(2000)
+    producer.release()
+    consumer.release()
+    with pytest.raises(ValueError):
+        SharedTelemetryRing(buffer, CONTROL_SIZE, 6)
+
+
+def test_large_pattern_reaches_the_engine():
+    # Thousands of steps: far more JSON than the control block holds
+    pattern = {'type': 'steps', 'steps': [[5, 1]] * 3000}
+    scroller = ProcessScroller(backend='recording')
+    try:
+        scroller.update_settings({'delay': 1, 'pattern': {'type': 'steps', 'steps': [[2, 1]] * 3000}})
+        scroller.update_settings({'pattern': pattern})
+        assert scroller._pattern_segment.size > PATTERN_SIZE
+        scroller.start()
+        assert scroller.wait_ready()
+        scroller.start_scrolling()
+        wait_for(lambda: scroller.metrics()['ticks'] >= 20)
+        scroller.stop_scrolling()
+        time.sleep(0.05)  # Let the last tick finish
+        metrics = scroller.metrics()
+        assert metrics['units'] == 5 * metrics['ticks']
+    finally:
+        scroller.stop()
+
+
+def test_engine_metrics_fall_back_to_the_last_report():
+    scroller = ProcessScroller(backend='recording')
+    try:
+        scroller.update_settings({'delay': 1})
+        scroller.start()
+        assert scroller.wait_ready()
+        scroller.start_scrolling()
+        wait_for(lambda: scroller.metrics()['ticks'] >= 10)
+        scroller.stop_scrolling()
+        time.sleep(0.05)
+        last = scroller.metrics()['units']
+        scroller.process.kill()
+        scroller.process.join()
+        assert scroller.metrics()['units'] == last  # Counters never go back to zero
+    finally:
+        scroller.stop()
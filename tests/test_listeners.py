@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import threading
+import pytest
+from listeners import EvdevListener
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason="evdev is Linux only")
+
+EVENT = EvdevListener.EVENT
+SPACE = EvdevListener.key_codes('space')[0]
+A = EvdevListener.key_codes('a')[0]
+
+
+def key_events(*pairs):
+    return b''.join(EVENT.pack(0, 0, EvdevListener.EV_KEY, code, value) for code, value in pairs)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_stand_in_file_is_read_once_then_closed(tmp_path):
+    path = tmp_path / 'events.bin'
+    path.write_bytes(key_events((A, 1), (SPACE, 1), (SPACE, 2), (SPACE, 0)) * 100)
+    events = []
+    listener = EvdevListener(devices=[str(path)])
+    try:
+        listener.hook('space', on_press=lambda: events.append('press'),
+                      on_release=lambda: events.append('release'))
+        wait_for(lambda: len(events) == 200)
+        assert events == ['press', 'release'] * 100  # Autorepeat and unbound keys dropped
+        wait_for(lambda: not listener._fds)
+        # Nothing left to read: the reader thread blocks instead of spinning
+        start = time.process_time()
+        time.sleep(0.2)
+        assert time.process_time() - start < 0.1
+    finally:
+        listener.close()
+
+
+def test_fifo_device_survives_concurrent_rebinding(tmp_path):
+    path = str(tmp_path / 'events.fifo')
+    os.mkfifo(path)
+    presses = []
+    listener = EvdevListener(devices=[path])
+    writer = None
+    try:
+        listener.hook('space', on_press=lambda: presses.append(1))
+        writer = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        done = threading.Event()
+
+        def rebind():
+            while not done.is_set():
+                listener.unhook(listener.hook('a'))
+
+        thread = threading.Thread(target=rebind)
+        thread.start()
+        try:
+            for _ in range(200):
+                os.write(writer, key_events((SPACE, 1), (SPACE, 0)))
+                time.sleep(0.0005)
+        finally:
+            done.set()
+            thread.join()
+        wait_for(lambda: len(presses) == 200)
+        assert listener._thread.is_alive()
+    finally:
+        if writer is not None:
+            os.close(writer)
+        listener.close()
@@ -0,0 +1,64 @@
+import socket
+import pytest
+from backends import RecordingBackend
+from scroller import AdvancedScroller
+from metrics_server import MetricsServer, parse_address, render
+
+
+def scroller_metrics():
+    scroller = AdvancedScroller(backend=RecordingBackend(capacity=16))
+    for value in (3_000, 7_000, 40_000):
+        scroller.stats.emit_duration.record(value)
+    scroller.stats.units = 12
+    return scroller.metrics(bounds_ns=(5_000, 50_000))
+
+
+def test_render_without_a_scroller_only_reports_down():
+    assert render(None) == (b"# HELP bhop_up 1 once the scroller exists.\n"
+                            b"# TYPE bhop_up gauge\n"
+                            b"bhop_up 0\n")
+
+
+def test_render_counters_and_histogram():
+    lines = render(scroller_metrics()).decode().splitlines()
+    assert 'bhop_up 1' in lines
+    assert '# TYPE bhop_units_total counter' in lines
+    assert 'bhop_units_total 12' in lines
+    assert '# TYPE bhop_emit_duration_seconds histogram' in lines
+    assert 'bhop_emit_duration_seconds_bucket{le="5e-06"} 1' in lines
+    assert 'bhop_emit_duration_seconds_bucket{le="5e-05"} 3' in lines
+    assert 'bhop_emit_duration_seconds_bucket{le="+Inf"} 3' in lines
+    assert 'bhop_emit_duration_seconds_sum 0.000050000' in lines
+    assert 'bhop_emit_duration_seconds_count 3' in lines
+
+
+def test_parse_address_is_loopback_only():
+    assert parse_address('9100') == (socket.AF_INET, ('127.0.0.1', 9100))
+    assert parse_address('[::1]:9100') == (socket.AF_INET6, ('::1', 9100))
+    assert parse_address('unix:/tmp/m.sock') == (socket.AF_UNIX, '/tmp/m.sock')
+    with pytest.raises(ValueError):
+        parse_address('0.0.0.0:9100')
+
+
+def request(address, line):
+    with socket.create_connection(address, timeout=2.0) as conn:
+        conn.sendall(line + b'\r\nHost: x\r\n\r\n')
+        response = b''
+        while chunk := conn.recv(65536):
+            response += chunk
+    head, _, body = response.partition(b'\r\n\r\n')
+    return head.split(b'\r\n')[0], body
+
+
+def test_server_answers_scrapes_over_tcp():
+    server = MetricsServer(scroller_metrics, '127.0.0.1:0')
+    server.start()
+    try:
+        status, body = request(server.address, b'GET /metrics HTTP/1.1')
+        assert status == b'HTTP/1.1 200 OK'
+        assert b'bhop_units_total 12\n' in body
+        assert request(server.address, b'GET /other HTTP/1.1')[0] == b'HTTP/1.1 404 Not Found'
+        assert request(server.address, b'POST /metrics HTTP/1.1')[0] == b'HTTP/1.1 405 Method Not Allowed'
+        assert server.scrapes == 1
+    finally:
+        server.stop()
@@ -0,0 +1,60 @@
+import pytest
+from patterns import DEFAULT_GAP_US, MAX_UNITS, compile_pattern
+
+
+def test_constant_is_one_held_tick():
+    schedule = compile_pattern(None, 4, 0.002)
+    assert schedule.name == 'constant'
+    assert schedule.preview(3) == [(4, 2_000_000)] * 3
+    assert schedule.gap_ns == DEFAULT_GAP_US * 1000
+
+
+def test_ramp_holds_its_last_tick():
+    schedule = compile_pattern({'type': 'ramp', 'from': 1, 'to': 2, 'ticks': 4}, 10, 0.001)
+    assert [units for units, _ in schedule.preview(7)] == [10, 12, 15, 17, 20, 20, 20]
+    assert schedule.next[-1] == len(schedule) - 1
+
+
+def test_ramp_curves_and_clamping():
+    ease_in = compile_pattern({'type': 'ramp', 'from': 0, 'to': 4, 'ticks': 2, 'curve': 'ease-in'},
+                              10, 0.001)
+    assert list(ease_in.units) == [1, 10, 40]  # Never below one unit
+    huge = compile_pattern({'type': 'ramp', 'from': 500, 'ticks': 0}, 10, 0.001)
+    assert list(huge.units) == [MAX_UNITS]
+
+
+def test_steps_repeat_or_hold():
+    steps = [[2, 5], [4, 10]]
+    repeating = compile_pattern({'type': 'steps', 'steps': steps}, 1, 0.001)
+    assert repeating.preview(4) == [(2, 5_000_000), (4, 10_000_000)] * 2
+    held = compile_pattern({'type': 'steps', 'steps': steps, 'repeat': False}, 1, 0.001)
+    assert held.preview(4) == [(2, 5_000_000)] + [(4, 10_000_000)] * 3
+
+
+def test_burst_pauses_after_the_last_emit():
+    schedule = compile_pattern({'type': 'burst', 'units': 3, 'count': 2, 'interval_ms': 1,
+                                'pause_ms': 30, 'gap_us': 50}, 1, 0.001)
+    assert schedule.preview(4) == [(3, 1_000_000), (3, 30_000_000)] * 2
+    assert schedule.gap_ns == 50_000
+
+
+def test_builtin_names():
+    assert compile_pattern('accelerate', 1, 0.001).preview(1) == [(1, 1_000_000)]
+    assert len(compile_pattern('accelerate', 1, 0.001)) == 41
+
+
+@pytest.mark.parametrize('pattern', [
+    'bogus',
+    42,
+    {'type': 'zigzag'},
+    {'type': 'ramp', 'curve': 'bogus'},
+    {'type': 'ramp', 'ticks': -1},
+    {'type': 'steps', 'steps': []},
+    {'type': 'steps', 'steps': [[1]]},
+    {'type': 'steps', 'steps': [[1, 0.01]]},  # Interval below 0.1 ms
+    {'type': 'burst', 'count': 0},
+    {'type': 'burst', 'units': 'x'},
+])
+def test_malformed_patterns_raise_value_error(pattern):
+    with pytest.raises(ValueError):
+        compile_pattern(pattern, 1, 0.001)
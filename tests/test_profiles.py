@@ -0,0 +1,42 @@
+import pytest
+from profiles import ProfileStore, DEFAULT_PROFILE
+
+
+def test_flat_config_migrates_to_a_default_profile():
+    store = ProfileStore.from_config({'key': 'v', 'delay': 5, 'window_x': 10})
+    assert store.names() == [DEFAULT_PROFILE]
+    assert store.settings() == {'key': 'v', 'delay': 5}
+    assert store.compiled().delay_ms == 5
+
+
+def test_to_config_mirrors_the_active_profile_without_its_hotkey():
+    store = ProfileStore({'a': {'key': 'space'}, 'b': {'key': 'v', 'hotkey': 'f6'}}, 'a')
+    store.activate('b')
+    config = store.to_config({'window_x': 10})
+    assert config['key'] == 'v' and 'hotkey' not in config
+    assert config['active_profile'] == 'b'
+    assert config['window_x'] == 10
+    assert ProfileStore.from_config(config).settings('b') == {'key': 'v', 'hotkey': 'f6'}
+    assert store.hotkeys() == {'f6': 'b'}
+
+
+def test_profiles_are_precompiled_and_recompiled_only_on_change():
+    store = ProfileStore({'a': {'key': 'space', 'bindings': [{'key': 'c', 'strength': 4}]}}, 'a')
+    compiled = store.compiled('a')
+    assert store.bindings('a').get('c').strength == 4
+    store.update('a', {'key': 'space'})
+    assert store.compiled('a') is compiled
+    store.update('a', {'strength': 6})
+    assert store.compiled('a') is not compiled
+    assert store.compiled('a').strength == 6
+    assert store.activate('a') is store.compiled('a')
+
+
+def test_unknown_and_last_profiles():
+    store = ProfileStore({'a': {}, 'b': {}}, 'b')
+    with pytest.raises(KeyError):
+        store.activate('c')
+    store.remove('b')
+    assert store.active == 'a'
+    with pytest.raises(ValueError):
+        store.remove('a')
@@ -0,0 +1,60 @@
+from recording import SessionRecorder, SessionLog, PRESS, RELEASE, SESSION, VERSION
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_appending_starts_a_new_session(tmp_path):
+    path = str(tmp_path / 'session.bhr')
+    clock = FakeClock(5_000)
+    recorder = SessionRecorder(path, clock=clock)
+    clock.now += 1_000
+    recorder.key('space', True)
+    clock.now += 2_000
+    recorder.key('space', False)
+    recorder.close()
+
+    # Next run: a clock that restarted far below the first run's
+    clock = FakeClock(100)
+    recorder = SessionRecorder(path, clock=clock)
+    clock.now += 500
+    recorder.key('space', True)
+    recorder.close()
+
+    log = SessionLog(path)
+    try:
+        records = list(log.records())
+        summary = log.summary()
+    finally:
+        log.close()
+    assert log.version == VERSION
+    assert records == [
+        (6_000, PRESS, 'space'),
+        (8_000, RELEASE, 'space'),
+        (8_000, SESSION, 100),
+        (8_500, PRESS, 'space'),
+    ]
+    assert summary['sessions'] == 2
+    assert summary['duration_s'] == 3_500 / 1e9
+
+
+def test_settings_longer_than_a_short_payload(tmp_path):
+    path = str(tmp_path / 'session.bhr')
+    pattern = {'type': 'steps', 'steps': [[1, 1]] * 10000}  # About 60 KB of JSON
+    recorder = SessionRecorder(path, clock=FakeClock(0))
+    recorder.settings({'key': 'space', 'pattern': pattern})
+    recorder.key('space', True)
+    recorder.close()
+
+    log = SessionLog(path)
+    try:
+        records = list(log.records())
+    finally:
+        log.close()
+    assert records[0][2]['pattern'] == pattern
+    assert records[1] == (0, PRESS, 'space')
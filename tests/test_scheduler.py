@@ -0,0 +1,54 @@
+import threading
+from clock import VirtualClock
+from scheduler import TickScheduler
+
+
+def test_deadlines_do_not_drift_with_emit_cost():
+    clock = VirtualClock()
+    scheduler = TickScheduler(0.001, clock=clock)
+    scheduler.reset()
+    anchor = clock.now_ns()
+    for n in range(1, 101):
+        clock.advance(300_000)  # Work done during the tick
+        assert scheduler.wait() == 0
+        assert clock.now_ns() == anchor + n * 1_000_000
+    assert scheduler.missed == 0
+
+
+def test_late_tick_reanchors_instead_of_bursting():
+    clock = VirtualClock()
+    scheduler = TickScheduler(0.001, clock=clock)
+    scheduler.reset()
+    anchor = clock.now_ns()
+    clock.advance(3_500_000)  # Deadline at 1 ms, now at 3.5 ms
+    assert scheduler.wait() == 2_500_000
+    assert scheduler.missed == 1
+    assert scheduler.skipped == 2
+    # The next tick keeps the original phase: 4 ms, not 4.5 ms
+    assert scheduler.wait() == 0
+    assert clock.now_ns() == anchor + 4_000_000
+
+
+def test_set_period_keeps_the_phase_of_the_previous_deadline():
+    clock = VirtualClock()
+    scheduler = TickScheduler(0.001, clock=clock)
+    scheduler.reset()
+    anchor = clock.now_ns()
+    scheduler.wait()
+    scheduler.set_period(0.002)
+    scheduler.wait()
+    assert clock.now_ns() == anchor + 3_000_000
+
+
+def test_wake_event_interrupts_the_wait_and_keeps_the_deadline():
+    clock = VirtualClock()
+    scheduler = TickScheduler(0.010, clock=clock)
+    scheduler.reset()
+    anchor = clock.now_ns()
+    wake = threading.Event()
+    clock.call_at(anchor + 4_000_000, wake.set)
+    assert scheduler.wait(wake) is None
+    assert not wake.is_set()
+    assert scheduler.interrupts == 1
+    assert scheduler.wait(wake) == 0
+    assert clock.now_ns() == anchor + 10_000_000
@@ -0,0 +1,125 @@
+import threading
+from clock import VirtualClock
+from backends import RecordingBackend
+from scroller import AdvancedScroller
+
+
+def run_smooth(cost_ns, policy='coalesce'):
+    """Scrolls for one virtual second at 1 ms delay, strength 10, smooth."""
+    clock = VirtualClock()
+
+    class Backend(RecordingBackend):
+        def scroll(self, dx, dy):
+            clock.advance(cost_ns)
+            super().scroll(dx, dy)
+
+    backend = Backend(capacity=1 << 16, clock=clock.now_ns)
+    scroller = AdvancedScroller(backend=backend, clock=clock)
+    scroller.update_settings({'delay': 1, 'strength': 10, 'smooth_scrolling': True,
+                              'overload_policy': policy})
+    done = threading.Event()
+    start = clock.now_ns()
+    clock.call_at(start + 100_000_000, scroller.start_scrolling)
+    clock.call_at(start + 1_100_000_000, scroller.stop_scrolling)
+    clock.call_at(start + 1_200_000_000, done.set)
+    scroller.start()
+    done.wait()
+    scroller.stop()
+    return scroller.stats
+
+
+def test_smooth_scroll_pauses_are_not_overloads():
+    for policy in ('coalesce', 'drop'):
+        stats = run_smooth(1_000, policy)
+        assert stats.overloads == 0
+        assert stats.dropped_units == 0
+        assert stats.gap_fits > 0
+        assert stats.units == stats.ticks * 10
+
+
+def test_slow_backend_is_an_overload():
+    stats = run_smooth(100_000)
+    assert stats.overloads > 0
+    assert stats.emit_cost_ns > 50_000
+
+
+def units_per_tick(settings, holds):
+    """Presses the key for each (start_s, end_s) hold; returns the units of every emit."""
+    clock = VirtualClock()
+    backend = RecordingBackend(capacity=1 << 16, clock=clock.now_ns)
+    scroller = AdvancedScroller(backend=backend, clock=clock)
+    scroller.update_settings(settings)
+    done = threading.Event()
+    start = clock.now_ns()
+    for begin, end in holds:
+        clock.call_at(start + int(begin * 1e9), scroller.start_scrolling)
+        clock.call_at(start + int(end * 1e9), scroller.stop_scrolling)
+    clock.call_at(start + int((holds[-1][1] + 1) * 1e9), done.set)
+    scroller.start()
+    done.wait()
+    scroller.stop()
+    ticks = {}
+    for timestamp, _ in backend.events():
+        ticks[timestamp] = ticks.get(timestamp, 0) + 1
+    return [ticks[timestamp] for timestamp in sorted(ticks)]
+
+
+def test_acceleration_ramps_up_over_40_ticks_and_restarts_per_hold():
+    settings = {'delay': 10, 'strength': 10, 'acceleration': True}
+    ticks = units_per_tick(settings, [(0.1, 1.1), (2.0, 2.5)])
+    first, second = ticks[:100], ticks[100:]
+    assert len(first) == 100 and len(second) == 50
+    assert first[0] == 10 and first[20] == 20 and first[40:] == [30] * 60
+    assert first == sorted(first)
+    assert second[:41] == first[:41]
+
+
+def test_acceleration_is_off_at_100_ms_ticks():
+    ticks = units_per_tick({'delay': 100, 'strength': 10, 'acceleration': True}, [(0.1, 2.1)])
+    assert ticks == [10] * 20
+
+
+def run_script(settings, events, until_s):
+    """Runs (time_s, callback(scroller)) events on a virtual clock; returns scroller and emit times."""
+    clock = VirtualClock()
+    backend = RecordingBackend(capacity=1 << 16, clock=clock.now_ns)
+    scroller = AdvancedScroller(backend=backend, clock=clock)
+    scroller.update_settings(settings)
+    done = threading.Event()
+    start = clock.now_ns()
+    for at, action in events:
+        clock.call_at(start + int(at * 1e9), lambda action=action: action(scroller))
+    clock.call_at(start + int(until_s * 1e9), done.set)
+    scroller.start()
+    done.wait()
+    scroller.stop()
+    emits = sorted({timestamp - start for timestamp, _ in backend.events()})
+    return scroller, emits
+
+
+def test_stop_cuts_a_long_tick_short():
+    scroller, emits = run_script({'delay': 1000}, [
+        (0.1, AdvancedScroller.start_scrolling),
+        (0.2, AdvancedScroller.stop_scrolling),
+    ], 3.0)
+    assert emits == [100_000_000]
+    assert scroller.stats.release_to_halt.max == 0  # Halted at the instant of the stop
+
+
+def test_settings_change_reaims_the_pending_deadline():
+    scroller, emits = run_script({'delay': 1000}, [
+        (0.1, AdvancedScroller.start_scrolling),
+        (0.105, lambda s: s.update_settings({'delay': 10})),
+        (0.135, AdvancedScroller.stop_scrolling),
+    ], 1.0)
+    assert emits == [100_000_000, 110_000_000, 120_000_000, 130_000_000]
+
+
+def test_stop_interrupts_smooth_scroll_pauses():
+    scroller, emits = run_script(
+        {'delay': 1000, 'strength': 10, 'smooth_scrolling': True,
+         'pattern': {'type': 'ramp', 'gap_us': 10_000}},
+        [(0.1, AdvancedScroller.start_scrolling), (0.125, AdvancedScroller.stop_scrolling)], 1.0)
+    # Steps at 0, 10 and 20 ms; the pause after the third is cut short
+    assert emits == [100_000_000, 110_000_000, 120_000_000]
+    assert scroller.stats.units == 3
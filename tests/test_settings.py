@@ -0,0 +1,53 @@
+import logging
+import pytest
+from backends import RecordingBackend
+from scroller import AdvancedScroller
+from settings import ScrollSettings
+from conftest import FakeListener
+
+
+def test_snapshot_is_immutable_and_precomputed():
+    settings = ScrollSettings(delay=4, strength=25, smooth_scrolling=True, overload_policy='bogus')
+    assert settings.delay == 0.004
+    assert settings.tick_period == 0.002
+    assert settings.strength == 10
+    assert settings.overload_policy == 'coalesce'
+    with pytest.raises(AttributeError):
+        settings.strength = 3
+    with pytest.raises(AttributeError):
+        del settings.key
+
+
+def test_merged_bumps_the_version_and_ignores_unknown_keys():
+    settings = ScrollSettings(key='v', delay=5, version=3)
+    merged = settings.merged({'strength': 4, 'bogus': 1})
+    assert merged.version == 4
+    assert merged.to_dict() == dict(settings.to_dict(), strength=4)
+    assert settings.strength == 1
+    assert ScrollSettings.from_dict(merged.to_dict()).to_dict() == merged.to_dict()
+
+
+def test_update_settings_swaps_snapshots_without_touching_the_input():
+    scroller = AdvancedScroller(backend=RecordingBackend(capacity=16), listener=FakeListener())
+    before = scroller.config
+    changes = {'strength': 7, 'delay': 3}
+    scroller.update_settings(changes)
+    assert changes == {'strength': 7, 'delay': 3}
+    assert scroller.config is not before
+    assert scroller.config.version > before.version
+    assert (before.strength, scroller.config.strength) == (1, 7)
+
+
+def test_acceleration_needs_ticks_under_100_ms():
+    assert ScrollSettings(delay=99, acceleration=True).schedule.name == 'accelerate'
+    assert ScrollSettings(delay=100, acceleration=True).schedule.name == 'constant'
+    # Smooth scrolling ticks twice per delay
+    assert ScrollSettings(delay=150, acceleration=True, smooth_scrolling=True).schedule.name == 'accelerate'
+
+
+def test_malformed_pattern_is_logged_and_ignored(caplog):
+    with caplog.at_level(logging.WARNING, logger='settings'):
+        settings = ScrollSettings(pattern={'type': 'bogus'})
+    assert settings.pattern is None
+    assert settings.schedule.name == 'constant'
+    assert 'Unknown pattern type: bogus' in caplog.text
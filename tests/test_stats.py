@@ -0,0 +1,51 @@
+import random
+from stats import Histogram
+
+
+def test_small_values_are_exact():
+    histogram = Histogram()
+    for value in range(1, 11):
+        histogram.record(value)
+    assert histogram.percentile(50) == 5
+    assert histogram.percentile(90) == 9
+    assert histogram.percentile(100) == 10
+    assert (histogram.min, histogram.max, histogram.count, histogram.total) == (1, 10, 10, 55)
+
+
+def test_percentiles_stay_within_bucket_precision():
+    rng = random.Random(4)
+    values = sorted(rng.randrange(1, 50_000_000) for _ in range(10_000))
+    histogram = Histogram()
+    for value in values:
+        histogram.record(value)
+    for q in (50, 90, 99, 99.9):
+        exact = values[int(len(values) * q / 100 + 0.5) - 1]
+        estimate = histogram.percentile(q)
+        # Upper bound of the exact value's bucket: never below, at most 1/16 above
+        assert exact <= estimate <= exact * (1 + 1 / 16)
+
+
+def test_every_value_falls_inside_its_bucket():
+    histogram = Histogram()
+    for value in (15, 16, 17, 31, 32, 33, 1000, 123_456_789):
+        index = histogram._index(value)
+        assert value <= histogram._bucket_value(index)
+        assert index == 0 or value > histogram._bucket_value(index - 1)
+
+
+def test_negative_values_count_as_zero_and_reset_clears():
+    histogram = Histogram()
+    histogram.record(-5)
+    assert histogram.percentile(50) == 0
+    histogram.reset()
+    assert histogram.count == 0
+    assert histogram.percentile(99) == 0
+    assert histogram.to_dict() == {'count': 0}
+
+
+def test_cumulative_counts_whole_buckets_below_each_bound():
+    histogram = Histogram()
+    for value in (5, 10, 100, 1000, 10_000):
+        histogram.record(value)
+    # 1000 shares the bucket up to 1023, so it only counts from the 5000 bound on
+    assert histogram.cumulative([10, 1000, 5000]) == [2, 3, 4, 5]
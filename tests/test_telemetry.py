@@ -0,0 +1,42 @@
+import pytest
+from telemetry import TelemetryRing, TelemetryReader
+
+MS = 1_000_000
+
+
+def test_capacity_must_be_a_power_of_two():
+    with pytest.raises(ValueError):
+        TelemetryRing(1000)
+
+
+def test_reader_summarizes_ticks_since_the_last_sample():
+    ring = TelemetryRing(16)
+    reader = TelemetryReader(ring)
+    assert reader.sample()['ticks'] == 0
+    for n in range(5):
+        ring.push(n * MS, 3, 2, 1000 * n)
+    sample = reader.sample()
+    assert sample['ticks'] == 5 and sample['lost'] == 0
+    assert sample['events_per_sec'] == pytest.approx(1000)  # 4 intervals over 4 ms
+    assert sample['units_per_sec'] == pytest.approx(2000)
+    assert sample['strength'] == 3
+    assert sample['jitter_us'] == 2.0 and sample['jitter_max_us'] == 4.0
+
+    # The next batch measures its rate from the previous batch's last tick
+    ring.push(6 * MS, 4, 1, 0)
+    sample = reader.sample()
+    assert sample['ticks'] == 1
+    assert sample['events_per_sec'] == pytest.approx(500)
+    assert sample['strength'] == 4
+
+
+def test_slow_reader_loses_the_oldest_samples():
+    ring = TelemetryRing(8)
+    reader = TelemetryReader(ring)
+    for n in range(20):
+        ring.push(n * MS, 1, 1, 0)
+    sample = reader.sample()
+    # The slot the producer writes next is skipped too
+    assert sample['ticks'] == 7 and sample['lost'] == 13
+    reader.reset()
+    assert reader.sample()['ticks'] == 0
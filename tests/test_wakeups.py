@@ -0,0 +1,54 @@
+import threading
+import pytest
+from clock import VirtualClock
+from backends import RecordingBackend
+from scroller import AdvancedScroller
+from wakeups import WakeupAudit, audit
+
+
+@pytest.fixture
+def enabled_audit():
+    audit.__init__()
+    audit.enable()
+    yield audit
+    audit.__init__()  # Back to disabled for other tests
+
+
+def test_disabled_audit_counts_nothing():
+    wakeups = WakeupAudit()
+    wakeups.count('timer')
+    wakeups.set_active(True)
+    assert wakeups.counts == {} and not wakeups.active
+    assert wakeups.summary()['elapsed_s'] == 0.0
+
+
+def test_counts_are_split_by_activity():
+    wakeups = WakeupAudit()
+    wakeups.enable()
+    wakeups.count('timer')
+    wakeups.set_active(True)
+    wakeups.count('timer')
+    wakeups.count('timer')
+    wakeups.set_active(False)
+    sources = wakeups.summary()['sources']
+    assert (sources['timer']['idle'], sources['timer']['active']) == (1, 2)
+
+
+def test_idle_scroller_never_wakes(enabled_audit):
+    clock = VirtualClock()
+    scroller = AdvancedScroller(backend=RecordingBackend(capacity=1 << 12, clock=clock.now_ns),
+                                clock=clock)
+    scroller.update_settings({'delay': 10})
+    done = threading.Event()
+    start = clock.now_ns()
+    clock.call_at(start + 1_000_000_000, scroller.start_scrolling)
+    clock.call_at(start + 1_100_000_000, scroller.stop_scrolling)
+    clock.call_at(start + 60_000_000_000, done.set)  # A virtual minute of idling after
+    scroller.start()
+    done.wait()
+    scroller.stop()
+    counts = enabled_audit.counts['scroller']
+    assert counts[1] == 10  # One per tick while active
+    # Idle wakeups come from control events only (settings, start, shutdown),
+    # however long the scroller sits idle
+    assert counts[0] <= 3
@@ -0,0 +1,33 @@
+import os
+import shutil
+import pytest
+
+pytest.importorskip('Xlib')
+if shutil.which('Xvfb') is None:
+    pytest.skip("Xvfb is not installed", allow_module_level=True)
+
+from bench import start_xvfb
+from backends import XTestBackend
+
+
+@pytest.fixture
+def xvfb(monkeypatch):
+    monkeypatch.setenv('DISPLAY', os.environ.get('DISPLAY', ''))  # Restored afterwards
+    process = start_xvfb()
+    yield os.environ['DISPLAY']
+    process.terminate()
+    process.wait(timeout=5)
+
+
+def test_xtest_queues_requests_and_flushes_once_per_tick(xvfb):
+    backend = XTestBackend(xvfb)
+    try:
+        backend.scroll(0, -3)
+        backend.flush()
+        backend.scroll(0, 2)
+        backend.flush()
+        assert backend.requests == 10  # A press and a release per unit
+        assert backend.flushes == 2
+        backend._display.sync()  # The server took every request without an error
+    finally:
+        backend.close()
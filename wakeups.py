@@ -0,0 +1,87 @@
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class WakeupAudit:
+    """
+    Counts wakeups per source (Qt timers, the scroll loop, key hooks, the
+    config writer), split by whether scrolling was active at the time.
+    Disabled unless enable() is called (main.py --audit-wakeups); until then
+    count() is a single attribute check. Idle wakeups are what the tool
+    costs while it sits in the tray: every periodic source should stay at
+    zero there, and anything counted while idle was caused by an event.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = 0
+        self.active = False   # Scrolling right now (key held / toggled on)
+        self._active_since = 0
+        self._active_ns = 0
+        self.counts = {}      # source -> [idle, active]
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """Starts counting."""
+        self.started_at = time.monotonic_ns()
+        self.enabled = True
+
+    def count(self, source):
+        """Records one wakeup of `source`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            slot = self.counts.get(source)
+            if slot is None:
+                slot = self.counts[source] = [0, 0]
+            slot[self.active] += 1
+
+    def set_active(self, active):
+        """Marks scrolling as started or stopped."""
+        if not self.enabled or active == self.active:
+            return
+        now = time.monotonic_ns()
+        with self._lock:
+            if active:
+                self._active_since = now
+            else:
+                self._active_ns += now - self._active_since
+            self.active = active
+
+    def summary(self):
+        """Returns {'elapsed_s', 'idle_s', 'sources': {source: {'idle', 'active', 'idle_per_min'}}}."""
+        now = time.monotonic_ns()
+        with self._lock:
+            active_ns = self._active_ns + (now - self._active_since if self.active else 0)
+            counts = {source: list(slot) for source, slot in self.counts.items()}
+        elapsed_s = (now - self.started_at) / 1e9 if self.enabled else 0.0
+        idle_s = max(0.0, elapsed_s - active_ns / 1e9)
+        return {
+            'elapsed_s': elapsed_s,
+            'idle_s': idle_s,
+            'sources': {
+                source: {
+                    'idle': idle,
+                    'active': active,
+                    'idle_per_min': idle * 60 / idle_s if idle_s else 0.0
+                }
+                for source, (idle, active) in sorted(counts.items())
+            }
+        }
+
+    def log_summary(self):
+        """Logs wakeups per source, idle and active."""
+        if not self.enabled:
+            return
+        summary = self.summary()
+        logger.info(f"Wakeups over {summary['elapsed_s']:.0f} s ({summary['idle_s']:.0f} s idle):")
+        for source, counts in summary['sources'].items():
+            logger.info(f"Wakeups {source:<24} idle {counts['idle']:8d} "
+                        f"({counts['idle_per_min']:6.1f}/min)  active {counts['active']:8d}")
+
+
+# Process-wide audit; enabled by main.py --audit-wakeups
+audit = WakeupAudit()